@@ -0,0 +1,36 @@
+"""add job queue columns
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('job', sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('job', sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='3'))
+    op.add_column('job', sa.Column('available_at', sa.DateTime(), nullable=False, server_default=sa.func.now()))
+    op.add_column('job', sa.Column('locked_by', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('job', sa.Column('locked_until', sa.DateTime(), nullable=True))
+    op.create_index('ix_job_status', 'job', ['status'])
+    op.create_index('ix_job_available_at', 'job', ['available_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_job_available_at', table_name='job')
+    op.drop_index('ix_job_status', table_name='job')
+    op.drop_column('job', 'locked_until')
+    op.drop_column('job', 'locked_by')
+    op.drop_column('job', 'available_at')
+    op.drop_column('job', 'max_attempts')
+    op.drop_column('job', 'attempts')
@@ -0,0 +1,25 @@
+"""add payer hedging
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('payer_config', sa.Column('hedge_enabled', sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.add_column('payer_config', sa.Column('hedge_after_ms', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('payer_config', 'hedge_after_ms')
+    op.drop_column('payer_config', 'hedge_enabled')
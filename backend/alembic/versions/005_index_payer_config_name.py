@@ -0,0 +1,22 @@
+"""index payer_config name
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_payer_config_name'), 'payer_config', ['name'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_payer_config_name'), table_name='payer_config')
@@ -0,0 +1,25 @@
+"""add telemetry samples
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('payer_config', sa.Column('telemetry_samples_stedi', sa.Float(), nullable=False, server_default='0'))
+    op.add_column('payer_config', sa.Column('telemetry_samples_rpa', sa.Float(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('payer_config', 'telemetry_samples_rpa')
+    op.drop_column('payer_config', 'telemetry_samples_stedi')
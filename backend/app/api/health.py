@@ -1,14 +1,19 @@
 from fastapi import APIRouter, Depends
-from sqlmodel import Session, select
-from ..core.db import get_session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..core.db import get_async_session
 from ..connectors.stedi import StediConnector
 from ..connectors.rpa import RPAConnector
 from ..connectors.mock import MockConnector
+from ..core.http_client import stedi_http_pool
+from ..core.router import vob_router
+from ..core.rate_limit import stedi_rate_limiter
+from ..connectors.browser_pool import rpa_browser_pool
 
 router = APIRouter()
 
 @router.get("/health")
-async def health_check(session: Session = Depends(get_session)):
+async def health_check(session: AsyncSession = Depends(get_async_session)):
     """
     Health check endpoint to verify service and dependency status.
     """
@@ -19,12 +24,23 @@ async def health_check(session: Session = Depends(get_session)):
             "stedi": "unknown",
             "rpa": "unknown",
             "mock": "unknown"
+        },
+        "http_pools": {
+            "stedi": stedi_http_pool.stats()
+        },
+        "cache": vob_router.cache.stats(),
+        "rpa_browser_pool": rpa_browser_pool.stats(),
+        "channel_telemetry": vob_router.telemetry.snapshot(),
+        "hedging": vob_router.hedge_stats,
+        "circuit_breakers": vob_router.guard.stats(),
+        "rate_limits": {
+            "stedi": stedi_rate_limiter.stats()
         }
     }
     
     # Check Database
     try:
-        session.exec(select(1)).first()
+        (await session.exec(select(1))).first()
         status["database"] = "connected"
     except Exception as e:
         status["database"] = "disconnected"
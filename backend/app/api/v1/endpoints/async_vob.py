@@ -1,82 +1,115 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
 from fastapi.encoders import jsonable_encoder
-from sqlmodel import Session, select
-from typing import Dict, Any, List
+from fastapi.responses import StreamingResponse
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Dict, Any, Iterable, List
 from datetime import datetime
 import asyncio
+import json
+import time
 
-from ....models.domain import VoBRequest, VoBResult
+from ....models.domain import AsyncVoBRequest, VoBRequest
 from ....models.job import Job, JobStatus
-from ....core.db import get_session
-from ....connectors.rpa import RPAConnector
-from ....connectors.stedi import StediConnector
+from ....core.db import get_async_session, async_session_factory
+from ....core.router import vob_router
+from ....core.config import settings
+from ....core.auth import get_current_user
+from ....services.job_queue import job_queue
+from ....services.job_events import job_event_bus, job_status_payload
+from ....services.job_progress import job_progress_store
+from ....services.webhooks import webhook_dispatcher, validate_callback_url, CallbackURLError
 
 router = APIRouter()
 
-async def process_job(job_id: str, request: VoBRequest, session: Session):
-    # Re-fetch job to ensure we have the latest session state if needed, 
-    # but here we pass session. Ideally we should create a new session for the background task
-    # or handle session scope carefully. For simplicity, we'll assume a new session is needed.
-    # But BackgroundTasks runs after response, so dependency injection session might be closed.
-    # We should create a new session here.
-    from ....core.db import engine
-    from sqlmodel import Session as SQLSession
-    
-    with SQLSession(engine) as db:
-        job = db.get(Job, job_id)
+TERMINAL_STATUSES = {JobStatus.COMPLETED.value, JobStatus.FAILED.value}
+
+async def publish_job_status(job: Job) -> None:
+    status = jsonable_encoder(job_status_payload(job))
+    await job_progress_store.save(status)
+    await job_event_bus.publish(status)
+
+async def report_progress(job: Job, step: str, percent: int) -> None:
+    # Intermediate progress goes to the progress store and event bus only;
+    # the Job row is written once, when the job finishes
+    job.progress_step = step
+    job.progress_percent = percent
+    job.updated_at = datetime.now()
+    await publish_job_status(job)
+
+async def process_job(job_id: str, request: VoBRequest, worker_id: str = "inline"):
+    # Runs in a queue worker (or after the response, in inline mode), so it
+    # always opens its own session rather than reusing the request's.
+    async with async_session_factory() as db:
+        job = await db.get(Job, job_id)
         if not job:
             return
 
-        job.status = JobStatus.PROCESSING
-        job.progress_step = "starting_connector"
-        job.progress_percent = 10
-        db.add(job)
-        db.commit()
+        if job.status == JobStatus.QUEUED:
+            # Inline execution; queue workers lease the job when claiming it
+            await job_queue.claim_job(db, job, worker_id)
+
+        await report_progress(job, "starting_connector", 10)
         
+        routed = error = None
         try:
-            # Determine connector based on request or config
-            # For this phase, we default to RPA if not specified, or based on logic
-            # Here we'll just use RPAConnector for demonstration of the RPA phase
-            connector = RPAConnector()
-            
-            job.progress_step = "running_rpa"
-            job.progress_percent = 30
-            db.add(job)
-            db.commit()
-            
-            result = await connector.check_eligibility(request)
-            
-            job.result = jsonable_encoder(result)
-            job.status = JobStatus.COMPLETED
-            job.progress_step = "completed"
-            job.progress_percent = 100
-            job.updated_at = datetime.now()
+            # Same decision path as check_sync: cache, preferred channel, fallback
+            channel = await vob_router.resolve_channel(request, db)
+            await report_progress(job, f"running_{channel.value}", 30)
             
+            routed = await vob_router.route(request, db)
         except Exception as e:
-            job.status = JobStatus.FAILED
-            job.error_message = str(e)
-            job.updated_at = datetime.now()
+            error = e
+
+        if not await job_queue.holds_lease(db, job, worker_id):
+            # The lease lapsed and another worker reclaimed the job; its
+            # outcome (and webhook) wins, so drop ours
+            print(f"Job {job_id} lease lost by {worker_id}; discarding result")
+            await db.rollback()
+            return
+
+        if error is None:
+            job.channel = routed.channel
+            job_queue.complete(job, json.loads(routed.to_json()))
+        else:
+            # Nothing claims requeued jobs in inline mode, so fail outright there
+            job_queue.fail(job, str(error), retry=settings.JOB_QUEUE_MODE != "inline")
         
+        # Queued in the same transaction, so a finished job always gets its webhook
+        webhook_dispatcher.enqueue(db, job)
         db.add(job)
-        db.commit()
+        await db.commit()
+        await publish_job_status(job)
 
 @router.post("/check_async", status_code=202)
 async def check_eligibility_async(
-    request: VoBRequest, 
+    request: AsyncVoBRequest, 
     background_tasks: BackgroundTasks,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session),
+    user: dict = Depends(get_current_user)
 ):
+    if request.callback_url:
+        # Results carry PHI: only signed deliveries to vetted public https hosts
+        if not settings.WEBHOOK_SIGNING_SECRET:
+            raise HTTPException(status_code=400, detail="callback_url is not enabled on this server")
+        try:
+            await validate_callback_url(str(request.callback_url))
+        except CallbackURLError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
     # Create Job
     job = Job(
-        request_payload=jsonable_encoder(request),
-        status=JobStatus.QUEUED
+        request_payload=jsonable_encoder(request, exclude={"callback_url"}),
+        status=JobStatus.QUEUED,
+        callback_url=str(request.callback_url) if request.callback_url else None
     )
     session.add(job)
-    session.commit()
-    session.refresh(job)
+    await session.commit()
+    await session.refresh(job)
     
-    # Trigger background task
-    background_tasks.add_task(process_job, job.id, request, session)
+    # In worker mode the queued row is the queue entry; a worker claims it.
+    if settings.JOB_QUEUE_MODE == "inline":
+        background_tasks.add_task(process_job, job.id, request)
     
     return {
         "job_id": job.id,
@@ -85,32 +118,109 @@ async def check_eligibility_async(
         "poll_url": f"/api/v1/vob/status/{job.id}"
     }
 
+def _parse_job_ids(job_ids: str) -> List[str]:
+    ids = list(dict.fromkeys(job_id.strip() for job_id in job_ids.split(",") if job_id.strip()))
+    if not ids:
+        raise HTTPException(status_code=400, detail="job_ids is required")
+    if len(ids) > settings.JOB_STATUS_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.JOB_STATUS_MAX_IDS} job ids per request"
+        )
+    return ids
+
+async def _load_statuses(session: AsyncSession, ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    ids = list(ids)
+    # Fast path first; only jobs the progress store doesn't hold hit the DB
+    statuses = await job_progress_store.get_many(ids)
+    missing = [job_id for job_id in ids if job_id not in statuses]
+    if missing:
+        jobs = (await session.exec(select(Job).where(Job.id.in_(missing)))).all()
+        statuses.update({job.id: jsonable_encoder(job_status_payload(job)) for job in jobs})
+    for job_id in ids:
+        statuses.setdefault(job_id, {"job_id": job_id, "status": "not_found"})
+    return statuses
+
+def _is_settled(status: Dict[str, Any]) -> bool:
+    return status["status"] in TERMINAL_STATUSES or status["status"] == "not_found"
+
+@router.get("/status")
+async def get_jobs_status(
+    job_ids: str = Query(..., description="Comma-separated job ids"),
+    wait: float = Query(0, ge=0, le=60, description="Long-poll: seconds to wait for a change"),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Status of many jobs in one query. With `wait`, holds the request until
+    any unfinished job changes (or the wait elapses) before answering.
+    """
+    ids = _parse_job_ids(job_ids)
+    async with job_event_bus.subscribe(ids) as events:
+        statuses = await _load_statuses(session, ids)
+        if wait and not all(_is_settled(status) for status in statuses.values()):
+            try:
+                event = await asyncio.wait_for(events.get(), timeout=wait)
+                statuses[event["job_id"]] = event
+            except asyncio.TimeoutError:
+                pass
+    return {"jobs": [statuses[job_id] for job_id in ids]}
+
+@router.get("/status/stream")
+async def stream_jobs_status(job_ids: str = Query(..., description="Comma-separated job ids")):
+    """
+    Server-sent events: one `status` event per job now, then one per
+    progress change, ending with `end` once every job has finished.
+    """
+    ids = _parse_job_ids(job_ids)
+
+    async def stream():
+        deadline = time.monotonic() + settings.JOB_STREAM_MAX_SECONDS
+        async with job_event_bus.subscribe(ids) as events:
+            # Subscribe before reading so no change slips in between
+            async with async_session_factory() as session:
+                updates = list((await _load_statuses(session, ids)).values())
+            last: Dict[str, Dict[str, Any]] = {}
+            pending = set(ids)
+
+            while True:
+                for status in updates:
+                    job_id = status["job_id"]
+                    if job_id not in pending or last.get(job_id) == status:
+                        continue
+                    last[job_id] = status
+                    yield f"event: status\ndata: {json.dumps(status)}\n\n"
+                    if _is_settled(status):
+                        pending.discard(job_id)
+
+                remaining = deadline - time.monotonic()
+                if not pending or remaining <= 0:
+                    break
+                try:
+                    updates = [await asyncio.wait_for(
+                        events.get(), timeout=min(settings.JOB_STREAM_RESYNC_SECONDS, remaining)
+                    )]
+                except asyncio.TimeoutError:
+                    # Re-read in case an event was missed (e.g. no Redis between
+                    # the worker and this instance); doubles as a keep-alive
+                    yield ": keep-alive\n\n"
+                    async with async_session_factory() as session:
+                        updates = list((await _load_statuses(session, pending)).values())
+
+        yield f"event: end\ndata: {json.dumps({'pending': sorted(pending)})}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/status/{job_id}")
-async def get_job_status(job_id: str, session: Session = Depends(get_session)):
-    job = session.get(Job, job_id)
+async def get_job_status(job_id: str, session: AsyncSession = Depends(get_async_session)):
+    status = await job_progress_store.get(job_id)
+    if status is not None:
+        return status
+
+    job = await session.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    
-    response = {
-        "job_id": job.id,
-        "status": job.status,
-        "created_at": job.created_at,
-        "updated_at": job.updated_at
-    }
-    
-    if job.status == JobStatus.PROCESSING:
-        response["progress"] = {
-            "step": job.progress_step,
-            "percent": job.progress_percent
-        }
-        response["estimated_remaining_seconds"] = 15 # Mock
-        
-    if job.status == JobStatus.COMPLETED:
-        response["result"] = job.result
-        
-    if job.status == JobStatus.FAILED:
-        response["error"] = job.error_message
-        
-    return response
-
-
+    return job_status_payload(job)
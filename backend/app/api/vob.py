@@ -1,26 +1,53 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlmodel import Session
-from ..models.domain import VoBRequest, VoBResult
-from ..core.router import VoBRouter
+from fastapi.responses import Response, StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..models.domain import VoBRequest, VoBResult, VoBBatchRequest
+from ..core.router import vob_router
+from ..core.batch import stream_batch
 from ..core.auth import get_current_user
-from ..core.db import get_session
+from ..core.config import settings
+from ..core.db import get_async_session, async_session_factory
 
 router = APIRouter()
-vob_router = VoBRouter()
 
 @router.post("/check_sync", response_model=VoBResult)
 async def check_eligibility_sync(
     request: VoBRequest, 
     user: dict = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Synchronous eligibility check.
     """
     try:
-        result = await vob_router.route_request(request, session)
-        return result
+        routed = await vob_router.route(request, session)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    # Results are validated VoBResults or cached JSON written from one, so
+    # skip response_model re-validation and send the bytes directly
+    return Response(content=routed.to_json(), media_type="application/json")
+
+@router.post("/check_batch")
+async def check_eligibility_batch(
+    batch: VoBBatchRequest,
+    user: dict = Depends(get_current_user)
+):
+    """
+    Batch eligibility check. Streams one NDJSON line per request as each
+    result completes.
+    """
+    if len(batch.requests) > settings.VOB_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds maximum of {settings.VOB_BATCH_MAX_SIZE} requests"
+        )
+
+    async def body():
+        # The stream outlives the request scope, so it owns its session
+        async with async_session_factory() as session:
+            async for line in stream_batch(vob_router, batch.requests, session):
+                yield line
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
 
 
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List
+
+from playwright.async_api import async_playwright, Browser, BrowserContext
+
+from ..core.config import settings
+from ..core.resilience import LocalConnectorError
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPoolExhausted(LocalConnectorError):
+    """
+    Raised when every browser is busy and the wait queue is full or the
+    caller waited longer than the acquire timeout.
+    """
+    pass
+
+
+@dataclass
+class _BrowserSlot:
+    browser: Browser
+    uses: int = 0
+    active: int = 0
+    retiring: bool = False
+
+
+class BrowserPool:
+    """
+    Long-lived pool of warm Chromium browsers for RPA checks.
+
+    Each check leases a fresh BrowserContext (isolated cookies and storage)
+    on an already-running browser, so only the first check pays Chromium
+    start-up. Browsers are replaced after `max_uses` leases or when they
+    disconnect. Total concurrent leases are capped at
+    `size * contexts_per_browser`; further callers queue, and once
+    `max_queue` callers are waiting new ones are rejected.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        contexts_per_browser: int = 4,
+        max_uses: int = 100,
+        max_queue: int = 50,
+        acquire_timeout: float = 30.0,
+        headless: bool = True,
+    ):
+        self.size = size
+        self.contexts_per_browser = contexts_per_browser
+        self.max_uses = max_uses
+        self.max_queue = max_queue
+        self.acquire_timeout = acquire_timeout
+        self.headless = headless
+
+        self._playwright = None
+        self._slots: List[_BrowserSlot] = []
+        self._capacity = asyncio.Semaphore(size * contexts_per_browser)
+        self._lock = asyncio.Lock()
+        self._waiting = 0
+        self.recycled = 0
+        self.rejected = 0
+
+    @property
+    def started(self) -> bool:
+        return self._playwright is not None
+
+    async def start(self) -> None:
+        if self.started:
+            return
+        self._playwright = await async_playwright().start()
+        try:
+            for _ in range(self.size):
+                self._slots.append(_BrowserSlot(browser=await self._launch()))
+        except Exception:
+            await self.close()
+            raise
+
+    async def close(self) -> None:
+        slots, self._slots = self._slots, []
+        for slot in slots:
+            await self._close_browser(slot.browser)
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    @asynccontextmanager
+    async def lease(self, **context_options: Any) -> AsyncIterator[BrowserContext]:
+        """
+        Leases a new browser context, waiting for capacity if needed.
+        Extra keyword arguments are passed to `browser.new_context`.
+        """
+        await self._acquire()
+        try:
+            slot = await self._pick_slot()
+            slot.active += 1
+            context = None
+            try:
+                context = await slot.browser.new_context(**context_options)
+                yield context
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception:
+                        pass  # Browser may have crashed with the context open
+                slot.active -= 1
+                slot.uses += 1
+                if slot.uses >= self.max_uses or not slot.browser.is_connected():
+                    await self._retire(slot)
+                elif slot.retiring and slot.active == 0:
+                    await self._close_browser(slot.browser)
+        finally:
+            self._capacity.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "started": self.started,
+            "browsers": len(self._slots),
+            "active_contexts": sum(s.active for s in self._slots),
+            "capacity": self.size * self.contexts_per_browser,
+            "waiting": self._waiting,
+            "recycled": self.recycled,
+            "rejected": self.rejected,
+        }
+
+    async def _acquire(self) -> None:
+        if self._capacity.locked() and self._waiting >= self.max_queue:
+            self.rejected += 1
+            raise BrowserPoolExhausted(f"RPA browser pool queue is full ({self.max_queue} waiting)")
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._capacity.acquire(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise BrowserPoolExhausted(f"No RPA browser available within {self.acquire_timeout}s")
+        finally:
+            self._waiting -= 1
+
+    async def _pick_slot(self) -> _BrowserSlot:
+        async with self._lock:
+            for slot in list(self._slots):
+                if not slot.browser.is_connected():
+                    await self._retire(slot, locked=True)
+
+            if not self._slots:
+                self._slots.append(_BrowserSlot(browser=await self._launch()))
+
+            # Least-loaded browser; the capacity semaphore bounds the total
+            return min(self._slots, key=lambda s: s.active)
+
+    async def _retire(self, slot: _BrowserSlot, locked: bool = False) -> None:
+        """
+        Replaces a worn-out or crashed browser. Its open contexts finish on
+        the old browser, which is closed once the last one is released.
+        """
+        if slot.retiring:
+            return
+        slot.retiring = True
+        self.recycled += 1
+
+        if locked:
+            await self._replace(slot)
+        else:
+            async with self._lock:
+                await self._replace(slot)
+
+        if slot.active == 0:
+            await self._close_browser(slot.browser)
+
+    async def _replace(self, slot: _BrowserSlot) -> None:
+        if slot in self._slots:
+            self._slots.remove(slot)
+        if self.started:
+            try:
+                self._slots.append(_BrowserSlot(browser=await self._launch()))
+            except Exception as e:
+                # Next lease relaunches if the pool is left empty
+                logger.error(f"Failed to relaunch RPA browser: {e}")
+
+    async def _launch(self) -> Browser:
+        return await self._playwright.chromium.launch(headless=self.headless)
+
+    async def _close_browser(self, browser: Browser) -> None:
+        try:
+            await browser.close()
+        except Exception:
+            pass
+
+
+rpa_browser_pool = BrowserPool(
+    size=settings.RPA_BROWSER_POOL_SIZE,
+    contexts_per_browser=settings.RPA_CONTEXTS_PER_BROWSER,
+    max_uses=settings.RPA_BROWSER_MAX_USES,
+    max_queue=settings.RPA_POOL_MAX_QUEUE,
+    acquire_timeout=settings.RPA_POOL_ACQUIRE_TIMEOUT_SECONDS,
+)
@@ -1,3 +1,7 @@
+import hashlib
+import hmac
+import json
+import secrets
 from typing import Optional
 from datetime import datetime
 from playwright.async_api import async_playwright
@@ -17,10 +21,20 @@ from ..models.domain import VoBRequest, VoBResult, ChannelSource, CoverageStatus
 from ..core.config import settings
 from .base import BaseConnector
 from .rpa_strategies.factory import PortalFactory
+from .browser_pool import BrowserPool, rpa_browser_pool
+from .rpa_strategies.session_store import PortalSessionStore, portal_session_store
 
 class RPAConnector(BaseConnector):
-    def __init__(self, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        browser_pool: Optional[BrowserPool] = None,
+        session_store: Optional[PortalSessionStore] = None,
+    ):
         self.base_url = base_url or settings.RPA_PORTAL_URL
+        self.browser_pool = browser_pool or rpa_browser_pool
+        self.sessions = session_store or portal_session_store
+        self._session_key_secret = (settings.RPA_SESSION_KEY_SECRET or secrets.token_hex(32)).encode()
         self.browserbase = None
         if settings.BROWSERBASE_API_KEY and settings.BROWSERBASE_PROJECT_ID:
             self.browserbase = Browserbase(
@@ -28,14 +42,20 @@ class RPAConnector(BaseConnector):
             )
 
     async def check_eligibility(self, request: VoBRequest) -> VoBResult:
+        # Force local execution if target is localhost (Browserbase cannot access localhost)
+        is_localhost = "localhost" in self.base_url or "127.0.0.1" in self.base_url
+        use_browserbase = self.browserbase and not is_localhost
+
+        if self.browser_pool.started and not use_browserbase:
+            # Warm local browser from the shared pool
+            async with self.browser_pool.lease() as context:
+                return await self._run_check(context, request)
+
         async with async_playwright() as p:
             browser = None
             context = None
             try:
-                # Force local execution if target is localhost (Browserbase cannot access localhost)
-                is_localhost = "localhost" in self.base_url or "127.0.0.1" in self.base_url
-                
-                if self.browserbase and not is_localhost:
+                if use_browserbase:
                     # Create a session on Browserbase
                     session = self.browserbase.sessions.create(type="BROWSER")
                     # Connect to the remote session
@@ -46,54 +66,12 @@ class RPAConnector(BaseConnector):
                 
                 
                 # Use the browser...
-                if self.browserbase and not is_localhost:
+                if use_browserbase:
                      context = browser.contexts[0]
                 else:
                      context = await browser.new_context()
                 
-                page = await context.new_page()
-                
-                # Determine Strategy
-                strategy = PortalFactory.get_strategy(request.payer_id, self.base_url)
-                
-                # Get Credentials (if needed by the strategy, though strategy usually handles its own login flow, 
-                # we might want to pass them in or let the strategy fetch them. 
-                # For now, the strategy instance is created. 
-                # If the strategy needs creds, it should probably get them in its login method or init.
-                # Let's assume the strategy uses the factory's static method or we pass them here if we change the interface.
-                # The current interface is login(page). 
-                # Let's update the strategy to handle credential retrieval internally or pass it here.
-                # For simplicity, we'll keep the interface as is and let the strategy implementation call PortalFactory.get_credentials if needed,
-                # OR we can pass credentials to login. 
-                # Let's stick to the plan: "Credential Management: A utility to fetch credentials dynamically."
-                # The strategy implementation (like MockPortalStrategy) should use this utility.
-                
-                try:
-                    # 1. Login
-                    await strategy.login(page)
-                    
-                    # 2. Search Eligibility
-                    await strategy.search_eligibility(page, request)
-                    
-                    # 3. Extract Results
-                    raw_html = await strategy.extract_results(page)
-
-                    # Clean the HTML
-                    html_content = self._clean_html(raw_html)
-                    
-                    print(f"Extracted HTML size: {len(html_content)} chars")
-                    
-                    # 4. Use LLMParser
-                    from ..core.llm_parser import LLMParser
-                    parser = LLMParser()
-                    request_id = f"rpa-{datetime.now().timestamp()}"
-                    
-                    result = await parser.parse_html(html_content, request_id)
-                    return result
-
-                except Exception as e:
-                    print(f"RPA Navigation/Interaction Error: {e}")
-                    raise e
+                return await self._run_check(context, request)
                 
             except Exception as e:
                 print(f"RPA Connection Error: {e}")
@@ -104,6 +82,82 @@ class RPAConnector(BaseConnector):
                 if browser:
                     await browser.close()
 
+    async def _run_check(self, context, request: VoBRequest) -> VoBResult:
+        page = await context.new_page()
+        
+        # Determine Strategy
+        payer_key = request.payer.payer_code_hint or request.payer.name
+        strategy = PortalFactory.get_strategy(payer_key, self.base_url)
+        
+        # Credentials are fetched by the strategy itself via PortalFactory.get_credentials
+        try:
+            # 1. Login, reusing a saved portal session when it is still valid
+            await self._authenticate(context, page, strategy, payer_key)
+            
+            # 2. Search Eligibility
+            await strategy.search_eligibility(page, request)
+            
+            # 3. Extract Results
+            raw_html = await strategy.extract_results(page)
+
+            # Clean the HTML
+            html_content = self._clean_html(raw_html)
+            
+            print(f"Extracted HTML size: {len(html_content)} chars")
+            
+            # 4. Use LLMParser
+            from ..core.llm_parser import LLMParser
+            parser = LLMParser()
+            request_id = f"rpa-{datetime.now().timestamp()}"
+            
+            result = await parser.parse_html(html_content, request_id)
+            return result
+
+        except Exception as e:
+            print(f"RPA Navigation/Interaction Error: {e}")
+            raise e
+
+    async def _authenticate(self, context, page, strategy, payer_key: str) -> None:
+        session_key = self._session_key(payer_key)
+        state = await self.sessions.get(session_key)
+        if state:
+            await self._restore_session(context, state)
+            if await strategy.resume_session(page):
+                return
+            # Expired on the portal side
+            await self.sessions.invalidate(session_key)
+
+        await strategy.login(page)
+        await self.sessions.save(session_key, await context.storage_state())
+
+    def _session_key(self, payer_key: str) -> str:
+        # Rotating the credentials must not reuse the old login. Keyed with a
+        # server-side secret so the stored key can't be brute-forced offline
+        # back to the portal password.
+        creds = PortalFactory.get_credentials(payer_key)
+        fingerprint = hmac.new(
+            self._session_key_secret,
+            f"{creds.get('username', '')}:{creds.get('password', '')}".encode(),
+            hashlib.sha256,
+        ).hexdigest()[:16]
+        return f"{payer_key.lower()}:{self.base_url}:{fingerprint}"
+
+    async def _restore_session(self, context, state: dict) -> None:
+        if state.get("cookies"):
+            await context.add_cookies(state["cookies"])
+        origins = state.get("origins") or []
+        if origins:
+            # localStorage can only be written from a page on the same origin
+            await context.add_init_script(
+                script="""(origins => {
+                    const entry = origins.find(o => o.origin === window.location.origin);
+                    if (entry) for (const item of entry.localStorage) window.localStorage.setItem(item.name, item.value);
+                })(%s)""" % json.dumps(origins)
+            )
+
+    async def health_check(self) -> bool:
+        return bool(self.base_url)
+
     def _clean_html(self, html_content: str) -> str:
         """
         Removes unnecessary tags (script, style, svg, etc.) to reduce token usage.
@@ -18,6 +18,15 @@ class PortalStrategy(ABC):
         """
         pass
 
+    async def resume_session(self, page: Page) -> bool:
+        """
+        Called with a context restored from a saved session. Navigates to the
+        post-login landing page and returns True if the session is still
+        authenticated. Strategies that cannot detect this keep the default
+        and always log in.
+        """
+        return False
+
     @abstractmethod
     async def search_eligibility(self, page: Page, request: VoBRequest) -> None:
         """
@@ -17,6 +17,11 @@ class MockPortalStrategy(PortalStrategy):
         # Wait for navigation to eligibility page
         await page.wait_for_url(f"{self.base_url}/eligibility")
 
+    async def resume_session(self, page: Page) -> bool:
+        # The portal redirects to /login once the session cookie has expired
+        await page.goto(f"{self.base_url}/eligibility")
+        return not page.url.rstrip("/").endswith("/login")
+
     async def search_eligibility(self, page: Page, request: VoBRequest) -> None:
         # 2. Fill Eligibility Form
         await page.fill("input[name='first_name']", request.patient.first_name)
@@ -0,0 +1,71 @@
+import json
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from redis import asyncio as aioredis
+
+from ...core.config import settings
+
+
+class PortalSessionStore:
+    """
+    Stores authenticated Playwright storage state (cookies and localStorage)
+    per payer + credential set so RPA checks can skip the portal login.
+
+    Sessions are kept in process memory. With RPA_SESSION_STORE_REDIS
+    enabled they are also written to Redis so other workers can reuse them;
+    the state holds live portal session cookies, so only enable this on a
+    Redis that is not shared outside the service.
+    """
+
+    KEY_PREFIX = "rpa:session:"
+
+    def __init__(self, ttl_seconds: int = 1800, use_redis: bool = False):
+        self.ttl_seconds = ttl_seconds
+        self._local: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        self.redis = None
+        if use_redis and settings.REDIS_URL:
+            self.redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._local.get(key)
+        if entry is not None:
+            state, expires_at = entry
+            if expires_at > time.time():
+                return state
+            del self._local[key]
+
+        if self.redis:
+            try:
+                data = await self.redis.get(self.KEY_PREFIX + key)
+                if data:
+                    state = json.loads(data)
+                    ttl = await self.redis.ttl(self.KEY_PREFIX + key)
+                    self._local[key] = (state, time.time() + max(ttl, 0))
+                    return state
+            except Exception as e:
+                print(f"RPA session store get error: {e}")
+
+        return None
+
+    async def save(self, key: str, state: Dict[str, Any]) -> None:
+        self._local[key] = (state, time.time() + self.ttl_seconds)
+        if self.redis:
+            try:
+                await self.redis.set(self.KEY_PREFIX + key, json.dumps(state), ex=self.ttl_seconds)
+            except Exception as e:
+                print(f"RPA session store save error: {e}")
+
+    async def invalidate(self, key: str) -> None:
+        self._local.pop(key, None)
+        if self.redis:
+            try:
+                await self.redis.delete(self.KEY_PREFIX + key)
+            except Exception as e:
+                print(f"RPA session store invalidate error: {e}")
+
+
+portal_session_store = PortalSessionStore(
+    ttl_seconds=settings.RPA_SESSION_TTL_SECONDS,
+    use_redis=settings.RPA_SESSION_STORE_REDIS,
+)
@@ -19,6 +19,15 @@ class TemplatePortalStrategy(PortalStrategy):
         # await page.click("button[type='submit']")
         pass
 
+    async def resume_session(self, page: Page) -> bool:
+        """
+        Optional: return True if a restored session is still logged in.
+        """
+        # Example:
+        # await page.goto(f"{self.base_url}/dashboard")
+        # return "/login" not in page.url
+        return False
+
     async def search_eligibility(self, page: Page, request: VoBRequest) -> None:
         """
         Implement eligibility search logic here.
@@ -1,19 +1,29 @@
+import asyncio
+import hashlib
+import json
 import httpx
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from ..models.domain import (
-    VoBRequest, VoBResult, ChannelSource, CoverageStatus, Financials, 
-    Copay, NetworkType, PlanDates, Deductible, OOPMax, MoneyAmount, 
-    Coinsurance, RawRefs
+    VoBRequest, VoBResult, ChannelSource, CoverageStatus, Financials,
+    Copay, Deductible, MoneyAmount, RawRefs
 )
 from ..core.config import settings
 from ..core.stc_mapper import STCMapper
+from ..core.http_client import HTTPClientPool, stedi_http_pool
+from ..core.rate_limit import TokenBucketLimiter, parse_retry_after, stedi_rate_limiter
+from ..core.resilience import ConnectorNotConfigured
+from .stedi_parser import parse_financials
 
 class StediConnector:
-    def __init__(self):
+    def __init__(self, http_pool: Optional[HTTPClientPool] = None, rate_limiter: Optional[TokenBucketLimiter] = None):
         self.api_key = settings.STEDI_API_KEY
         self.base_url = settings.STEDI_BASE_URL
         self.mapper = STCMapper()
+        # Shared keep-alive pool; avoids a TCP + TLS handshake per 270
+        self.http_pool = http_pool or stedi_http_pool
+        # Shared across workers so batch runs stay under Stedi's limits
+        self.rate_limiter = rate_limiter or stedi_rate_limiter
 
     async def check_eligibility(self, request: VoBRequest) -> VoBResult:
         if not self.api_key:
@@ -21,24 +31,62 @@ class StediConnector:
             # But based on instructions, we should raise if key is missing for real connector
             if settings.DEMO_MODE:
                 return self._get_mock_response(request)
-            raise ValueError("STEDI_API_KEY is not set")
+            raise ConnectorNotConfigured("STEDI_API_KEY is not set")
 
-        url = self.base_url
-        headers = {
-            "Authorization": f"Key {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        # Determine STCs
-        stcs = ["30"] # Default
-        if request.services:
-            # Use the first service to determine primary STC
-            # In a real app we might query for all, but 270 usually takes one or a few
-            stcs = self.mapper.get_stc_with_fallbacks(request.services[0].cpt)
+        trading_partner = request.payer.payer_code_hint or "PAYER_ID"
+
+        # One 270 per STC chunk, dispatched concurrently
+        chunks = self._chunk_stcs(self._service_type_codes(request), self._max_stcs_per_request(trading_partner))
+        responses = await asyncio.gather(
+            *[self._post_eligibility(self._build_payload(request, trading_partner, stcs)) for stcs in chunks],
+            return_exceptions=True
+        )
+
+        succeeded = [r for r in responses if not isinstance(r, BaseException)]
+        failed = [r for r in responses if isinstance(r, BaseException)]
+        if not succeeded:
+            raise failed[0]
 
+        result = self._parse_stedi_response(self._merge_responses(succeeded), request)
+        if failed:
+            result.confidence_notes = (
+                f"Partial benefits: {len(failed)} of {len(responses)} service type queries failed"
+            )
+        return result
+
+    def _service_type_codes(self, request: VoBRequest) -> List[str]:
+        """
+        Union of STCs across every service on the request. Primary STCs come
+        first so they land in the first 270 when the list has to be split.
+        """
+        if not request.services:
+            return ["30"] # Default
+
+        primaries: List[str] = []
+        fallbacks: List[str] = []
+        for service in request.services:
+            stcs = self.mapper.get_stc_with_fallbacks(service.cpt, payer=request.payer.name)
+            primaries.append(stcs[0])
+            fallbacks.extend(stcs[1:])
+
+        ordered: List[str] = []
+        for stc in primaries + fallbacks:
+            if stc not in ordered:
+                ordered.append(stc)
+        return ordered
+
+    def _max_stcs_per_request(self, trading_partner: str) -> int:
+        # Many payers only honour a handful of STCs per 270 (some just one)
+        return int(settings.STEDI_MAX_STCS_BY_PAYER.get(trading_partner, settings.STEDI_MAX_STCS_PER_REQUEST))
+
+    def _chunk_stcs(self, stcs: List[str], size: int) -> List[List[str]]:
+        size = max(size, 1)
+        return [stcs[i:i + size] for i in range(0, len(stcs), size)]
+
+    def _build_payload(self, request: VoBRequest, trading_partner: str, stcs: List[str]) -> Dict[str, Any]:
         # Map VoBRequest to Stedi JSON (v3)
-        payload = {
-            "tradingPartnerServiceId": request.payer.payer_code_hint or "PAYER_ID", 
+        return {
+            "tradingPartnerServiceId": trading_partner, 
             "provider": {
                 "npi": request.provider.npi,
                 "organizationName": "Lorelin Provider" 
@@ -54,19 +102,69 @@ class StediConnector:
                 "serviceTypeCodes": stcs
             }
         }
-        
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(url, json=payload, headers=headers, timeout=30.0)
-                response.raise_for_status()
-                data = response.json()
-                return self._parse_stedi_response(data, request)
-            except httpx.HTTPStatusError as e:
-                print(f"Stedi API Error: {e.response.text}")
-                raise e
-            except Exception as e:
-                print(f"Connection Error: {str(e)}")
-                raise e
+
+    async def _post_eligibility(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        headers = {
+            "Authorization": f"Key {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        client = self.http_pool.client
+        try:
+            for attempt in range(settings.STEDI_MAX_429_RETRIES + 1):
+                await self._throttle(payload["tradingPartnerServiceId"])
+                response = await client.post(self.base_url, json=payload, headers=headers)
+                if response.status_code != 429 or attempt == settings.STEDI_MAX_429_RETRIES:
+                    break
+                # Hold back every worker on this key, then queue for another token
+                retry_after = parse_retry_after(response.headers.get("Retry-After"), default=1.0)
+                print(f"Stedi rate limited; retrying in {retry_after:.1f}s")
+                await self.rate_limiter.block(self._key_bucket(), retry_after)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            print(f"Stedi API Error: {e.response.text}")
+            raise e
+        except Exception as e:
+            print(f"Connection Error: {str(e)}")
+            raise e
+
+    async def _throttle(self, trading_partner: str) -> None:
+        await self.rate_limiter.acquire(
+            self._key_bucket(), settings.STEDI_RATE_LIMIT_PER_SECOND, settings.STEDI_RATE_LIMIT_BURST
+        )
+        rate, burst = settings.STEDI_PARTNER_RATE_LIMITS.get(
+            trading_partner,
+            (settings.STEDI_PARTNER_RATE_LIMIT_PER_SECOND, settings.STEDI_PARTNER_RATE_LIMIT_BURST),
+        )
+        await self.rate_limiter.acquire(f"stedi:partner:{trading_partner}", float(rate), float(burst))
+
+    def _key_bucket(self) -> str:
+        # Never put the API key itself in Redis
+        return "stedi:key:" + hashlib.sha256(self.api_key.encode()).hexdigest()[:16]
+
+    def _merge_responses(self, responses: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Merges 271s from split STC queries. Plan status and identifiers come
+        from the first response (which carries the primary STCs); benefits
+        are concatenated with exact duplicates dropped.
+        """
+        if len(responses) == 1:
+            return responses[0]
+
+        merged = dict(responses[0])
+        benefits: List[Dict[str, Any]] = []
+        seen = set()
+        for data in responses:
+            for benefit in data.get("benefitsInformation", []):
+                fingerprint = json.dumps(benefit, sort_keys=True, default=str)
+                if fingerprint not in seen:
+                    seen.add(fingerprint)
+                    benefits.append(benefit)
+        merged["benefitsInformation"] = benefits
+        return merged
+
+    async def health_check(self) -> bool:
+        return bool(self.api_key) or settings.DEMO_MODE
 
     def _parse_stedi_response(self, data: Dict[str, Any], request: VoBRequest) -> VoBResult:
         # Extract basic info
@@ -88,62 +186,8 @@ class StediConnector:
             
             plan_name = primary_status.get("planDetails")
 
-        # Parse financials
-        financials = Financials()
-        benefits = data.get("benefitsInformation", [])
-        
-        for benefit in benefits:
-            # We look for generic coverage (30) or specific STCs
-            # For MVP, we aggregate everything found
-            amounts = benefit.get("amounts", {})
-            
-            # Deductible
-            deductible_data = amounts.get("deductible", {})
-            if deductible_data:
-                if not financials.deductible:
-                    financials.deductible = Deductible()
-                
-                in_network = deductible_data.get("inNetwork")
-                if in_network:
-                    financials.deductible.individual = MoneyAmount(
-                        total=float(in_network.get("total", 0)),
-                        remaining=float(in_network.get("remaining", 0))
-                    )
-            
-            # OOP Max
-            oop_data = amounts.get("outOfPocket", {})
-            if oop_data:
-                if not financials.oop_max:
-                    financials.oop_max = OOPMax()
-                
-                in_network = oop_data.get("inNetwork")
-                if in_network:
-                    financials.oop_max.individual = MoneyAmount(
-                        total=float(in_network.get("total", 0)),
-                        remaining=float(in_network.get("remaining", 0))
-                    )
-            
-            # Copay
-            copay_data = amounts.get("copay", {})
-            if copay_data:
-                in_network = copay_data.get("inNetwork")
-                if in_network:
-                    financials.copays.append(Copay(
-                        service_type=benefit.get("name", "General"),
-                        amount=float(in_network.get("amount", 0)),
-                        network=NetworkType.IN_NETWORK
-                    ))
-
-            # Coinsurance
-            coins_data = amounts.get("coinsurance", {})
-            if coins_data:
-                in_network = coins_data.get("inNetwork")
-                if in_network:
-                    financials.coinsurance.append(Coinsurance(
-                        service_type=benefit.get("name", "General"),
-                        rate_pct=float(in_network.get("percentage", 0)),
-                        network=NetworkType.IN_NETWORK
-                    ))
+        # Parse financials in one pass over the benefits
+        financials = parse_financials(data.get("benefitsInformation", []))
 
         return VoBResult(
             request_id="req_" + datetime.now().strftime("%Y%m%d%H%M%S"), # Generate a request ID
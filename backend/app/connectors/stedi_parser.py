@@ -0,0 +1,118 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..models.domain import Financials, NetworkType
+
+# Generic "Health Benefit Plan Coverage"; plan-level amounts live here
+PLAN_COVERAGE_STC = "30"
+
+INDIVIDUAL = "individual"
+FAMILY = "family"
+
+_NETWORKS = (("inNetwork", NetworkType.IN_NETWORK.value), ("outOfNetwork", NetworkType.OUT_OF_NETWORK.value))
+
+# (coverage level, network) -> STC -> {"total", "remaining"}
+AccumulatorIndex = Dict[Tuple[str, str], Dict[str, Dict[str, float]]]
+
+
+def coverage_level(benefit: Dict[str, Any]) -> str:
+    """
+    Normalizes coverageLevel / coverageLevelCode ("Family", "FAM", ...).
+    Anything that isn't a family tier counts as individual.
+    """
+    level = benefit.get("coverageLevel") or benefit.get("coverageLevelCode") or ""
+    return FAMILY if level.upper().startswith("FAM") else INDIVIDUAL
+
+
+class BenefitIndex:
+    """
+    The benefits of a 271 indexed in one pass.
+
+    Deductible and out-of-pocket amounts are keyed by coverage level,
+    network and STC; copays and coinsurance keep their response order. Only
+    plain dicts are stored while scanning; `financials()` validates them
+    into the Pydantic models in a single call at the end.
+    """
+
+    def __init__(self):
+        self.deductible: AccumulatorIndex = {}
+        self.out_of_pocket: AccumulatorIndex = {}
+        self.copays: List[Dict[str, Any]] = []
+        self.coinsurance: List[Dict[str, Any]] = []
+
+    @classmethod
+    def from_benefits(cls, benefits: Iterable[Dict[str, Any]]) -> "BenefitIndex":
+        index = cls()
+        for benefit in benefits:
+            index.add(benefit)
+        return index
+
+    def add(self, benefit: Dict[str, Any]) -> None:
+        amounts = benefit.get("amounts")
+        if not amounts:
+            return
+        stc = benefit.get("code") or PLAN_COVERAGE_STC
+        level = coverage_level(benefit)
+        name = benefit.get("name", "General")
+
+        deductible = amounts.get("deductible")
+        if deductible:
+            self._add_accumulator(self.deductible, deductible, level, stc)
+        out_of_pocket = amounts.get("outOfPocket")
+        if out_of_pocket:
+            self._add_accumulator(self.out_of_pocket, out_of_pocket, level, stc)
+
+        copay = amounts.get("copay")
+        if copay:
+            for key, network in _NETWORKS:
+                value = copay.get(key)
+                if value:
+                    self.copays.append({"service_type": name, "amount": float(value.get("amount", 0)), "network": network})
+        coinsurance = amounts.get("coinsurance")
+        if coinsurance:
+            for key, network in _NETWORKS:
+                value = coinsurance.get(key)
+                if value:
+                    self.coinsurance.append(
+                        {"service_type": name, "rate_pct": float(value.get("percentage", 0)), "network": network}
+                    )
+
+    @staticmethod
+    def _add_accumulator(index: AccumulatorIndex, data: Dict[str, Any], level: str, stc: str) -> None:
+        for key, network in _NETWORKS:
+            value = data.get(key)
+            if not value:
+                continue
+            by_stc = index.setdefault((level, network), {})
+            # Re-insert so the most recent entry per STC is also the last one
+            by_stc.pop(stc, None)
+            by_stc[stc] = {"total": float(value.get("total", 0)), "remaining": float(value.get("remaining", 0))}
+
+    def financials(self) -> Financials:
+        in_network, out_of_network = NetworkType.IN_NETWORK.value, NetworkType.OUT_OF_NETWORK.value
+        return Financials.model_validate({
+            "deductible": self._tiers(self.deductible, in_network),
+            "oop_max": self._tiers(self.out_of_pocket, in_network),
+            "deductible_out_of_network": self._tiers(self.deductible, out_of_network),
+            "oop_max_out_of_network": self._tiers(self.out_of_pocket, out_of_network),
+            "copays": self.copays,
+            "coinsurance": self.coinsurance,
+        })
+
+    @classmethod
+    def _tiers(cls, index: AccumulatorIndex, network: str) -> Optional[Dict[str, Any]]:
+        individual = cls._pick(index.get((INDIVIDUAL, network)))
+        family = cls._pick(index.get((FAMILY, network)))
+        if individual is None and family is None:
+            return None
+        return {"individual": individual, "family": family}
+
+    @staticmethod
+    def _pick(by_stc: Optional[Dict[str, Dict[str, float]]]) -> Optional[Dict[str, float]]:
+        # Plan-level amounts win; otherwise the latest service-specific one
+        if not by_stc:
+            return None
+        return by_stc.get(PLAN_COVERAGE_STC) or next(reversed(by_stc.values()))
+
+
+def parse_financials(benefits: Iterable[Dict[str, Any]]) -> Financials:
+    return BenefitIndex.from_benefits(benefits).financials()
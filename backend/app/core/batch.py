@@ -0,0 +1,53 @@
+import asyncio
+import json
+from typing import AsyncIterator, Dict, List
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..models.domain import VoBRequest
+from .router import VoBRouter
+
+
+async def stream_batch(router: VoBRouter, requests: List[VoBRequest], session: AsyncSession) -> AsyncIterator[str]:
+    """
+    Routes a batch of requests concurrently and yields one NDJSON line per
+    input request as soon as its result is ready.
+
+    Identical requests (same cache key) are checked once and the result is
+    emitted for every index that asked for it. The router bounds concurrent
+    calls per channel, so an overnight schedule cannot flood a single upstream.
+    """
+    # Dedupe on the cache key so identical checks share one upstream call
+    indices_by_key: Dict[str, List[int]] = {}
+    unique: Dict[str, VoBRequest] = {}
+    for index, request in enumerate(requests):
+        key = router.cache._generate_key(request)
+        if key not in unique:
+            unique[key] = request
+            indices_by_key[key] = []
+        indices_by_key[key].append(index)
+
+    async def run(key: str, request: VoBRequest):
+        try:
+            routed = await router.route(request, session)
+            return key, {"status": "completed", "channel": routed.channel}, routed.to_json().decode()
+        except Exception as e:
+            # No lookups here: whatever failed (e.g. the payer registry) may fail
+            # again, and one item must never end the stream
+            return key, {"status": "failed", "channel": None, "error": str(e)}, None
+
+    tasks = [asyncio.create_task(run(key, request)) for key, request in unique.items()]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            key, outcome, result_json = await next_done
+            for index in indices_by_key[key]:
+                line = json.dumps({"index": index, **outcome})
+                if result_json is not None:
+                    # Splice in the already-serialized result
+                    line = f'{line[:-1]}, "result": {result_json}}}'
+                yield line + "\n"
+    finally:
+        # Client went away or the stream was closed early
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -1,44 +1,272 @@
-from typing import Optional
+from typing import Optional, Dict, Any, Tuple, Union
+from dataclasses import dataclass
+import asyncio
+import hashlib
 import json
+import time
+import uuid
 from datetime import datetime, timedelta
 from redis import asyncio as aioredis
 from .config import settings
+from .local_cache import LRUCache
+from .cache_policy import CacheTTLPolicy
+from .cache_codec import PayloadCompressor
 from ..models.domain import VoBResult, VoBRequest
 
+# Redis layout: b"v3|<result schema>|<stored_at>|<ttl>|<codec>|<dictionary id>|<body>",
+# where the body is the VoBResult JSON, possibly compressed (see
+# PayloadCompressor). The JSON is served to clients as-is, so entries written
+# against a different VoBResult schema are treated as misses
+CACHE_FORMAT = b"v3"
+# Uncompressed predecessor, still readable
+CACHE_FORMAT_V2 = b"v2"
+RESULT_SCHEMA = hashlib.sha1(
+    json.dumps(VoBResult.model_json_schema(), sort_keys=True).encode()
+).hexdigest()[:8].encode()
+
+@dataclass
+class CacheEntry:
+    payload: bytes  # VoBResult JSON
+    stored_at: float
+    ttl: int
+    _result: Optional[VoBResult] = None
+
+    @property
+    def result(self) -> VoBResult:
+        # Validated on first use only; hits served as JSON never need it
+        if self._result is None:
+            self._result = VoBResult.model_validate_json(self.payload)
+        return self._result
+
+    @property
+    def stale(self) -> bool:
+        return time.time() - self.stored_at > self.ttl
+
+    @property
+    def fresh_seconds_left(self) -> float:
+        return self.stored_at + self.ttl - time.time()
+
 class VoBCache:
+    """
+    Two-tier eligibility cache: an in-process LRU (L1) in front of Redis (L2).
+
+    Entries keep the serialized result, which API responses send as-is; the
+    VoBResult model is only built when a caller reads `entry.result`, and
+    L1 keeps it once built. Writes and invalidations are broadcast over
+    Redis pub/sub so other workers drop their stale L1 copies.
+
+    TTLs come from CacheTTLPolicy. Redis keeps each entry for its TTL plus a
+    stale grace period; lookup() reports entries past their TTL as stale so
+    the caller can serve them while refreshing in the background.
+    """
+
+    INVALIDATION_CHANNEL = "vob:invalidate"
+
     def __init__(self):
         self.redis_url = settings.REDIS_URL
-        self.ttl_seconds = 3600 # 1 hour default
+        self.policy = CacheTTLPolicy.from_settings()
         self.redis = None
         if self.redis_url:
-            self.redis = aioredis.from_url(self.redis_url, decode_responses=True)
+            # Entries are bytes; pub/sub messages are decoded by the listener
+            self.redis = aioredis.from_url(self.redis_url, decode_responses=False)
+
+        self.local = LRUCache(
+            max_entries=settings.VOB_L1_MAX_ENTRIES,
+            max_bytes=settings.VOB_L1_MAX_BYTES,
+            ttl_seconds=settings.VOB_L1_TTL_SECONDS,
+        )
+        self.compressor = PayloadCompressor.from_settings()
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.l2_errors = 0
+        # Bytes written to Redis per key family ("vob:<payer>")
+        self.storage: Dict[str, Dict[str, int]] = {}
+        # Lets the invalidation listener ignore this worker's own messages
+        self.instance_id = uuid.uuid4().hex
 
     async def get(self, request: VoBRequest) -> Optional[VoBResult]:
+        """
+        Returns the cached result, including one that is stale but within
+        its grace period.
+        """
+        entry = await self.lookup(request)
+        return entry.result if entry else None
+
+    async def lookup(self, request: VoBRequest) -> Optional[CacheEntry]:
+        key = self._generate_key(request)
+        entry = self.local.get(key)
+        if entry is not None:
+            return entry
+
         if not self.redis:
             return None
-            
-        key = self._generate_key(request)
+
         try:
             data = await self.redis.get(key)
-            if data:
-                return VoBResult.model_validate_json(data)
+            entry = self._decode(data) if data else None
+            if entry is not None:
+                self.l2_hits += 1
+                if not entry.stale:
+                    # L1 only ever holds fresh entries
+                    self.local.set(key, entry, size=len(entry.payload), ttl_seconds=entry.fresh_seconds_left)
+                return entry
+            self.l2_misses += 1
         except Exception as e:
+            self.l2_errors += 1
             print(f"Cache get error: {e}")
-        
+
         return None
 
     async def set(self, request: VoBRequest, result: VoBResult):
+        key = self._generate_key(request)
+        ttl, grace = self.policy.resolve(request, result)
+        entry = CacheEntry(payload=result.model_dump_json().encode(), stored_at=time.time(), ttl=ttl, _result=result)
+        self.local.set(key, entry, size=len(entry.payload), ttl_seconds=ttl)
+
         if not self.redis:
             return
 
-        key = self._generate_key(request)
         try:
-            # Serialize to JSON
-            data = result.model_dump_json()
-            await self.redis.set(key, data, ex=self.ttl_seconds)
+            data, compressed = self._encode(entry)
+            await self.redis.set(key, data, ex=ttl + grace)
+            self._record_storage(key, len(entry.payload), len(data), compressed)
+            await self._publish_invalidation(key)
         except Exception as e:
+            self.l2_errors += 1
             print(f"Cache set error: {e}")
 
+    async def invalidate(self, request: VoBRequest):
+        key = self._generate_key(request)
+        self.local.delete(key)
+
+        if not self.redis:
+            return
+
+        try:
+            await self.redis.delete(key)
+            await self._publish_invalidation(key)
+        except Exception as e:
+            self.l2_errors += 1
+            print(f"Cache invalidate error: {e}")
+
+    async def listen_for_invalidations(self):
+        """
+        Drops L1 entries written or invalidated by other workers. Runs for the
+        lifetime of the application; reconnects on Redis errors.
+        """
+        if not self.redis:
+            return
+
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = message["data"]
+                    if isinstance(data, bytes):
+                        data = data.decode()
+                    origin, _, key = data.partition("|")
+                    if origin != self.instance_id:
+                        self.local.delete(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Cache invalidation listener error: {e}")
+                # Entries may have changed while disconnected
+                self.local.clear()
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "l1": self.local.stats(),
+            "l2": {
+                "enabled": self.redis is not None,
+                "hits": self.l2_hits,
+                "misses": self.l2_misses,
+                "errors": self.l2_errors,
+            },
+            "storage": self.storage_stats(),
+        }
+
+    def storage_stats(self) -> Dict[str, Any]:
+        """
+        Write-side size accounting: payload bytes before compression against
+        bytes sent to Redis (header included), per key family and overall.
+        """
+        def summarize(counts: Dict[str, int]) -> Dict[str, Any]:
+            stored = counts["stored_bytes"]
+            return {**counts, "compression_ratio": round(counts["raw_bytes"] / stored, 2) if stored else None}
+
+        total = {"writes": 0, "compressed_writes": 0, "raw_bytes": 0, "stored_bytes": 0}
+        for counts in self.storage.values():
+            for name in total:
+                total[name] += counts[name]
+        return {
+            "codec": self.compressor.codec,
+            "dictionary_id": self.compressor.dict_id.decode(),
+            "min_bytes": self.compressor.min_bytes,
+            "total": summarize(total),
+            "families": {family: summarize(counts) for family, counts in sorted(self.storage.items())},
+        }
+
+    def _record_storage(self, key: str, raw_bytes: int, stored_bytes: int, compressed: bool) -> None:
+        family = ":".join(key.split(":", 2)[:2])
+        counts = self.storage.get(family)
+        if counts is None:
+            counts = self.storage[family] = {"writes": 0, "compressed_writes": 0, "raw_bytes": 0, "stored_bytes": 0}
+        counts["writes"] += 1
+        counts["compressed_writes"] += compressed
+        counts["raw_bytes"] += raw_bytes
+        counts["stored_bytes"] += stored_bytes
+
+    def _encode(self, entry: CacheEntry) -> Tuple[bytes, bool]:
+        """
+        Returns the Redis value and whether the payload was compressed.
+        """
+        codec, dict_id, body = self.compressor.compress(entry.payload)
+        # Header carries the write time so readers can tell fresh from stale
+        header = b"%s|%s|%.6f|%d|%s|%s|" % (CACHE_FORMAT, RESULT_SCHEMA, entry.stored_at, entry.ttl, codec, dict_id)
+        return header + body, body is not entry.payload
+
+    def _decode(self, data: Union[bytes, str]) -> Optional[CacheEntry]:
+        if isinstance(data, str):
+            data = data.encode()
+        if data.startswith(CACHE_FORMAT + b"|"):
+            _, schema, stored_at, ttl, codec, dict_id, body = data.split(b"|", 6)
+            if schema != RESULT_SCHEMA:
+                return None
+            payload = self.compressor.decompress(codec, dict_id, body)
+            if payload is None:
+                return None
+            return CacheEntry(payload=payload, stored_at=float(stored_at), ttl=int(ttl))
+        if data.startswith(CACHE_FORMAT_V2 + b"|"):
+            _, schema, stored_at, ttl, payload = data.split(b"|", 4)
+            if schema != RESULT_SCHEMA:
+                return None
+            return CacheEntry(payload=payload, stored_at=float(stored_at), ttl=int(ttl))
+        return self._decode_legacy(data)
+
+    def _decode_legacy(self, data: bytes) -> CacheEntry:
+        # JSON envelopes, and bare results written before envelopes; these
+        # are validated once and re-serialized in the current shape
+        payload = json.loads(data)
+        if "data" not in payload:
+            # Redis expiry still governs bare results
+            result, stored_at, ttl = VoBResult.model_validate(payload), time.time(), self.policy.default_ttl
+        else:
+            result, stored_at, ttl = VoBResult.model_validate(payload["data"]), payload["stored_at"], payload["ttl"]
+        return CacheEntry(payload=result.model_dump_json().encode(), stored_at=stored_at, ttl=ttl, _result=result)
+
+    async def _publish_invalidation(self, key: str):
+        await self.redis.publish(self.INVALIDATION_CHANNEL, f"{self.instance_id}|{key}")
+
     def _generate_key(self, request: VoBRequest) -> str:
         # Generate a unique key based on request parameters
         # e.g. "vob:{payer_id}:{member_id}:{dob}"
@@ -52,5 +280,5 @@ class VoBCache:
         if request.services:
             cpts = sorted([s.cpt for s in request.services])
             components.append("-".join(cpts))
-            
+
         return f"vob:{':'.join(str(c) for c in components)}"
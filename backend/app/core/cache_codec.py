@@ -0,0 +1,86 @@
+import zlib
+from typing import Optional, Tuple
+
+from .config import settings
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None  # Only needed for VOB_CACHE_COMPRESSION=zstd
+
+RAW = b"raw"
+ZSTD = b"zstd"
+ZLIB = b"zlib"
+NO_DICTIONARY = b"0"
+
+
+class PayloadCompressor:
+    """
+    Compresses cache payloads at or above `min_bytes` with zstd or zlib.
+
+    zstd can use a dictionary trained on real VoB results (see
+    scripts/train_cache_dictionary.py), which is what makes small JSON
+    payloads compress well. Every entry records its codec and dictionary id,
+    so changing either only turns old entries into misses; it never
+    misreads them. Small payloads are stored raw.
+    """
+
+    def __init__(self, codec: str = "none", min_bytes: int = 512, level: int = 3, dictionary: Optional[bytes] = None):
+        self.codec = codec.lower()
+        self.min_bytes = min_bytes
+        self.level = level
+        self.dict_id = NO_DICTIONARY
+        self._zstd_dict = None
+
+        if self.codec == "zstd" and zstandard is None:
+            print("VOB_CACHE_COMPRESSION=zstd but the zstandard package is not installed; storing raw")
+            self.codec = "none"
+        if self.codec not in ("none", "zstd", "zlib"):
+            print(f"Unknown cache compression codec {codec!r}; storing raw")
+            self.codec = "none"
+
+        if zstandard is not None:
+            if dictionary and self.codec == "zstd":
+                self._zstd_dict = zstandard.ZstdCompressionDict(dictionary)
+                self.dict_id = str(self._zstd_dict.dict_id()).encode()
+            self._compressor = zstandard.ZstdCompressor(level=level, dict_data=self._zstd_dict)
+            self._decompressor = zstandard.ZstdDecompressor(dict_data=self._zstd_dict)
+
+    @classmethod
+    def from_settings(cls) -> "PayloadCompressor":
+        dictionary = None
+        if settings.VOB_CACHE_DICTIONARY_PATH:
+            try:
+                with open(settings.VOB_CACHE_DICTIONARY_PATH, "rb") as f:
+                    dictionary = f.read()
+            except OSError as e:
+                print(f"Cache dictionary unavailable, compressing without it: {e}")
+        return cls(
+            codec=settings.VOB_CACHE_COMPRESSION,
+            min_bytes=settings.VOB_CACHE_COMPRESSION_MIN_BYTES,
+            level=settings.VOB_CACHE_COMPRESSION_LEVEL,
+            dictionary=dictionary,
+        )
+
+    def compress(self, payload: bytes) -> Tuple[bytes, bytes, bytes]:
+        """
+        Returns (codec, dictionary id, body).
+        """
+        if self.codec == "none" or len(payload) < self.min_bytes:
+            return RAW, NO_DICTIONARY, payload
+        if self.codec == "zstd":
+            return ZSTD, self.dict_id, self._compressor.compress(payload)
+        return ZLIB, NO_DICTIONARY, zlib.compress(payload, self.level)
+
+    def decompress(self, codec: bytes, dict_id: bytes, body: bytes) -> Optional[bytes]:
+        """
+        Returns the payload, or None if this process can't read the entry
+        (different dictionary, or zstd isn't installed).
+        """
+        if codec == RAW:
+            return body
+        if codec == ZLIB:
+            return zlib.decompress(body)
+        if codec == ZSTD and zstandard is not None and dict_id == self.dict_id:
+            return self._decompressor.decompress(body)
+        return None
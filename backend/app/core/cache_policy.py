@@ -0,0 +1,61 @@
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from .config import settings
+from ..models.domain import VoBRequest, VoBResult
+
+
+class CacheTTLPolicy:
+    """
+    Resolves how long a VoBResult stays fresh in the cache and how long it may
+    be served stale while a refresh runs in the background.
+
+    Base TTL comes from the payer override, else the channel rule (RPA results
+    are expensive, so they live longer), else the default. A coverage-status
+    rule can only shorten it, e.g. inactive results expire sooner.
+
+    Configured from VOB_CACHE_TTL_POLICY (JSON), for example:
+        {"default": 3600, "grace": 300,
+         "channel": {"rpa": 14400},
+         "coverage_status": {"inactive": 900, "unknown": 300},
+         "payers": {"60054": {"ttl": 7200, "grace": 600}}}
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or {}
+        self.default_ttl = int(config.get("default", settings.VOB_CACHE_TTL_SECONDS))
+        self.default_grace = int(config.get("grace", settings.VOB_CACHE_STALE_GRACE_SECONDS))
+        self.channel_ttls: Dict[str, int] = config.get("channel", {"rpa": self.default_ttl * 4})
+        self.status_ttls: Dict[str, int] = config.get("coverage_status", {"inactive": 900, "unknown": 300})
+        self.payer_overrides: Dict[str, Dict[str, int]] = config.get("payers", {})
+
+    @classmethod
+    def from_settings(cls) -> "CacheTTLPolicy":
+        raw = settings.VOB_CACHE_TTL_POLICY
+        if not raw:
+            return cls()
+        try:
+            return cls(json.loads(raw))
+        except (ValueError, TypeError) as e:
+            print(f"Invalid VOB_CACHE_TTL_POLICY, using defaults: {e}")
+            return cls()
+
+    def resolve(self, request: VoBRequest, result: VoBResult) -> Tuple[int, int]:
+        """
+        Returns (ttl_seconds, stale_grace_seconds) for a result.
+        """
+        payer = self.payer_overrides.get(request.payer.payer_code_hint or "") \
+            or self.payer_overrides.get(request.payer.name) \
+            or {}
+
+        if "ttl" in payer:
+            ttl = int(payer["ttl"])
+        else:
+            ttl = int(self.channel_ttls.get(result.source.value, self.default_ttl))
+
+        status_ttl = self.status_ttls.get(result.coverage_status.value)
+        if status_ttl is not None:
+            ttl = min(ttl, int(status_ttl))
+
+        grace = int(payer.get("grace", self.default_grace))
+        return ttl, grace
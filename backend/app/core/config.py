@@ -1,4 +1,5 @@
 import os
+import json
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,6 +11,11 @@ class Settings:
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./database.db")
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    # Async engine pool (ignored for SQLite)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
     
     # App Settings
     DEMO_MODE: bool = os.getenv("DEMO_MODE", "False").lower() == "true"
@@ -17,6 +23,100 @@ class Settings:
     # Stedi
     STEDI_API_KEY: str = os.getenv("STEDI_API_KEY", "")
     STEDI_BASE_URL: str = "https://healthcare.us.stedi.com/2024-04-01/change/medicalnetwork/eligibility/v3"
+    STEDI_TIMEOUT_SECONDS: float = float(os.getenv("STEDI_TIMEOUT_SECONDS", "30"))
+    STEDI_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("STEDI_CONNECT_TIMEOUT_SECONDS", "5"))
+    STEDI_HTTP_MAX_CONNECTIONS: int = int(os.getenv("STEDI_HTTP_MAX_CONNECTIONS", "100"))
+    STEDI_HTTP_MAX_KEEPALIVE: int = int(os.getenv("STEDI_HTTP_MAX_KEEPALIVE", "20"))
+    STEDI_HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("STEDI_HTTP_KEEPALIVE_EXPIRY", "30"))
+    STEDI_HTTP2: bool = os.getenv("STEDI_HTTP2", "True").lower() == "true"
+    # STCs per 270; larger sets are split into concurrent requests.
+    # STEDI_MAX_STCS_BY_PAYER is JSON keyed by trading partner id, e.g. {"60054": 1}
+    STEDI_MAX_STCS_PER_REQUEST: int = int(os.getenv("STEDI_MAX_STCS_PER_REQUEST", "10"))
+    STEDI_MAX_STCS_BY_PAYER: dict = json.loads(os.getenv("STEDI_MAX_STCS_BY_PAYER", "{}"))
+    # Token buckets (requests/second and burst) per API key and per trading
+    # partner; STEDI_PARTNER_RATE_LIMITS is JSON, e.g. {"60054": [1, 2]}
+    STEDI_RATE_LIMIT_PER_SECOND: float = float(os.getenv("STEDI_RATE_LIMIT_PER_SECOND", "10"))
+    STEDI_RATE_LIMIT_BURST: float = float(os.getenv("STEDI_RATE_LIMIT_BURST", "20"))
+    STEDI_PARTNER_RATE_LIMIT_PER_SECOND: float = float(os.getenv("STEDI_PARTNER_RATE_LIMIT_PER_SECOND", "5"))
+    STEDI_PARTNER_RATE_LIMIT_BURST: float = float(os.getenv("STEDI_PARTNER_RATE_LIMIT_BURST", "5"))
+    STEDI_PARTNER_RATE_LIMITS: dict = json.loads(os.getenv("STEDI_PARTNER_RATE_LIMITS", "{}"))
+    STEDI_RATE_LIMIT_MAX_WAIT_SECONDS: float = float(os.getenv("STEDI_RATE_LIMIT_MAX_WAIT_SECONDS", "30"))
+    STEDI_MAX_429_RETRIES: int = int(os.getenv("STEDI_MAX_429_RETRIES", "2"))
+
+    # Eligibility cache TTLs (see CacheTTLPolicy for the JSON policy format)
+    VOB_CACHE_TTL_SECONDS: int = int(os.getenv("VOB_CACHE_TTL_SECONDS", "3600"))
+    VOB_CACHE_STALE_GRACE_SECONDS: int = int(os.getenv("VOB_CACHE_STALE_GRACE_SECONDS", "0"))
+    VOB_CACHE_TTL_POLICY: str = os.getenv("VOB_CACHE_TTL_POLICY", "")
+    # Payload compression in Redis: "none", "zstd" (needs zstandard) or "zlib".
+    # The dictionary comes from scripts/train_cache_dictionary.py (zstd only)
+    VOB_CACHE_COMPRESSION: str = os.getenv("VOB_CACHE_COMPRESSION", "none")
+    VOB_CACHE_COMPRESSION_MIN_BYTES: int = int(os.getenv("VOB_CACHE_COMPRESSION_MIN_BYTES", "512"))
+    VOB_CACHE_COMPRESSION_LEVEL: int = int(os.getenv("VOB_CACHE_COMPRESSION_LEVEL", "3"))
+    VOB_CACHE_DICTIONARY_PATH: str = os.getenv("VOB_CACHE_DICTIONARY_PATH", "")
+
+    # In-process L1 cache in front of Redis
+    VOB_L1_MAX_ENTRIES: int = int(os.getenv("VOB_L1_MAX_ENTRIES", "10000"))
+    VOB_L1_MAX_BYTES: int = int(os.getenv("VOB_L1_MAX_BYTES", str(64 * 1024 * 1024)))
+    VOB_L1_TTL_SECONDS: float = float(os.getenv("VOB_L1_TTL_SECONDS", "60"))
+
+    # Request coalescing (set DISTRIBUTED to coalesce across workers via Redis locks)
+    VOB_SINGLEFLIGHT_DISTRIBUTED: bool = os.getenv("VOB_SINGLEFLIGHT_DISTRIBUTED", "False").lower() == "true"
+    VOB_SINGLEFLIGHT_LOCK_TTL_SECONDS: float = float(os.getenv("VOB_SINGLEFLIGHT_LOCK_TTL_SECONDS", "60"))
+
+    # How often each process checks payer_config for changes
+    PAYER_REGISTRY_REFRESH_SECONDS: float = float(os.getenv("PAYER_REGISTRY_REFRESH_SECONDS", "30"))
+
+    # Adaptive routing from live channel telemetry
+    VOB_ADAPTIVE_ROUTING: bool = os.getenv("VOB_ADAPTIVE_ROUTING", "True").lower() == "true"
+    VOB_UNHEALTHY_FAILURE_RATE: float = float(os.getenv("VOB_UNHEALTHY_FAILURE_RATE", "0.5"))
+    VOB_TELEMETRY_EWMA_ALPHA: float = float(os.getenv("VOB_TELEMETRY_EWMA_ALPHA", "0.2"))
+    VOB_TELEMETRY_MIN_SAMPLES: int = int(os.getenv("VOB_TELEMETRY_MIN_SAMPLES", "5"))
+    VOB_TELEMETRY_STALE_SECONDS: float = float(os.getenv("VOB_TELEMETRY_STALE_SECONDS", "300"))
+    VOB_TELEMETRY_PERSIST_SECONDS: float = float(os.getenv("VOB_TELEMETRY_PERSIST_SECONDS", "60"))
+
+    # Hedged requests (opt-in per payer via PayerConfig.hedge_enabled)
+    VOB_HEDGING_ENABLED: bool = os.getenv("VOB_HEDGING_ENABLED", "True").lower() == "true"
+    VOB_HEDGE_PERCENTILE: float = float(os.getenv("VOB_HEDGE_PERCENTILE", "95"))
+    VOB_HEDGE_DEFAULT_DELAY_MS: int = int(os.getenv("VOB_HEDGE_DEFAULT_DELAY_MS", "5000"))
+    VOB_HEDGE_MIN_DELAY_MS: int = int(os.getenv("VOB_HEDGE_MIN_DELAY_MS", "250"))
+
+    # Per-payer circuit breakers and upstream concurrency caps
+    VOB_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("VOB_BREAKER_FAILURE_THRESHOLD", "5"))
+    VOB_BREAKER_RECOVERY_SECONDS: float = float(os.getenv("VOB_BREAKER_RECOVERY_SECONDS", "30"))
+    VOB_BREAKER_HALF_OPEN_CALLS: int = int(os.getenv("VOB_BREAKER_HALF_OPEN_CALLS", "1"))
+    VOB_PAYER_MAX_CONCURRENCY: int = int(os.getenv("VOB_PAYER_MAX_CONCURRENCY", "10"))
+
+    # Batch eligibility
+    VOB_BATCH_MAX_SIZE: int = int(os.getenv("VOB_BATCH_MAX_SIZE", "1000"))
+
+    # Async job queue ("worker": standalone `python -m app.worker`; "inline": run in the API process)
+    JOB_QUEUE_MODE: str = os.getenv("JOB_QUEUE_MODE", "worker")
+    JOB_WORKER_CONCURRENCY: int = int(os.getenv("JOB_WORKER_CONCURRENCY", "4"))
+    JOB_POLL_INTERVAL_SECONDS: float = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1"))
+    JOB_VISIBILITY_TIMEOUT_SECONDS: float = float(os.getenv("JOB_VISIBILITY_TIMEOUT_SECONDS", "300"))
+    JOB_RETRY_BACKOFF_SECONDS: float = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "10"))
+    # How long a finished job's status is served from the progress store
+    JOB_PROGRESS_TERMINAL_TTL_SECONDS: float = float(os.getenv("JOB_PROGRESS_TERMINAL_TTL_SECONDS", "300"))
+
+    # Multi-job status and progress streaming
+    JOB_STATUS_MAX_IDS: int = int(os.getenv("JOB_STATUS_MAX_IDS", "500"))
+    JOB_STREAM_RESYNC_SECONDS: float = float(os.getenv("JOB_STREAM_RESYNC_SECONDS", "15"))
+    JOB_STREAM_MAX_SECONDS: float = float(os.getenv("JOB_STREAM_MAX_SECONDS", "1800"))
+
+    # Webhook delivery of finished async jobs. Callbacks are refused unless a
+    # signing secret is set and the https host is in the allowlist
+    # (exact hosts, or "*.example.com" for subdomains).
+    WEBHOOK_SIGNING_SECRET: str = os.getenv("WEBHOOK_SIGNING_SECRET", "")
+    WEBHOOK_ALLOWED_HOSTS: list = json.loads(os.getenv("WEBHOOK_ALLOWED_HOSTS", "[]"))
+    WEBHOOK_CONCURRENCY: int = int(os.getenv("WEBHOOK_CONCURRENCY", "8"))
+    WEBHOOK_MAX_ATTEMPTS: int = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "8"))
+    WEBHOOK_RETRY_BACKOFF_SECONDS: float = float(os.getenv("WEBHOOK_RETRY_BACKOFF_SECONDS", "30"))
+    WEBHOOK_TIMEOUT_SECONDS: float = float(os.getenv("WEBHOOK_TIMEOUT_SECONDS", "10"))
+    WEBHOOK_POLL_INTERVAL_SECONDS: float = float(os.getenv("WEBHOOK_POLL_INTERVAL_SECONDS", "1"))
+
+    # CPT → STC mapping tables (defaults to app/data/stc_mappings.json)
+    STC_MAPPINGS_PATH: str = os.getenv("STC_MAPPINGS_PATH", "")
+    STC_MAPPINGS_RELOAD_SECONDS: float = float(os.getenv("STC_MAPPINGS_RELOAD_SECONDS", "30"))
 
     # Browserbase
     BROWSERBASE_PROJECT_ID: str = os.getenv("BROWSERBASE_PROJECT_ID", "")
@@ -24,6 +124,27 @@ class Settings:
     
     # RPA
     RPA_PORTAL_URL: str = os.getenv("RPA_PORTAL_URL", "http://localhost:5001")
+    RPA_BROWSER_POOL_ENABLED: bool = os.getenv("RPA_BROWSER_POOL_ENABLED", "True").lower() == "true"
+    RPA_BROWSER_POOL_SIZE: int = int(os.getenv("RPA_BROWSER_POOL_SIZE", "2"))
+    RPA_CONTEXTS_PER_BROWSER: int = int(os.getenv("RPA_CONTEXTS_PER_BROWSER", "4"))
+    RPA_BROWSER_MAX_USES: int = int(os.getenv("RPA_BROWSER_MAX_USES", "100"))
+    RPA_POOL_MAX_QUEUE: int = int(os.getenv("RPA_POOL_MAX_QUEUE", "50"))
+    RPA_POOL_ACQUIRE_TIMEOUT_SECONDS: float = float(os.getenv("RPA_POOL_ACQUIRE_TIMEOUT_SECONDS", "30"))
+    RPA_SESSION_TTL_SECONDS: int = int(os.getenv("RPA_SESSION_TTL_SECONDS", "1800"))
+    RPA_SESSION_STORE_REDIS: bool = os.getenv("RPA_SESSION_STORE_REDIS", "False").lower() == "true"
+    # Keys saved sessions by an HMAC of the portal credentials. Set it (the same
+    # on every worker) to share sessions through Redis; unset, each process
+    # uses a random key and only reuses its own logins.
+    RPA_SESSION_KEY_SECRET: str = os.getenv("RPA_SESSION_KEY_SECRET", "")
+
+    # Process-wide caps on concurrent connector calls per channel (sync checks,
+    # jobs and batches alike), applied where the router calls the connector.
+    # RPA defaults to the warm browser pool's capacity.
+    VOB_CHANNEL_CONCURRENCY_STEDI: int = int(os.getenv("VOB_CHANNEL_CONCURRENCY_STEDI", "10"))
+    VOB_CHANNEL_CONCURRENCY_RPA: int = int(os.getenv(
+        "VOB_CHANNEL_CONCURRENCY_RPA", str(RPA_BROWSER_POOL_SIZE * RPA_CONTEXTS_PER_BROWSER)
+    ))
+    VOB_CHANNEL_CONCURRENCY_MOCK: int = int(os.getenv("VOB_CHANNEL_CONCURRENCY_MOCK", "50"))
 
     # LLM (Claude)
     ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
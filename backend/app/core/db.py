@@ -1,12 +1,48 @@
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from .config import settings
 
-connect_args = {"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
+is_sqlite = settings.DATABASE_URL.startswith("sqlite")
+
+# Sync engine: table creation, migrations and scripts
+connect_args = {"check_same_thread": False} if is_sqlite else {}
 engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
 
+def async_database_url(url: str) -> str:
+    """
+    Maps DATABASE_URL onto its async driver (aiosqlite / asyncpg).
+    """
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    for prefix in ("postgresql+psycopg2:", "postgresql:", "postgres:"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg:" + url[len(prefix):]
+    return url
+
+def _async_engine_options() -> dict:
+    if is_sqlite:
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": True,
+    }
+
+# Async engine: everything on the request and job paths, so DB round trips
+# don't block the event loop while connector calls are in flight
+async_engine = create_async_engine(async_database_url(settings.DATABASE_URL), **_async_engine_options())
+async_session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+async def get_async_session():
+    async with async_session_factory() as session:
+        yield session
@@ -0,0 +1,110 @@
+import logging
+from typing import Any, Dict, Optional
+
+import httpx
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    HTTP2_AVAILABLE = False
+
+
+class HTTPClientPool:
+    """
+    Process-wide pooled httpx.AsyncClient.
+
+    Started on application startup and closed on shutdown so every outbound
+    call reuses warm keep-alive (and, where available, HTTP/2) connections
+    instead of paying a TCP + TLS handshake per request.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+    ):
+        self.name = name
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.http2 = http2 and HTTP2_AVAILABLE
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning(f"HTTP/2 requested for {name} pool but 'h2' is not installed; using HTTP/1.1")
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self) -> None:
+        self._ensure_client()
+
+    async def close(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Returns the shared client, creating it lazily when used outside the
+        application lifecycle (scripts, tests).
+        """
+        return self._ensure_client()
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+            )
+        return self._client
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Pool metrics: connections in use, idle connections and requests
+        waiting for a connection.
+        """
+        stats = {
+            "open": self._client is not None and not self._client.is_closed,
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "in_use": 0,
+            "idle": 0,
+            "waiters": 0,
+        }
+        if not stats["open"]:
+            return stats
+
+        # httpx does not expose pool state publicly; read it from httpcore.
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        if pool is None:
+            return stats
+
+        connections = list(getattr(pool, "connections", []))
+        idle = sum(1 for c in connections if c.is_idle())
+        stats["idle"] = idle
+        stats["in_use"] = len(connections) - idle
+        stats["waiters"] = sum(1 for r in list(getattr(pool, "_requests", [])) if r.is_queued())
+        return stats
+
+
+stedi_http_pool = HTTPClientPool(
+    name="stedi",
+    max_connections=settings.STEDI_HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.STEDI_HTTP_MAX_KEEPALIVE,
+    keepalive_expiry=settings.STEDI_HTTP_KEEPALIVE_EXPIRY,
+    http2=settings.STEDI_HTTP2,
+    timeout=settings.STEDI_TIMEOUT_SECONDS,
+    connect_timeout=settings.STEDI_CONNECT_TIMEOUT_SECONDS,
+)
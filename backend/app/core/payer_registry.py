@@ -0,0 +1,84 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..models.sql import PayerConfig
+from .db import async_session_factory
+
+
+class PayerRegistry:
+    """
+    In-memory copy of the payer_config table, keyed by payer name and by
+    Stedi payer code, so routing a request is a dict lookup instead of a
+    database round trip.
+
+    Loaded on first use (or explicitly at startup) and reloaded when the
+    table's version changes. The version is the row count plus the latest
+    `updated_at`, so anything editing a PayerConfig must bump `updated_at`.
+    """
+
+    def __init__(self, session_factory=async_session_factory):
+        self.session_factory = session_factory
+        self._by_name: Dict[str, PayerConfig] = {}
+        self._by_code: Dict[str, PayerConfig] = {}
+        self._version: Optional[Tuple] = None
+        self.loaded = False
+
+    async def lookup(self, name: Optional[str], payer_code: Optional[str] = None) -> Optional[PayerConfig]:
+        if not self.loaded:
+            await self.load()
+        payer_config = self._by_name.get(name) if name else None
+        if payer_config is None and payer_code:
+            payer_config = self._by_code.get(payer_code)
+        return payer_config
+
+    async def all(self) -> List[PayerConfig]:
+        if not self.loaded:
+            await self.load()
+        return list(self._by_name.values())
+
+    async def load(self) -> None:
+        async with self.session_factory() as session:
+            version = await self._current_version(session)
+            payer_configs = (await session.exec(select(PayerConfig))).all()
+
+        by_name: Dict[str, PayerConfig] = {}
+        by_code: Dict[str, PayerConfig] = {}
+        for payer_config in payer_configs:
+            by_name.setdefault(payer_config.name, payer_config)
+            if payer_config.stedi_payer_code:
+                by_code.setdefault(payer_config.stedi_payer_code, payer_config)
+
+        # Swap whole dicts so readers never see a half-built registry
+        self._by_name, self._by_code = by_name, by_code
+        self._version = version
+        self.loaded = True
+
+    async def refresh_if_changed(self) -> bool:
+        async with self.session_factory() as session:
+            version = await self._current_version(session)
+        if self.loaded and version == self._version:
+            return False
+        await self.load()
+        return True
+
+    async def run_refresh_loop(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                if await self.refresh_if_changed():
+                    print(f"Payer registry reloaded ({len(self._by_name)} payers)")
+            except Exception as e:
+                print(f"Payer registry refresh error: {e}")
+
+    async def _current_version(self, session: AsyncSession) -> Tuple:
+        count, last_updated = (await session.exec(
+            select(func.count(PayerConfig.id), func.max(PayerConfig.updated_at))
+        )).one()
+        return count, last_updated
+
+
+payer_registry = PayerRegistry()
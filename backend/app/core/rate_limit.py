@@ -0,0 +1,183 @@
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+from redis import asyncio as aioredis
+
+from .config import settings
+from .resilience import LocalConnectorError
+
+
+class RateLimitExceeded(LocalConnectorError):
+    """
+    Raised when a call would have to wait longer than the limiter allows.
+    """
+
+    def __init__(self, bucket: str, wait_seconds: float):
+        super().__init__(f"Rate limit for {bucket} requires a {wait_seconds:.1f}s wait")
+        self.bucket = bucket
+        self.wait_seconds = wait_seconds
+
+
+# Reserves one token and returns how long the caller must wait for it.
+# Tokens may go negative, which queues callers in arrival order instead of
+# having them race on retry. A 429 Retry-After is stored as blocked_until.
+# Returns the wait as a string because Redis truncates Lua numbers to ints.
+_RESERVE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local max_wait = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'blocked_until')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+local blocked_until = tonumber(state[3]) or 0
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = math.max(0, (1 - tokens) / rate, blocked_until - now)
+if wait > max_wait then
+    return {'0', tostring(wait)}
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens - 1), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate + max_wait) + 60)
+return {'1', tostring(wait)}
+"""
+
+_BLOCK_SCRIPT = """
+local t = redis.call('TIME')
+local until_ts = tonumber(t[1]) + tonumber(t[2]) / 1000000 + tonumber(ARGV[1])
+local current = tonumber(redis.call('HGET', KEYS[1], 'blocked_until')) or 0
+if until_ts > current then
+    redis.call('HSET', KEYS[1], 'blocked_until', tostring(until_ts))
+    redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[1])) + 60)
+end
+return 1
+"""
+
+
+class TokenBucketLimiter:
+    """
+    Token-bucket rate limiter shared across workers through Redis.
+
+    Each bucket refills at `rate` tokens per second up to `capacity`.
+    `acquire` reserves a token and sleeps until it is due, so bursts are
+    queued rather than rejected; only a wait longer than `max_wait_seconds`
+    raises RateLimitExceeded. If Redis is unavailable the limiter falls back
+    to per-process buckets (limits then apply per worker, not globally)
+    and retries Redis after a short cooldown.
+    """
+
+    KEY_PREFIX = "ratelimit:"
+    REDIS_RETRY_SECONDS = 30.0
+
+    def __init__(self, redis=None, max_wait_seconds: float = 30.0):
+        self.redis = redis
+        self.max_wait_seconds = max_wait_seconds
+        # bucket -> (tokens, updated_at, blocked_until), on time.monotonic
+        self._local: Dict[str, Tuple[float, float, float]] = {}
+        self._redis_retry_at = 0.0
+        self.throttled_calls = 0
+        self.throttled_wait_seconds = 0.0
+        self.max_throttled_wait_seconds = 0.0
+        self.rejected_calls = 0
+        self.upstream_429s = 0
+
+    async def acquire(self, bucket: str, rate: float, capacity: float) -> float:
+        """
+        Waits for a token from `bucket`. Returns the seconds spent waiting.
+        """
+        if rate <= 0:
+            return 0.0
+        granted, wait = await self._reserve(bucket, rate, max(capacity, 1.0))
+        if not granted:
+            self.rejected_calls += 1
+            raise RateLimitExceeded(bucket, wait)
+        if wait > 0:
+            self.throttled_calls += 1
+            self.throttled_wait_seconds += wait
+            self.max_throttled_wait_seconds = max(self.max_throttled_wait_seconds, wait)
+            await asyncio.sleep(wait)
+        return wait
+
+    async def block(self, bucket: str, seconds: float) -> None:
+        """
+        Holds every caller of `bucket` back for `seconds` (e.g. after a 429).
+        """
+        self.upstream_429s += 1
+        if seconds <= 0:
+            return
+        if self._redis_usable():
+            try:
+                await self.redis.eval(_BLOCK_SCRIPT, 1, self.KEY_PREFIX + bucket, seconds)
+                return
+            except Exception as e:
+                self._redis_failed(e)
+        tokens, updated_at, blocked_until = self._local.get(bucket, (None, time.monotonic(), 0.0))
+        self._local[bucket] = (tokens, updated_at, max(blocked_until, time.monotonic() + seconds))
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "backend": "redis" if self._redis_usable() else "local",
+            "throttled_calls": self.throttled_calls,
+            "throttled_wait_seconds": round(self.throttled_wait_seconds, 3),
+            "max_throttled_wait_seconds": round(self.max_throttled_wait_seconds, 3),
+            "rejected_calls": self.rejected_calls,
+            "upstream_429s": self.upstream_429s,
+        }
+
+    async def _reserve(self, bucket: str, rate: float, capacity: float) -> Tuple[bool, float]:
+        if self._redis_usable():
+            try:
+                granted, wait = await self.redis.eval(
+                    _RESERVE_SCRIPT, 1, self.KEY_PREFIX + bucket, rate, capacity, self.max_wait_seconds
+                )
+                return _as_str(granted) == "1", float(_as_str(wait))
+            except Exception as e:
+                self._redis_failed(e)
+        return self._reserve_local(bucket, rate, capacity)
+
+    def _reserve_local(self, bucket: str, rate: float, capacity: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated_at, blocked_until = self._local.get(bucket, (None, now, 0.0))
+        if tokens is None:
+            tokens = capacity
+        tokens = min(capacity, tokens + max(0.0, now - updated_at) * rate)
+        wait = max(0.0, (1 - tokens) / rate, blocked_until - now)
+        if wait > self.max_wait_seconds:
+            return False, wait
+        self._local[bucket] = (tokens - 1, now, blocked_until)
+        return True, wait
+
+    def _redis_usable(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._redis_retry_at
+
+    def _redis_failed(self, error: Exception) -> None:
+        print(f"Rate limiter Redis error, using local buckets: {error}")
+        self._redis_retry_at = time.monotonic() + self.REDIS_RETRY_SECONDS
+
+
+def _as_str(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def parse_retry_after(value: Optional[str], default: float) -> float:
+    """
+    Parses a Retry-After header given as delta-seconds or an HTTP date.
+    """
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+stedi_rate_limiter = TokenBucketLimiter(
+    redis=aioredis.from_url(settings.REDIS_URL, decode_responses=True) if settings.REDIS_URL else None,
+    max_wait_seconds=settings.STEDI_RATE_LIMIT_MAX_WAIT_SECONDS,
+)
@@ -0,0 +1,171 @@
+import asyncio
+import time
+from enum import Enum
+from typing import Awaitable, Callable, Dict, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class LocalConnectorError(Exception):
+    """
+    Raised by a connector before it reaches the upstream: local capacity is
+    exhausted or the connector isn't configured. Says nothing about the
+    payer's health, so it never counts against a circuit breaker.
+    """
+
+
+class ConnectorNotConfigured(LocalConnectorError, ValueError):
+    pass
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a connector whose circuit is open.
+    """
+
+    def __init__(self, payer: str, channel: str, retry_after: float):
+        super().__init__(f"Circuit open for {payer} via {channel}; retry in {retry_after:.0f}s")
+        self.payer = payer
+        self.channel = channel
+        self.retry_after = retry_after
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker.
+
+    CLOSED counts consecutive failures and opens after `failure_threshold`.
+    OPEN rejects calls until `recovery_timeout` has passed, then goes
+    HALF_OPEN and lets up to `half_open_max_calls` probes through. A
+    successful probe closes the circuit; a failed one re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0, half_open_max_calls: int = 1):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = CircuitState.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    @property
+    def retry_after(self) -> float:
+        return max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN and self._probes < self.half_open_max_calls:
+            self._probes += 1
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._probes = 0
+
+    def record_failure(self) -> None:
+        if self._state == CircuitState.HALF_OPEN:
+            self._open()
+            return
+        self._failures += 1
+        if self._failures >= self.failure_threshold:
+            self._open()
+
+    def record_abandoned(self) -> None:
+        # Ended without an upstream outcome; free the half-open probe slot
+        if self._state == CircuitState.HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+
+    def _open(self) -> None:
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._failures = 0
+        self._probes = 0
+
+
+class ConnectorGuard:
+    """
+    Per-(payer, channel) circuit breakers plus a per-payer cap on
+    concurrent upstream calls, shared by everything routed through
+    VoBRouter.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        max_concurrency_per_payer: int = 10,
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.max_concurrency_per_payer = max_concurrency_per_payer
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self._limiters: Dict[str, asyncio.Semaphore] = {}
+
+    def breaker(self, payer: str, channel: str) -> CircuitBreaker:
+        key = (payer, channel)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(
+                failure_threshold=self.failure_threshold,
+                recovery_timeout=self.recovery_timeout,
+                half_open_max_calls=self.half_open_max_calls,
+            )
+        return breaker
+
+    def is_open(self, payer: str, channel: str) -> bool:
+        breaker = self._breakers.get((payer, channel))
+        return breaker is not None and breaker.state == CircuitState.OPEN
+
+    def limiter(self, payer: str) -> asyncio.Semaphore:
+        limiter = self._limiters.get(payer)
+        if limiter is None:
+            limiter = self._limiters[payer] = asyncio.Semaphore(self.max_concurrency_per_payer)
+        return limiter
+
+    async def call(self, payer: str, channel: str, fn: Callable[[], Awaitable[T]]) -> T:
+        breaker = self.breaker(payer, channel)
+        if breaker.state == CircuitState.OPEN:
+            # Fail fast instead of queueing on the limiter only to be refused
+            raise CircuitOpenError(payer, channel, breaker.retry_after)
+
+        async with self.limiter(payer):
+            # Claim a (half-open probe) slot only once holding the limiter, so
+            # a call cancelled while queued never leaks the probe slot
+            if not breaker.allow():
+                raise CircuitOpenError(payer, channel, breaker.retry_after)
+            try:
+                result = await fn()
+            except (asyncio.CancelledError, LocalConnectorError):
+                breaker.record_abandoned()
+                raise
+            except Exception:
+                breaker.record_failure()
+                raise
+        breaker.record_success()
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, str]]:
+        stats: Dict[str, Dict[str, str]] = {}
+        for (payer, channel), breaker in self._breakers.items():
+            stats.setdefault(payer, {})[channel] = breaker.state.value
+        return stats
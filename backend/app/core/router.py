@@ -1,53 +1,306 @@
-from typing import Optional
-from sqlmodel import Session, select
+import asyncio
+import time
+from typing import Optional, Tuple
+from sqlmodel.ext.asyncio.session import AsyncSession
 from ..models.domain import VoBRequest, VoBResult, ChannelSource
 from ..models.sql import PayerConfig, ChannelPreference
 from ..connectors.stedi import StediConnector
 from ..connectors.rpa import RPAConnector
 from ..connectors.mock import MockConnector
 from .config import settings
-from .cache import VoBCache
+from .cache import CacheEntry, VoBCache
+from .singleflight import SingleFlight
+from .telemetry import ChannelTelemetry
+from .resilience import CircuitOpenError, ConnectorGuard, LocalConnectorError
+from .payer_registry import PayerRegistry, payer_registry
+
+# Recorded as the channel when a result is served from cache
+CACHE_CHANNEL = "cache"
+
+class RoutedResult:
+    """
+    A result and the channel that produced it (a ChannelSource value, or
+    CACHE_CHANNEL). Cache hits keep the stored JSON and only build the
+    VoBResult if `.result` is read.
+    """
+
+    def __init__(self, result: Optional[VoBResult], channel: str, entry: Optional[CacheEntry] = None):
+        self._result = result
+        self.channel = channel
+        self.entry = entry
+
+    @property
+    def result(self) -> VoBResult:
+        if self._result is None:
+            self._result = self.entry.result
+        return self._result
+
+    def to_json(self) -> bytes:
+        if self.entry is not None:
+            return self.entry.payload
+        return self._result.model_dump_json().encode()
 
 class VoBRouter:
-    def __init__(self):
+    def __init__(self, payers: Optional[PayerRegistry] = None):
+        self.payers = payers or payer_registry
         self.stedi = StediConnector()
         self.rpa = RPAConnector()
         self.mock = MockConnector()
         self.cache = VoBCache()
+        # Identical in-flight checks share one upstream call
+        self.singleflight = SingleFlight(
+            redis=self.cache.redis if settings.VOB_SINGLEFLIGHT_DISTRIBUTED else None,
+            lock_ttl_seconds=settings.VOB_SINGLEFLIGHT_LOCK_TTL_SECONDS,
+        )
+        # Live per-payer channel health, used to pick the channel
+        self.telemetry = ChannelTelemetry(
+            alpha=settings.VOB_TELEMETRY_EWMA_ALPHA,
+            min_samples=settings.VOB_TELEMETRY_MIN_SAMPLES,
+            stale_after_seconds=settings.VOB_TELEMETRY_STALE_SECONDS,
+        )
+        # Fail fast on payers whose channel keeps failing, and cap concurrency
+        self.guard = ConnectorGuard(
+            failure_threshold=settings.VOB_BREAKER_FAILURE_THRESHOLD,
+            recovery_timeout=settings.VOB_BREAKER_RECOVERY_SECONDS,
+            half_open_max_calls=settings.VOB_BREAKER_HALF_OPEN_CALLS,
+            max_concurrency_per_payer=settings.VOB_PAYER_MAX_CONCURRENCY,
+        )
+        # Per-channel cap on concurrent connector calls, so shifting routes
+        # (fallback, hedging, adaptive selection) can't exceed a channel's bound
+        self.channel_limits = {
+            ChannelSource.STEDI: asyncio.Semaphore(settings.VOB_CHANNEL_CONCURRENCY_STEDI),
+            ChannelSource.RPA: asyncio.Semaphore(settings.VOB_CHANNEL_CONCURRENCY_RPA),
+            ChannelSource.MOCK: asyncio.Semaphore(settings.VOB_CHANNEL_CONCURRENCY_MOCK),
+        }
+        # How often hedged checks were won by each side
+        self.hedge_stats = {"hedged": 0, "primary_won": 0, "fallback_won": 0}
+        # Strong references so background refreshes aren't garbage collected
+        self._refresh_tasks = set()
 
-    async def route_request(self, request: VoBRequest, session: Session) -> VoBResult:
-        # Check for demo mode or demo patient
+    def is_demo_request(self, request: VoBRequest) -> bool:
         is_demo_patient = request.patient.last_name.lower() in MockConnector.SCENARIOS
-        if settings.DEMO_MODE or is_demo_patient:
-            return await self.mock.check_eligibility(request)
+        return settings.DEMO_MODE or is_demo_patient
+
+    async def resolve_channel(self, request: VoBRequest, session: Optional[AsyncSession] = None) -> ChannelSource:
+        """
+        Returns the channel a request would be sent to on a cache miss.
+        """
+        if self.is_demo_request(request):
+            return ChannelSource.MOCK
+        return self._select_channel(request, await self._get_payer_config(request, session))
+
+    async def route_request(self, request: VoBRequest, session: Optional[AsyncSession] = None) -> VoBResult:
+        return (await self.route(request, session)).result
+
+    async def route(self, request: VoBRequest, session: Optional[AsyncSession] = None) -> RoutedResult:
+        """
+        Like route_request, but also reports which channel produced the result.
+        """
+        # Check for demo mode or demo patient
+        if self.is_demo_request(request):
+            async with self.channel_limits[ChannelSource.MOCK]:
+                return RoutedResult(await self.mock.check_eligibility(request), ChannelSource.MOCK.value)
 
         # Check cache
-        cached_result = await self.cache.get(request)
-        if cached_result:
-            return cached_result
+        cached = await self.cache.lookup(request)
+        if cached:
+            if cached.stale:
+                # Stale-while-revalidate: answer now, refresh upstream in the background
+                self._schedule_refresh(request)
+            return RoutedResult(None, CACHE_CHANNEL, cached)
 
+        return await self.singleflight.do(
+            self.cache._generate_key(request),
+            lambda: self._check_upstream(request, session),
+            peek=lambda: self._peek_cache(request),
+        )
+
+    async def _peek_cache(self, request: VoBRequest) -> Optional[RoutedResult]:
+        entry = await self.cache.lookup(request)
+        return RoutedResult(None, CACHE_CHANNEL, entry) if entry else None
+
+    def _schedule_refresh(self, request: VoBRequest) -> None:
+        task = asyncio.create_task(self._refresh(request))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _refresh(self, request: VoBRequest) -> None:
+        # Runs after the triggering request returns, so it must not use its session
+        try:
+            await self.singleflight.do(
+                self.cache._generate_key(request),
+                lambda: self._check_upstream(request),
+            )
+        except Exception as e:
+            print(f"Background cache refresh failed: {e}")
+
+    async def _check_upstream(self, request: VoBRequest, session: Optional[AsyncSession] = None) -> RoutedResult:
         # Look up payer config
-        statement = select(PayerConfig).where(PayerConfig.name == request.payer.name)
-        payer_config = session.exec(statement).first()
-        
-        result = None
-        if not payer_config:
-            # Default behavior if no config found
-            if request.payer.name and "RPA" in request.payer.name.upper():
-                result = await self.rpa.check_eligibility(request)
-            else:
-                result = await self.stedi.check_eligibility(request)
+        payer_config = await self._get_payer_config(request, session)
+        channel = self._select_channel(request, payer_config)
+        fallback = self._fallback_channel(payer_config, channel)
+
+        if fallback is not None and self._should_hedge(payer_config):
+            channel, result = await self._hedged_call(request, channel, fallback, payer_config)
         else:
-            # Use config logic
-            if payer_config.preferred_channel == ChannelPreference.STEDI:
-                result = await self.stedi.check_eligibility(request)
-            elif payer_config.preferred_channel == ChannelPreference.RPA:
-                result = await self.rpa.check_eligibility(request)
-            else:
-                result = await self.stedi.check_eligibility(request)
+            try:
+                result = await self._call_channel(channel, request)
+            except Exception as e:
+                if fallback is None:
+                    raise
+                print(f"{channel.value} check failed ({e}); falling back to {fallback.value}")
+                channel = fallback
+                result = await self._call_channel(channel, request)
 
         # Cache result
         if result:
             await self.cache.set(request, result)
-            
+
+        return RoutedResult(result, channel.value)
+
+    def _should_hedge(self, payer_config: Optional[PayerConfig]) -> bool:
+        return settings.VOB_HEDGING_ENABLED and bool(payer_config and payer_config.hedge_enabled)
+
+    def _hedge_delay_seconds(self, payer_config: Optional[PayerConfig], request: VoBRequest, channel: ChannelSource) -> float:
+        """
+        How long to give the preferred channel before racing the fallback:
+        the payer's explicit override, else the channel's recent p95.
+        """
+        delay_ms = payer_config.hedge_after_ms if payer_config else None
+        if delay_ms is None:
+            stats = self.telemetry.get(request.payer.name, channel.value)
+            p95 = stats.percentile(settings.VOB_HEDGE_PERCENTILE) if stats else None
+            delay_ms = p95 if p95 is not None else settings.VOB_HEDGE_DEFAULT_DELAY_MS
+        return max(delay_ms, settings.VOB_HEDGE_MIN_DELAY_MS) / 1000
+
+    async def _hedged_call(
+        self,
+        request: VoBRequest,
+        primary: ChannelSource,
+        fallback: ChannelSource,
+        payer_config: Optional[PayerConfig] = None,
+    ) -> Tuple[ChannelSource, VoBResult]:
+        """
+        Starts the preferred channel and, if it hasn't answered within the
+        hedge delay, races the fallback against it. The first successful
+        answer wins and the other call is cancelled. If the preferred channel
+        fails before the delay, the fallback is tried on its own.
+        """
+        tasks = {asyncio.create_task(self._call_channel(primary, request)): primary}
+        try:
+            delay = self._hedge_delay_seconds(payer_config, request, primary)
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                task = done.pop()
+                if task.exception() is None:
+                    return primary, task.result()
+                print(f"{primary.value} check failed ({task.exception()}); falling back to {fallback.value}")
+                return fallback, await self._call_channel(fallback, request)
+
+            self.hedge_stats["hedged"] += 1
+            tasks[asyncio.create_task(self._call_channel(fallback, request))] = fallback
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = tasks[task]
+                        self.hedge_stats["primary_won" if winner == primary else "fallback_won"] += 1
+                        print(f"Hedged check for {request.payer.name}: {winner.value} won")
+                        return winner, task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _call_channel(self, channel: ChannelSource, request: VoBRequest) -> VoBResult:
+        connector = self.rpa if channel == ChannelSource.RPA else self.stedi
+        async with self.channel_limits[channel]:
+            # Timed from here so queueing for a slot doesn't count as latency
+            started = time.perf_counter()
+            try:
+                result = await self.guard.call(
+                    request.payer.name,
+                    channel.value,
+                    lambda: connector.check_eligibility(request),
+                )
+            except (asyncio.CancelledError, CircuitOpenError, LocalConnectorError):
+                # Lost a hedge race, the caller went away, the circuit is open or
+                # we ran out of local capacity: none of these say anything about
+                # the channel's latency or health
+                raise
+            except Exception:
+                self._record(request, channel, started, success=False)
+                raise
+        self._record(request, channel, started, success=True)
         return result
+
+    def _record(self, request: VoBRequest, channel: ChannelSource, started: float, success: bool) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.telemetry.record(request.payer.name, channel.value, elapsed_ms, success)
+
+    async def _get_payer_config(self, request: VoBRequest, session: Optional[AsyncSession] = None) -> Optional[PayerConfig]:
+        # Served from the in-memory registry; `session` is not needed
+        return await self.payers.lookup(request.payer.name, request.payer.payer_code_hint)
+
+    def _select_channel(self, request: VoBRequest, payer_config: Optional[PayerConfig]) -> ChannelSource:
+        preferred = self._preferred_channel(request, payer_config)
+        fallback = self._fallback_channel(payer_config, preferred)
+        if fallback is None:
+            return preferred
+        if self.guard.is_open(request.payer.name, preferred.value):
+            # Don't wait on a channel we know is down
+            return fallback
+        if not settings.VOB_ADAPTIVE_ROUTING:
+            return preferred
+        return self._adaptive_channel(request.payer.name, preferred, fallback)
+
+    def _adaptive_channel(self, payer: str, preferred: ChannelSource, fallback: ChannelSource) -> ChannelSource:
+        """
+        Picks the fastest healthy channel from live telemetry. Without enough
+        recent data on the preferred channel the configured preference wins.
+        """
+        primary_stats = self.telemetry.get(payer, preferred.value)
+        fallback_stats = self.telemetry.get(payer, fallback.value)
+        if primary_stats is None:
+            return preferred
+
+        threshold = settings.VOB_UNHEALTHY_FAILURE_RATE
+        if primary_stats.failure_rate >= threshold:
+            # Unhealthy: shift to the fallback unless it is doing even worse
+            if fallback_stats is None or fallback_stats.failure_rate < primary_stats.failure_rate:
+                return fallback
+            return preferred
+
+        if (
+            fallback_stats is not None
+            and fallback_stats.failure_rate < threshold
+            and fallback_stats.latency_ms < primary_stats.latency_ms
+        ):
+            return fallback
+        return preferred
+
+    def _preferred_channel(self, request: VoBRequest, payer_config: Optional[PayerConfig]) -> ChannelSource:
+        if not payer_config:
+            # Default behavior if no config found
+            if request.payer.name and "RPA" in request.payer.name.upper():
+                return ChannelSource.RPA
+            return ChannelSource.STEDI
+
+        # Use config logic
+        if payer_config.preferred_channel == ChannelPreference.RPA:
+            return ChannelSource.RPA
+        return ChannelSource.STEDI
+
+    def _fallback_channel(self, payer_config: Optional[PayerConfig], primary: ChannelSource) -> Optional[ChannelSource]:
+        if not payer_config or payer_config.fallback_channel == ChannelPreference.NONE:
+            return None
+        fallback = ChannelSource(payer_config.fallback_channel.value)
+        return fallback if fallback != primary else None
+
+# Shared by the API and the job worker so both use the same cache and
+# in-flight coalescing state
+vob_router = VoBRouter()
@@ -0,0 +1,119 @@
+import asyncio
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key so only one of them runs.
+
+    Within a process, callers that arrive while a call for the same key is in
+    flight await its result instead of starting their own. When a Redis
+    client is supplied, a short-lived lock extends this across workers: a
+    worker that loses the lock polls `peek` (normally a cache lookup) until
+    the winner's result appears or the lock is released.
+    """
+
+    def __init__(
+        self,
+        redis=None,
+        lock_ttl_seconds: float = 60.0,
+        poll_interval_seconds: float = 0.1,
+    ):
+        self.redis = redis
+        self.lock_ttl_ms = int(lock_ttl_seconds * 1000)
+        self.poll_interval = poll_interval_seconds
+        self._inflight: Dict[str, _Call] = {}
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        peek: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Any:
+        call = self._inflight.get(key)
+        if call is None:
+            # The shared call runs in its own task, so cancelling whichever
+            # caller started it doesn't cancel it for the others
+            call = _Call(asyncio.create_task(self._run(key, fn, peek)))
+            self._inflight[key] = call
+            call.task.add_done_callback(lambda task: self._finished(key, task))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            # Nobody is left to use the result; stop the upstream call
+            if call.waiters == 1:
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        call = self._inflight.get(key)
+        if call is not None and call.task is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark retrieved so an un-awaited failure doesn't log a warning
+            task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    async def _run(self, key: str, fn, peek) -> Any:
+        if self.redis is None:
+            return await fn()
+
+        lock_key = f"lock:{key}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.redis.set(lock_key, token, nx=True, px=self.lock_ttl_ms)
+        except Exception as e:
+            print(f"Singleflight lock error: {e}")
+            return await fn()
+
+        if acquired:
+            try:
+                return await fn()
+            finally:
+                await self._release(lock_key, token)
+
+        # Another worker owns the call; wait for its result to land
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            if peek is not None:
+                result = await peek()
+                if result is not None:
+                    return result
+            try:
+                if not await self.redis.exists(lock_key):
+                    break
+            except Exception:
+                break
+
+        # Lock released (or expired) without a result; one final look, then go upstream
+        if peek is not None:
+            result = await peek()
+            if result is not None:
+                return result
+        return await fn()
+
+    async def _release(self, lock_key: str, token: str) -> None:
+        # Only delete the lock if we still own it
+        script = (
+            "if redis.call('get', KEYS[1]) == ARGV[1] then "
+            "return redis.call('del', KEYS[1]) else return 0 end"
+        )
+        try:
+            await self.redis.eval(script, 1, lock_key, token)
+        except Exception as e:
+            print(f"Singleflight unlock error: {e}")
@@ -1,7 +1,22 @@
-from typing import List, Optional, Tuple
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # Only needed for STCMapper.map_bulk
+
+from .config import settings
+
+DEFAULT_TABLES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "stc_mappings.json")
+
 class ServiceCategory(Enum):
     SURGICAL = "surgical"
     MEDICAL = "medical"
@@ -26,384 +41,381 @@ class STCMapping:
     category: ServiceCategory
     confidence: float  # 0.0 - 1.0
 
+@dataclass
+class BulkSTCResult:
+    """
+    Column-oriented output of STCMapper.map_bulk; row i describes cpt[i].
+    """
+    cpt: Any  # np.ndarray[str], normalized codes
+    primary_stc: Any  # np.ndarray[str]
+    fallback_stcs: Any  # np.ndarray[object], list of STCs after the primary
+    category: Any  # np.ndarray[str], ServiceCategory values
+    confidence: Any  # np.ndarray[float64]
+
+    def __len__(self) -> int:
+        return len(self.cpt)
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self.cpt)):
+            yield {
+                "cpt": str(self.cpt[i]),
+                "primary_stc": str(self.primary_stc[i]),
+                "fallback_stcs": list(self.fallback_stcs[i]),
+                "category": str(self.category[i]),
+                "confidence": float(self.confidence[i]),
+            }
+
+class RangeIndex:
+    """
+    CPT range table compiled into sorted, non-overlapping intervals.
+
+    Where ranges overlap, the narrower range wins; equal widths go to the
+    range listed first. Lookups are a bisect over the interval starts, so
+    the result does not depend on how the source list is ordered.
+    """
+
+    def __init__(self, ranges: Sequence[Tuple[str, str, STCMapping]]):
+        # Bounds are half-open: end + "\0" is the smallest string above end
+        bounds = sorted({start for start, _, _ in ranges} | {end + "\0" for _, end, _ in ranges})
+        ranked = sorted(
+            enumerate(ranges),
+            key=lambda item: (self._width(item[1][0], item[1][1]), item[0]),
+        )
+        self.starts: List[str] = []
+        self.mappings: List[Optional[STCMapping]] = []
+        for point in bounds:
+            winner = next((mapping for _, (start, end, mapping) in ranked if start <= point <= end), None)
+            if self.mappings and self.mappings[-1] is winner:
+                continue  # Same winner as the previous interval: merge
+            self.starts.append(point)
+            self.mappings.append(winner)
+
+        # Integer bounds for vectorized lookup of plain 5-digit codes, where
+        # numeric and string order agree; None if any bound isn't one
+        self.numeric_starts: Optional[List[int]] = None
+        if all(self._is_cpt_number(start) and self._is_cpt_number(end) for start, end, _ in ranges):
+            self.numeric_starts = [
+                int(point[:-1]) + 1 if point.endswith("\0") else int(point) for point in self.starts
+            ]
+
+    def lookup(self, code: str) -> Optional[STCMapping]:
+        i = bisect_right(self.starts, code) - 1
+        return self.mappings[i] if i >= 0 else None
+
+    @staticmethod
+    def _is_cpt_number(code: str) -> bool:
+        return len(code) == 5 and code.isdigit()
+
+    @staticmethod
+    def _width(start: str, end: str) -> float:
+        if start.isdigit() and end.isdigit():
+            return int(end) - int(start)
+        return float("inf")  # Non-numeric bounds rank after numeric ones
+
+class STCTables:
+    """
+    One loaded version of the mapping tables, compiled for lookup.
+
+    Payer overrides are layered per tier: an override's specific codes and
+    prefixes replace the base entries, and its ranges are searched before
+    the base ranges.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        specific: Dict[str, STCMapping],
+        ranges: Sequence[Tuple[str, str, STCMapping]],
+        prefixes: Dict[str, STCMapping],
+        fallback: STCMapping,
+        overrides: Optional[Dict[str, "STCTables"]] = None,
+        range_indexes: Optional[List[RangeIndex]] = None,
+    ):
+        self.version = version
+        self.specific = specific
+        self.range_indexes = range_indexes if range_indexes is not None else [RangeIndex(ranges)]
+        self.prefixes = prefixes
+        self.fallback = fallback
+        self.overrides = overrides or {}
+
+    def for_payer(self, payer: Optional[str]) -> "STCTables":
+        if not payer or not self.overrides:
+            return self
+        return self.overrides.get(_payer_key(payer), self)
+
+    def resolve(self, cpt_code: str) -> STCMapping:
+        # 1. Specific mapping (highest confidence)
+        mapping = self.specific.get(cpt_code)
+        if mapping is not None:
+            return mapping
+
+        # 2. Range mappings (medium confidence)
+        for index in self.range_indexes:
+            mapping = index.lookup(cpt_code)
+            if mapping is not None:
+                return mapping
+
+        # 3. Category prefix (low confidence), then the ultimate fallback
+        return self.prefixes.get(cpt_code[:2], self.fallback)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "STCTables":
+        base = cls(
+            version=str(data["version"]),
+            specific=_parse_specific(data.get("specific", {})),
+            ranges=_parse_ranges(data.get("ranges", {})),
+            prefixes={prefix: intern_mapping(value) for prefix, value in data.get("prefixes", {}).items()},
+            fallback=intern_mapping(data["fallback"]),
+        )
+        for payer, override in data.get("payer_overrides", {}).items():
+            base.overrides[_payer_key(payer)] = cls(
+                version=base.version,
+                specific={**base.specific, **_parse_specific(override.get("specific", {}))},
+                ranges=(),
+                prefixes={
+                    **base.prefixes,
+                    **{prefix: intern_mapping(value) for prefix, value in override.get("prefixes", {}).items()},
+                },
+                fallback=intern_mapping(override["fallback"]) if "fallback" in override else base.fallback,
+                range_indexes=[RangeIndex(_parse_ranges(override.get("ranges", {})))] + base.range_indexes,
+            )
+        return base
+
+
+# Encoded mapping ("98|1,30|medical|0.95") -> shared instance. Kept across
+# reloads so unchanged entries stay the same object
+_interned: Dict[str, STCMapping] = {}
+
+def intern_mapping(encoded: str) -> STCMapping:
+    """
+    Parses "<primary>|<fallback,...>|<category>|<confidence>" into a shared
+    STCMapping; identical entries in the tables resolve to one instance.
+    """
+    mapping = _interned.get(encoded)
+    if mapping is None:
+        primary, fallbacks, category, confidence = encoded.split("|")
+        mapping = STCMapping(
+            primary,
+            [stc for stc in fallbacks.split(",") if stc],
+            ServiceCategory(category),
+            float(confidence),
+        )
+        _interned[encoded] = mapping
+    return mapping
+
+def _parse_specific(groups: Dict[str, Dict[str, str]]) -> Dict[str, STCMapping]:
+    # Entries are grouped by section name for readability only
+    return {
+        cpt.strip().upper(): intern_mapping(value)
+        for entries in groups.values()
+        for cpt, value in entries.items()
+    }
+
+def _parse_ranges(groups: Dict[str, List[List[str]]]) -> List[Tuple[str, str, STCMapping]]:
+    return [
+        (start.strip().upper(), end.strip().upper(), intern_mapping(value))
+        for entries in groups.values()
+        for start, end, value in entries
+    ]
+
+def _payer_key(payer: str) -> str:
+    return payer.strip().lower()
+
+
+class STCTableStore:
+    """
+    Loads the mapping tables from a JSON file on first use and reloads them
+    when the file's mtime changes, checked at most every `reload_interval`
+    seconds (0 disables reloading). A file that fails to parse is reported
+    and the previous tables stay in use.
+    """
+
+    def __init__(self, path: str, reload_interval: float = 30.0, cache_size: int = 4096):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._tables: Optional[STCTables] = None
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reloads = 0
+        # Per-code results for the current tables; cleared on reload
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def current(self) -> STCTables:
+        if self._tables is None:
+            with self._lock:
+                if self._tables is None:
+                    self._load(self._stat_mtime())
+        elif self.reload_interval > 0 and time.monotonic() - self._checked_at >= self.reload_interval:
+            self._check_for_changes()
+        return self._tables
+
+    def reload(self) -> STCTables:
+        with self._lock:
+            self._load(self._stat_mtime())
+        return self._tables
+
+    def _check_for_changes(self) -> None:
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                mtime = self._stat_mtime()
+            except OSError as e:
+                print(f"STC mapping file unavailable, keeping version {self._tables.version}: {e}")
+                return
+            if mtime == self._mtime:
+                return
+            try:
+                self._load(mtime)
+            except Exception as e:
+                # Don't retry the same broken file on every check
+                self._mtime = mtime
+                print(f"STC mapping reload failed, keeping version {self._tables.version}: {e}")
+                return
+            print(f"Reloaded STC mappings version {self._tables.version}")
+
+    def _load(self, mtime: float) -> None:
+        with open(self.path) as f:
+            tables = STCTables.from_dict(json.load(f))
+        self._tables = tables
+        self._mtime = mtime
+        self._checked_at = time.monotonic()
+        self.reloads += 1
+        self.resolve.cache_clear()
+
+    def _stat_mtime(self) -> float:
+        return os.stat(self.path).st_mtime
+
+    def _resolve(self, cpt_code: str, payer_key: Optional[str]) -> STCMapping:
+        return self._tables.for_payer(payer_key).resolve(cpt_code.strip().upper())
+
+
 class STCMapper:
     """
     Maps CPT codes to Service Type Codes (STCs) for 270 eligibility requests.
     Uses tiered lookup: specific CPT → CPT range → category → generic fallback.
+
+    The tables live in app/data/stc_mappings.json (or STC_MAPPINGS_PATH) and
+    can be edited without a deploy; pass `payer` to apply that payer's
+    overrides.
     """
+
+    def __init__(self, tables: Optional[STCTableStore] = None):
+        self.tables = tables or stc_tables
     
-    # Specific CPT → STC mappings (highest confidence)
-    SPECIFIC_MAPPINGS: dict[str, STCMapping] = {
-        # E/M Office Visits
-        "99202": STCMapping("98", ["1", "30"], ServiceCategory.MEDICAL, 0.95),
-        "99203": STCMapping("98", ["1", "30"], ServiceCategory.MEDICAL, 0.95),
-        "99204": STCMapping("98", ["1", "30"], ServiceCategory.MEDICAL, 0.95),
-        "99205": STCMapping("98", ["1", "30"], ServiceCategory.MEDICAL, 0.95),
-        "99211": STCMapping("98", ["1", "30"], ServiceCategory.MEDICAL, 0.95),
-        "99212": STCMapping("98", ["1", "30"], ServiceCategory.MEDICAL, 0.95),
-        "99213": STCMapping("98", ["1", "30"], ServiceCategory.MEDICAL, 0.95),
-        "99214": STCMapping("98", ["1", "30"], ServiceCategory.MEDICAL, 0.95),
-        "99215": STCMapping("98", ["1", "30"], ServiceCategory.MEDICAL, 0.95),
-        
-        # Breast Procedures (common in cosmetic surgery)
-        "19316": STCMapping("2", ["BT", "30"], ServiceCategory.SURGICAL, 0.90),
-        "19318": STCMapping("2", ["BT", "30"], ServiceCategory.SURGICAL, 0.90),
-        "19325": STCMapping("2", ["BT", "30"], ServiceCategory.SURGICAL, 0.90),
-        "19357": STCMapping("2", ["BT", "47", "30"], ServiceCategory.SURGICAL, 0.90),
-        "19361": STCMapping("2", ["BT", "47", "30"], ServiceCategory.SURGICAL, 0.90),
-        
-        # Rhinoplasty
-        "30400": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        "30410": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        "30420": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        "30430": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        "30435": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        "30450": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        
-        # Blepharoplasty/Eyelid
-        "15820": STCMapping("2", ["EE", "30"], ServiceCategory.SURGICAL, 0.90),
-        "15821": STCMapping("2", ["EE", "30"], ServiceCategory.SURGICAL, 0.90),
-        "15822": STCMapping("2", ["EE", "30"], ServiceCategory.SURGICAL, 0.90),
-        "15823": STCMapping("2", ["EE", "30"], ServiceCategory.SURGICAL, 0.90),
-        "67900": STCMapping("2", ["EE", "30"], ServiceCategory.SURGICAL, 0.90),
-        "67901": STCMapping("2", ["EE", "30"], ServiceCategory.SURGICAL, 0.90),
-        "67902": STCMapping("2", ["EE", "30"], ServiceCategory.SURGICAL, 0.90),
-        "67903": STCMapping("2", ["EE", "30"], ServiceCategory.SURGICAL, 0.90),
-        "67904": STCMapping("2", ["EE", "30"], ServiceCategory.SURGICAL, 0.90),
-        
-        # Facelift
-        "15828": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        "15829": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        
-        # Abdominoplasty/Body Contouring
-        "15830": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        "15832": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        "15833": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        "15834": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        "15835": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        "15836": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        "15837": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        "15838": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        "15847": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        
-        # Liposuction
-        "15876": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        "15877": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        "15878": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        "15879": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.90),
-        
-        # Mental Health
-        "90791": STCMapping("MH", ["A4", "30"], ServiceCategory.MENTAL_HEALTH, 0.95),
-        "90792": STCMapping("MH", ["A4", "30"], ServiceCategory.MENTAL_HEALTH, 0.95),
-        "90832": STCMapping("A6", ["MH", "A4", "30"], ServiceCategory.MENTAL_HEALTH, 0.95),
-        "90834": STCMapping("A6", ["MH", "A4", "30"], ServiceCategory.MENTAL_HEALTH, 0.95),
-        "90837": STCMapping("A6", ["MH", "A4", "30"], ServiceCategory.MENTAL_HEALTH, 0.95),
-        "90853": STCMapping("A6", ["MH", "30"], ServiceCategory.MENTAL_HEALTH, 0.95),
-        
-        # Physical Therapy
-        "97110": STCMapping("PT", ["AE", "30"], ServiceCategory.PHYSICAL_THERAPY, 0.95),
-        "97112": STCMapping("PT", ["AE", "30"], ServiceCategory.PHYSICAL_THERAPY, 0.95),
-        "97116": STCMapping("PT", ["AE", "30"], ServiceCategory.PHYSICAL_THERAPY, 0.95),
-        "97140": STCMapping("PT", ["AE", "33", "30"], ServiceCategory.PHYSICAL_THERAPY, 0.90),
-        "97161": STCMapping("PT", ["AE", "30"], ServiceCategory.PHYSICAL_THERAPY, 0.95),
-        "97162": STCMapping("PT", ["AE", "30"], ServiceCategory.PHYSICAL_THERAPY, 0.95),
-        "97163": STCMapping("PT", ["AE", "30"], ServiceCategory.PHYSICAL_THERAPY, 0.95),
-        
-        # Occupational Therapy
-        "97165": STCMapping("AD", ["AE", "30"], ServiceCategory.OCCUPATIONAL_THERAPY, 0.95),
-        "97166": STCMapping("AD", ["AE", "30"], ServiceCategory.OCCUPATIONAL_THERAPY, 0.95),
-        "97167": STCMapping("AD", ["AE", "30"], ServiceCategory.OCCUPATIONAL_THERAPY, 0.95),
-        "97168": STCMapping("AD", ["AE", "30"], ServiceCategory.OCCUPATIONAL_THERAPY, 0.95),
-        
-        # Speech Therapy
-        "92507": STCMapping("AF", ["30"], ServiceCategory.SPEECH_THERAPY, 0.95),
-        "92508": STCMapping("AF", ["30"], ServiceCategory.SPEECH_THERAPY, 0.95),
-        "92521": STCMapping("AF", ["30"], ServiceCategory.SPEECH_THERAPY, 0.95),
-        "92522": STCMapping("AF", ["30"], ServiceCategory.SPEECH_THERAPY, 0.95),
-        "92523": STCMapping("AF", ["30"], ServiceCategory.SPEECH_THERAPY, 0.95),
-        "92526": STCMapping("AF", ["30"], ServiceCategory.SPEECH_THERAPY, 0.95),
-        
-        # Vision
-        "92002": STCMapping("EE", ["AL", "67", "30"], ServiceCategory.VISION, 0.95),
-        "92004": STCMapping("EE", ["AL", "67", "30"], ServiceCategory.VISION, 0.95),
-        "92012": STCMapping("EE", ["AL", "67", "30"], ServiceCategory.VISION, 0.95),
-        "92014": STCMapping("EE", ["AL", "67", "30"], ServiceCategory.VISION, 0.95),
-        
-        # Chemotherapy
-        "96401": STCMapping("78", ["ON", "87", "92", "30"], ServiceCategory.MEDICAL, 0.95),
-        "96413": STCMapping("78", ["ON", "87", "92", "30"], ServiceCategory.MEDICAL, 0.95),
-        
-        # Acupuncture
-        "97810": STCMapping("64", ["1", "30"], ServiceCategory.MEDICAL, 0.90),
-        "97811": STCMapping("64", ["1", "30"], ServiceCategory.MEDICAL, 0.90),
-        "97813": STCMapping("64", ["1", "30"], ServiceCategory.MEDICAL, 0.90),
-        "97814": STCMapping("64", ["1", "30"], ServiceCategory.MEDICAL, 0.90),
-        
-        # ABA Therapy
-        "97151": STCMapping("BD", ["MH", "30"], ServiceCategory.MENTAL_HEALTH, 0.95),
-        "97152": STCMapping("BD", ["MH", "30"], ServiceCategory.MENTAL_HEALTH, 0.95),
-        "97153": STCMapping("BD", ["MH", "30"], ServiceCategory.MENTAL_HEALTH, 0.95),
-        "97154": STCMapping("BD", ["MH", "30"], ServiceCategory.MENTAL_HEALTH, 0.95),
-        "97155": STCMapping("BD", ["MH", "30"], ServiceCategory.MENTAL_HEALTH, 0.95),
-        "97156": STCMapping("BD", ["MH", "30"], ServiceCategory.MENTAL_HEALTH, 0.95),
-        "97157": STCMapping("BD", ["MH", "30"], ServiceCategory.MENTAL_HEALTH, 0.95),
-    }
-    
-    # CPT Range → STC mappings (medium confidence)
-    RANGE_MAPPINGS: list[Tuple[str, str, STCMapping]] = [
-        # E/M codes
-        ("99201", "99205", STCMapping("98", ["1", "30"], ServiceCategory.MEDICAL, 0.85)),
-        ("99211", "99215", STCMapping("98", ["1", "30"], ServiceCategory.MEDICAL, 0.85)),
-        ("99221", "99223", STCMapping("A0", ["47", "48", "30"], ServiceCategory.HOSPITAL, 0.85)),
-        ("99231", "99233", STCMapping("A0", ["47", "48", "30"], ServiceCategory.HOSPITAL, 0.85)),
-        ("99281", "99285", STCMapping("86", ["47", "52", "30"], ServiceCategory.EMERGENCY, 0.90)),
-        ("99304", "99318", STCMapping("AG", ["AH", "54", "30"], ServiceCategory.MEDICAL, 0.85)),
-        
-        # Anesthesia
-        ("00100", "01999", STCMapping("7", ["2", "47", "30"], ServiceCategory.SURGICAL, 0.80)),
-        
-        # Surgery - Integumentary
-        ("10000", "19999", STCMapping("2", ["1", "30"], ServiceCategory.SURGICAL, 0.80)),
-        ("19000", "19499", STCMapping("2", ["BT", "30"], ServiceCategory.SURGICAL, 0.85)),
-        
-        # Surgery - Musculoskeletal
-        ("20000", "29999", STCMapping("2", ["BK", "30"], ServiceCategory.SURGICAL, 0.80)),
-        
-        # Surgery - Respiratory (Nose)
-        ("30000", "30999", STCMapping("2", ["1", "30"], ServiceCategory.SURGICAL, 0.80)),
-        
-        # Surgery - Cardiovascular
-        ("33000", "37799", STCMapping("2", ["BL", "47", "30"], ServiceCategory.SURGICAL, 0.80)),
-        
-        # Surgery - Digestive
-        ("40000", "49999", STCMapping("2", ["BN", "47", "30"], ServiceCategory.SURGICAL, 0.80)),
-        
-        # Surgery - Urinary
-        ("50000", "53899", STCMapping("2", ["RN", "30"], ServiceCategory.SURGICAL, 0.80)),
-        
-        # Surgery - Male Genital
-        ("54000", "55899", STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.80)),
-        
-        # Surgery - Female Genital
-        ("56000", "58999", STCMapping("2", ["BV", "69", "30"], ServiceCategory.SURGICAL, 0.80)),
-        
-        # Surgery - Maternity
-        ("59000", "59899", STCMapping("BU", ["BV", "69", "30"], ServiceCategory.MATERNITY, 0.90)),
-        
-        # Surgery - Nervous System
-        ("61000", "64999", STCMapping("2", ["BQ", "30"], ServiceCategory.SURGICAL, 0.80)),
-        
-        # Surgery - Eye
-        ("65000", "68999", STCMapping("2", ["EE", "30"], ServiceCategory.SURGICAL, 0.85)),
-        
-        # Surgery - Auditory
-        ("69000", "69990", STCMapping("2", ["71", "77", "30"], ServiceCategory.SURGICAL, 0.80)),
-        
-        # Radiology - CT (Moved above Diagnostic for priority)
-        ("70450", "70498", STCMapping("ED", ["4", "62", "30"], ServiceCategory.RADIOLOGY, 0.90)),
-        
-        # Radiology - MRI (Moved above Diagnostic for priority)
-        ("70540", "70559", STCMapping("62", ["4", "73", "30"], ServiceCategory.RADIOLOGY, 0.90)),
-
-        # Radiology - Diagnostic
-        ("70000", "76999", STCMapping("4", ["62", "73", "30"], ServiceCategory.RADIOLOGY, 0.85)),
-        
-        # Radiology - Radiation Oncology
-        ("77261", "77799", STCMapping("6", ["ON", "87", "30"], ServiceCategory.RADIOLOGY, 0.90)),
-        
-        # Radiology - Nuclear Medicine
-        ("78000", "78999", STCMapping("73", ["4", "30"], ServiceCategory.RADIOLOGY, 0.85)),
-        
-        # Laboratory/Pathology
-        ("80000", "89999", STCMapping("5", ["66", "30"], ServiceCategory.LABORATORY, 0.85)),
-        
-        # Medicine - Immunizations
-        ("90281", "90399", STCMapping("80", ["88", "30"], ServiceCategory.MEDICAL, 0.85)),
-        
-        # Medicine - Vaccines
-        ("90460", "90759", STCMapping("80", ["88", "30"], ServiceCategory.MEDICAL, 0.85)),
-        
-        # Mental Health
-        ("90785", "90899", STCMapping("MH", ["A4", "A6", "30"], ServiceCategory.MENTAL_HEALTH, 0.90)),
-        ("96101", "96155", STCMapping("MH", ["A4", "30"], ServiceCategory.MENTAL_HEALTH, 0.85)),
-        
-        # Physical Medicine
-        ("97000", "97799", STCMapping("PT", ["AE", "AD", "30"], ServiceCategory.PHYSICAL_THERAPY, 0.80)),
-        
-        # Chemotherapy
-        ("96401", "96549", STCMapping("78", ["ON", "87", "30"], ServiceCategory.MEDICAL, 0.90)),
-        
-        # Dialysis
-        ("90935", "90999", STCMapping("76", ["RN", "30"], ServiceCategory.MEDICAL, 0.90)),
-        
-        # Ophthalmology
-        ("92002", "92499", STCMapping("EE", ["AL", "67", "30"], ServiceCategory.VISION, 0.85)),
-        
-        # Cardiovascular
-        ("93000", "93999", STCMapping("BL", ["73", "30"], ServiceCategory.MEDICAL, 0.85)),
-        
-        # Pulmonary
-        ("94002", "94799", STCMapping("PU", ["73", "30"], ServiceCategory.MEDICAL, 0.85)),
-        
-        # Allergy/Immunology
-        ("95004", "95199", STCMapping("GY", ["79", "30"], ServiceCategory.MEDICAL, 0.85)),
-        
-        # Neurology
-        ("95700", "96020", STCMapping("BQ", ["73", "30"], ServiceCategory.MEDICAL, 0.85)),
-        
-        # Dermatology
-        ("96900", "96999", STCMapping("DG", ["1", "30"], ServiceCategory.MEDICAL, 0.85)),
-    ]
-    
-    # Category prefix → STC (low confidence fallback)
-    CATEGORY_PREFIXES: dict[str, STCMapping] = {
-        "00": STCMapping("7", ["2", "30"], ServiceCategory.SURGICAL, 0.60),    # Anesthesia
-        "10": STCMapping("2", ["1", "30"], ServiceCategory.SURGICAL, 0.60),    # Integumentary
-        "11": STCMapping("2", ["1", "30"], ServiceCategory.SURGICAL, 0.60),
-        "12": STCMapping("2", ["1", "30"], ServiceCategory.SURGICAL, 0.60),
-        "13": STCMapping("2", ["1", "30"], ServiceCategory.SURGICAL, 0.60),
-        "14": STCMapping("2", ["1", "30"], ServiceCategory.SURGICAL, 0.60),
-        "15": STCMapping("2", ["1", "30"], ServiceCategory.SURGICAL, 0.60),
-        "16": STCMapping("2", ["1", "30"], ServiceCategory.SURGICAL, 0.60),
-        "17": STCMapping("2", ["DG", "30"], ServiceCategory.SURGICAL, 0.60),
-        "19": STCMapping("2", ["BT", "30"], ServiceCategory.SURGICAL, 0.65),   # Breast
-        "20": STCMapping("2", ["BK", "30"], ServiceCategory.SURGICAL, 0.60),   # Musculoskeletal
-        "21": STCMapping("2", ["BK", "30"], ServiceCategory.SURGICAL, 0.60),
-        "22": STCMapping("2", ["BK", "30"], ServiceCategory.SURGICAL, 0.60),
-        "23": STCMapping("2", ["BK", "30"], ServiceCategory.SURGICAL, 0.60),
-        "24": STCMapping("2", ["BK", "30"], ServiceCategory.SURGICAL, 0.60),
-        "25": STCMapping("2", ["BK", "30"], ServiceCategory.SURGICAL, 0.60),
-        "26": STCMapping("2", ["BK", "30"], ServiceCategory.SURGICAL, 0.60),
-        "27": STCMapping("2", ["BK", "30"], ServiceCategory.SURGICAL, 0.60),
-        "28": STCMapping("2", ["93", "30"], ServiceCategory.SURGICAL, 0.60),   # Foot
-        "29": STCMapping("2", ["BK", "30"], ServiceCategory.SURGICAL, 0.60),
-        "30": STCMapping("2", ["1", "30"], ServiceCategory.SURGICAL, 0.60),    # Nose
-        "31": STCMapping("2", ["1", "30"], ServiceCategory.SURGICAL, 0.60),
-        "32": STCMapping("2", ["PU", "30"], ServiceCategory.SURGICAL, 0.60),   # Lungs
-        "33": STCMapping("2", ["BL", "30"], ServiceCategory.SURGICAL, 0.65),   # Heart
-        "34": STCMapping("2", ["BL", "30"], ServiceCategory.SURGICAL, 0.65),
-        "35": STCMapping("2", ["BL", "30"], ServiceCategory.SURGICAL, 0.65),
-        "36": STCMapping("2", ["BL", "30"], ServiceCategory.SURGICAL, 0.65),
-        "37": STCMapping("2", ["BL", "30"], ServiceCategory.SURGICAL, 0.65),
-        "40": STCMapping("2", ["BN", "30"], ServiceCategory.SURGICAL, 0.60),   # Digestive
-        "41": STCMapping("2", ["BN", "30"], ServiceCategory.SURGICAL, 0.60),
-        "42": STCMapping("2", ["BN", "30"], ServiceCategory.SURGICAL, 0.60),
-        "43": STCMapping("2", ["BN", "30"], ServiceCategory.SURGICAL, 0.60),
-        "44": STCMapping("2", ["BN", "30"], ServiceCategory.SURGICAL, 0.60),
-        "45": STCMapping("2", ["BN", "30"], ServiceCategory.SURGICAL, 0.60),
-        "46": STCMapping("2", ["BN", "30"], ServiceCategory.SURGICAL, 0.60),
-        "47": STCMapping("2", ["BN", "30"], ServiceCategory.SURGICAL, 0.60),
-        "48": STCMapping("2", ["BN", "30"], ServiceCategory.SURGICAL, 0.60),
-        "49": STCMapping("2", ["BN", "30"], ServiceCategory.SURGICAL, 0.60),
-        "50": STCMapping("2", ["RN", "30"], ServiceCategory.SURGICAL, 0.60),   # Urinary
-        "51": STCMapping("2", ["RN", "30"], ServiceCategory.SURGICAL, 0.60),
-        "52": STCMapping("2", ["RN", "30"], ServiceCategory.SURGICAL, 0.60),
-        "53": STCMapping("2", ["RN", "30"], ServiceCategory.SURGICAL, 0.60),
-        "54": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.60),         # Male Genital
-        "55": STCMapping("2", ["30"], ServiceCategory.SURGICAL, 0.60),
-        "56": STCMapping("2", ["BV", "30"], ServiceCategory.SURGICAL, 0.60),   # Female Genital
-        "57": STCMapping("2", ["BV", "30"], ServiceCategory.SURGICAL, 0.60),
-        "58": STCMapping("2", ["BV", "30"], ServiceCategory.SURGICAL, 0.60),
-        "59": STCMapping("BU", ["BV", "69", "30"], ServiceCategory.MATERNITY, 0.70),  # Maternity
-        "60": STCMapping("2", ["BP", "30"], ServiceCategory.SURGICAL, 0.60),   # Endocrine
-        "61": STCMapping("2", ["BQ", "30"], ServiceCategory.SURGICAL, 0.60),   # Nervous
-        "62": STCMapping("2", ["BQ", "30"], ServiceCategory.SURGICAL, 0.60),
-        "63": STCMapping("2", ["BQ", "30"], ServiceCategory.SURGICAL, 0.60),
-        "64": STCMapping("2", ["BQ", "30"], ServiceCategory.SURGICAL, 0.60),
-        "65": STCMapping("2", ["EE", "30"], ServiceCategory.SURGICAL, 0.65),   # Eye
-        "66": STCMapping("2", ["EE", "30"], ServiceCategory.SURGICAL, 0.65),
-        "67": STCMapping("2", ["EE", "30"], ServiceCategory.SURGICAL, 0.65),
-        "68": STCMapping("2", ["EE", "30"], ServiceCategory.SURGICAL, 0.65),
-        "69": STCMapping("2", ["71", "30"], ServiceCategory.SURGICAL, 0.60),   # Auditory
-        "70": STCMapping("4", ["62", "30"], ServiceCategory.RADIOLOGY, 0.65),  # Radiology
-        "71": STCMapping("4", ["62", "30"], ServiceCategory.RADIOLOGY, 0.65),
-        "72": STCMapping("4", ["62", "30"], ServiceCategory.RADIOLOGY, 0.65),
-        "73": STCMapping("4", ["62", "30"], ServiceCategory.RADIOLOGY, 0.65),
-        "74": STCMapping("4", ["62", "30"], ServiceCategory.RADIOLOGY, 0.65),
-        "75": STCMapping("4", ["62", "30"], ServiceCategory.RADIOLOGY, 0.65),
-        "76": STCMapping("4", ["73", "30"], ServiceCategory.RADIOLOGY, 0.65),
-        "77": STCMapping("6", ["ON", "30"], ServiceCategory.RADIOLOGY, 0.65),  # Radiation Oncology
-        "78": STCMapping("73", ["4", "30"], ServiceCategory.RADIOLOGY, 0.65),  # Nuclear Medicine
-        "79": STCMapping("4", ["73", "30"], ServiceCategory.RADIOLOGY, 0.65),
-        "80": STCMapping("5", ["66", "30"], ServiceCategory.LABORATORY, 0.65), # Laboratory
-        "81": STCMapping("5", ["66", "30"], ServiceCategory.LABORATORY, 0.65),
-        "82": STCMapping("5", ["66", "30"], ServiceCategory.LABORATORY, 0.65),
-        "83": STCMapping("5", ["66", "30"], ServiceCategory.LABORATORY, 0.65),
-        "84": STCMapping("5", ["66", "30"], ServiceCategory.LABORATORY, 0.65),
-        "85": STCMapping("5", ["66", "30"], ServiceCategory.LABORATORY, 0.65),
-        "86": STCMapping("5", ["66", "30"], ServiceCategory.LABORATORY, 0.65),
-        "87": STCMapping("5", ["66", "30"], ServiceCategory.LABORATORY, 0.65),
-        "88": STCMapping("66", ["5", "30"], ServiceCategory.LABORATORY, 0.65), # Pathology
-        "89": STCMapping("5", ["66", "30"], ServiceCategory.LABORATORY, 0.65),
-        "90": STCMapping("MH", ["80", "30"], ServiceCategory.MEDICAL, 0.55),   # Medicine
-        "91": STCMapping("1", ["30"], ServiceCategory.MEDICAL, 0.55),
-        "92": STCMapping("EE", ["AL", "30"], ServiceCategory.VISION, 0.65),    # Eye Services
-        "93": STCMapping("BL", ["73", "30"], ServiceCategory.MEDICAL, 0.65),   # Cardiovascular
-        "94": STCMapping("PU", ["73", "30"], ServiceCategory.MEDICAL, 0.65),   # Pulmonary
-        "95": STCMapping("BQ", ["GY", "30"], ServiceCategory.MEDICAL, 0.60),   # Neurology/Allergy
-        "96": STCMapping("MH", ["78", "30"], ServiceCategory.MEDICAL, 0.55),   # Various
-        "97": STCMapping("PT", ["AE", "AD", "30"], ServiceCategory.PHYSICAL_THERAPY, 0.70),
-        "98": STCMapping("98", ["1", "30"], ServiceCategory.MEDICAL, 0.60),
-        "99": STCMapping("98", ["1", "30"], ServiceCategory.MEDICAL, 0.70),    # E/M
-    }
-    
-    def get_stc(self, cpt_code: str) -> str:
+    def get_stc(self, cpt_code: str, payer: Optional[str] = None) -> str:
         """
         Returns the primary STC for a CPT code.
         """
-        mapping = self._get_mapping(cpt_code)
+        mapping = self._get_mapping(cpt_code, payer)
         return mapping.primary_stc
     
-    def get_stc_with_fallbacks(self, cpt_code: str) -> List[str]:
+    def get_stc_with_fallbacks(self, cpt_code: str, payer: Optional[str] = None) -> List[str]:
         """
         Returns ordered list of STCs to try (primary + fallbacks).
         """
-        mapping = self._get_mapping(cpt_code)
+        mapping = self._get_mapping(cpt_code, payer)
         stcs = [mapping.primary_stc]
         for fallback in mapping.fallback_stcs:
             if fallback not in stcs:
                 stcs.append(fallback)
         return stcs
     
-    def get_mapping(self, cpt_code: str) -> STCMapping:
+    def get_mapping(self, cpt_code: str, payer: Optional[str] = None) -> STCMapping:
         """
         Returns full mapping details including confidence score.
         """
-        return self._get_mapping(cpt_code)
+        return self._get_mapping(cpt_code, payer)
+    
+    def map_bulk(self, cpt_codes: Iterable[str], payer: Optional[str] = None) -> BulkSTCResult:
+        """
+        Maps many CPT codes at once and returns columnar NumPy arrays.
+
+        Codes are deduplicated first; plain 5-digit codes are resolved against
+        the range tables with one searchsorted call each, everything else goes
+        through the scalar resolver. Results match get_mapping row for row.
+        """
+        if np is None:
+            raise RuntimeError("numpy is required for STCMapper.map_bulk")
+
+        tables = self.tables.current().for_payer(payer)
+        codes = np.char.upper(np.char.strip(np.asarray(list(cpt_codes), dtype=str)))
+        unique, inverse = np.unique(codes, return_inverse=True)
+
+        # Each unique code resolves to a row of `table`
+        table: List[STCMapping] = []
+        table_ids: Dict[int, int] = {}
+
+        def table_id(mapping: STCMapping) -> int:
+            key = id(mapping)
+            if key not in table_ids:
+                table_ids[key] = len(table)
+                table.append(mapping)
+            return table_ids[key]
+
+        resolved = np.full(len(unique), -1, dtype=np.int64)
+        specific = np.array([code in tables.specific for code in unique.tolist()], dtype=bool)
+        pending = (np.char.str_len(unique) == 5) & np.char.isdigit(unique) & ~specific
+        for index in tables.range_indexes:
+            if index.numeric_starts is None or not pending.any():
+                continue
+            positions = np.searchsorted(
+                np.asarray(index.numeric_starts, dtype=np.int64),
+                unique[pending].astype(np.int64),
+                side="right",
+            ) - 1
+            resolved[pending] = np.array(
+                [
+                    table_id(index.mappings[p]) if p >= 0 and index.mappings[p] is not None else -1
+                    for p in positions.tolist()
+                ],
+                dtype=np.int64,
+            )
+            pending &= resolved < 0
+
+        # Specific codes, non-numeric codes and range misses: scalar path
+        for i in np.flatnonzero(resolved < 0).tolist():
+            resolved[i] = table_id(tables.resolve(str(unique[i])))
+
+        primary = np.array([m.primary_stc for m in table], dtype=str)
+        fallbacks = np.empty(len(table), dtype=object)
+        for i, mapping in enumerate(table):
+            fallbacks[i] = [stc for stc in dict.fromkeys(mapping.fallback_stcs) if stc != mapping.primary_stc]
+        categories = np.array([m.category.value for m in table], dtype=str)
+        confidences = np.array([m.confidence for m in table], dtype=np.float64)
+
+        rows = resolved[inverse]
+        return BulkSTCResult(
+            cpt=codes,
+            primary_stc=primary[rows],
+            fallback_stcs=fallbacks[rows],
+            category=categories[rows],
+            confidence=confidences[rows],
+        )
     
-    def _get_mapping(self, cpt_code: str) -> STCMapping:
+    def _get_mapping(self, cpt_code: str, payer: Optional[str] = None) -> STCMapping:
         """
         Internal method to resolve CPT → STC mapping.
         Priority: specific → range → category prefix → ultimate fallback
         """
-        # Normalize code
-        cpt_code = cpt_code.strip().upper()
-        
-        # 1. Try specific mapping (highest confidence)
-        if cpt_code in self.SPECIFIC_MAPPINGS:
-            return self.SPECIFIC_MAPPINGS[cpt_code]
-        
-        # 2. Try range mappings (medium confidence)
-        for start, end, mapping in self.RANGE_MAPPINGS:
-            if start <= cpt_code <= end:
-                return mapping
-        
-        # 3. Try category prefix (low confidence)
-        prefix = cpt_code[:2]
-        if prefix in self.CATEGORY_PREFIXES:
-            return self.CATEGORY_PREFIXES[prefix]
-        
-        # 4. Ultimate fallback
-        return STCMapping("30", ["1", "98"], ServiceCategory.MEDICAL, 0.40)
+        # Checks the data file for changes before hitting the result cache
+        tables = self.tables.current()
+        payer_key = _payer_key(payer) if payer and tables.overrides else None
+        return self.tables.resolve(cpt_code, payer_key)
     
-    def get_category(self, cpt_code: str) -> ServiceCategory:
+    def get_category(self, cpt_code: str, payer: Optional[str] = None) -> ServiceCategory:
         """
         Returns the service category for a CPT code.
         """
-        return self._get_mapping(cpt_code).category
+        return self._get_mapping(cpt_code, payer).category
     
-    def get_confidence(self, cpt_code: str) -> float:
+    def get_confidence(self, cpt_code: str, payer: Optional[str] = None) -> float:
         """
         Returns the confidence score (0-1) for the mapping.
         """
-        return self._get_mapping(cpt_code).confidence
+        return self._get_mapping(cpt_code, payer).confidence
+
+stc_tables = STCTableStore(
+    settings.STC_MAPPINGS_PATH or DEFAULT_TABLES_PATH,
+    reload_interval=settings.STC_MAPPINGS_RELOAD_SECONDS,
+)
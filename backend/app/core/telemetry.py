@@ -0,0 +1,154 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from sqlmodel import select
+
+from ..models.sql import PayerConfig
+from .db import async_session_factory
+
+
+class ChannelStats:
+    """
+    Rolling latency and failure statistics for one payer on one channel.
+
+    Latency and failure rate are exponentially weighted moving averages, so
+    recent calls dominate. A bounded window of recent latencies backs the
+    percentile estimates.
+    """
+
+    def __init__(self, alpha: float = 0.2, window: int = 200):
+        self.alpha = alpha
+        self.latency_ms: Optional[float] = None
+        self.failure_rate: float = 0.0
+        self.samples = 0
+        # How many of `samples` have been merged into the database
+        self.persisted_samples = 0
+        self.recent_latencies: Deque[float] = deque(maxlen=window)
+        self.last_updated = 0.0
+
+    def record(self, latency_ms: float, success: bool) -> None:
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms += self.alpha * (latency_ms - self.latency_ms)
+        self.failure_rate += self.alpha * ((0.0 if success else 1.0) - self.failure_rate)
+        self.recent_latencies.append(latency_ms)
+        self.samples += 1
+        self.last_updated = time.time()
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.recent_latencies:
+            return None
+        ordered = sorted(self.recent_latencies)
+        index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+
+class ChannelTelemetry:
+    """
+    Per-payer, per-channel latency/error telemetry used for routing.
+
+    Stats older than `stale_after_seconds` are ignored so a channel that was
+    marked unhealthy gets probed again once traffic stops flowing to it.
+    Routing uses this process's stats only; `persist` merges them into the
+    shared PayerConfig metrics for reporting.
+    """
+
+    PERSISTED_CHANNELS = ("stedi", "rpa")
+
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        window: int = 200,
+        min_samples: int = 5,
+        stale_after_seconds: float = 300.0,
+        session_factory=async_session_factory,
+    ):
+        self.session_factory = session_factory
+        self.alpha = alpha
+        self.window = window
+        self.min_samples = min_samples
+        self.stale_after_seconds = stale_after_seconds
+        self._stats: Dict[Tuple[str, str], ChannelStats] = {}
+
+    def record(self, payer: str, channel: str, latency_ms: float, success: bool) -> None:
+        key = (payer, channel)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = ChannelStats(alpha=self.alpha, window=self.window)
+        stats.record(latency_ms, success)
+
+    def get(self, payer: str, channel: str) -> Optional[ChannelStats]:
+        """
+        Returns stats only when there is enough recent data to act on.
+        """
+        stats = self._stats.get((payer, channel))
+        if stats is None or stats.samples < self.min_samples:
+            return None
+        if time.time() - stats.last_updated > self.stale_after_seconds:
+            return None
+        return stats
+
+    def snapshot(self) -> Dict[str, Dict[str, dict]]:
+        snapshot: Dict[str, Dict[str, dict]] = {}
+        for (payer, channel), stats in self._stats.items():
+            snapshot.setdefault(payer, {})[channel] = {
+                "latency_ms": round(stats.latency_ms or 0.0, 1),
+                "p95_ms": stats.percentile(95),
+                "failure_rate": round(stats.failure_rate, 4),
+                "samples": stats.samples,
+            }
+        return snapshot
+
+    async def persist(self) -> None:
+        """
+        Merges the samples recorded since the last persist into the matching
+        PayerConfig rows.
+
+        The API and every worker persist on their own schedule, so the stored
+        averages are combined with this process's, weighted by sample count,
+        rather than overwritten. The stored weight is capped at the latency
+        window so old history keeps fading out.
+        """
+        pending = {
+            key: (stats.samples - stats.persisted_samples, stats.latency_ms, stats.failure_rate)
+            for key, stats in self._stats.items()
+            if key[1] in self.PERSISTED_CHANNELS and stats.samples > stats.persisted_samples
+        }
+        if not pending:
+            return
+        payers = list({payer for payer, _ in pending})
+        async with self.session_factory() as session:
+            # Row locks keep concurrent merges from losing each other's samples
+            statement = select(PayerConfig).where(PayerConfig.name.in_(payers)).with_for_update()
+            for payer_config in (await session.exec(statement)).all():
+                for channel in self.PERSISTED_CHANNELS:
+                    update = pending.get((payer_config.name, channel))
+                    if update is not None:
+                        self._merge(payer_config, channel, *update)
+                session.add(payer_config)
+            await session.commit()
+
+        for (payer, channel), (new_samples, _, _) in pending.items():
+            self._stats[(payer, channel)].persisted_samples += new_samples
+
+    def _merge(self, payer_config: PayerConfig, channel: str, new_samples: int, latency_ms: float, failure_rate: float) -> None:
+        stored = min(getattr(payer_config, f"telemetry_samples_{channel}") or 0.0, float(self.window))
+        total = stored + new_samples
+        latency_field, failure_field = f"avg_latency_{channel}_ms", f"failure_rate_{channel}_24h"
+        merged_latency = (getattr(payer_config, latency_field) * stored + (latency_ms or 0.0) * new_samples) / total
+        merged_failure = (getattr(payer_config, failure_field) * stored + failure_rate * new_samples) / total
+        setattr(payer_config, latency_field, int(merged_latency))
+        setattr(payer_config, failure_field, round(merged_failure, 4))
+        setattr(payer_config, f"telemetry_samples_{channel}", min(total, float(self.window)))
+
+    async def run_persist_loop(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.persist()
+            except Exception as e:
+                print(f"Telemetry persist error: {e}")
@@ -4,6 +4,7 @@ from .api import vob, health
 from .api.v1.endpoints import async_vob
 from .models import sql
 from sqlmodel import SQLModel, create_engine
+import asyncio
 import logging
 
 # Setup logging
@@ -12,11 +13,48 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Lorelin VoB API")
 
-from .core.db import engine, create_db_and_tables
+from .core.db import async_engine, create_db_and_tables
+from .core.http_client import stedi_http_pool
+from .core.router import vob_router
+from .core.payer_registry import payer_registry
+from .services.job_events import job_event_bus
+from .services.webhooks import webhook_dispatcher
+from .connectors.browser_pool import rpa_browser_pool
+from .core.config import settings
+
+background_tasks = []
 
 @app.on_event("startup")
-def on_startup():
+async def on_startup():
     create_db_and_tables()
+    await stedi_http_pool.start()
+    await payer_registry.load()
+    background_tasks.append(asyncio.create_task(
+        payer_registry.run_refresh_loop(settings.PAYER_REGISTRY_REFRESH_SECONDS)
+    ))
+    background_tasks.append(asyncio.create_task(vob_router.cache.listen_for_invalidations()))
+    background_tasks.append(asyncio.create_task(job_event_bus.listen()))
+    if settings.JOB_QUEUE_MODE == "inline":
+        # No separate worker process, so deliver webhooks from here
+        background_tasks.append(asyncio.create_task(webhook_dispatcher.run()))
+    background_tasks.append(asyncio.create_task(
+        vob_router.telemetry.run_persist_loop(settings.VOB_TELEMETRY_PERSIST_SECONDS)
+    ))
+    if settings.RPA_BROWSER_POOL_ENABLED:
+        try:
+            await rpa_browser_pool.start()
+        except Exception as e:
+            # RPA falls back to launching a browser per check
+            logger.error(f"RPA browser pool failed to start: {e}")
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    for task in background_tasks:
+        task.cancel()
+    background_tasks.clear()
+    await stedi_http_pool.close()
+    await rpa_browser_pool.close()
+    await async_engine.dispose()
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -1,2 +1,3 @@
 from .job import Job
+from .webhook import WebhookDelivery, WebhookDeadLetter
 # from .sql import * # Avoid importing sqlmodel to prevent hang with greenlet
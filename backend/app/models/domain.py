@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import AnyHttpUrl, BaseModel, Field
 from typing import List, Optional, Dict, Any
 from datetime import date, datetime
 from enum import Enum
@@ -87,6 +87,8 @@ class Coinsurance(BaseModel):
 class Financials(BaseModel):
     deductible: Optional[Deductible] = None
     oop_max: Optional[OOPMax] = None
+    deductible_out_of_network: Optional[Deductible] = None
+    oop_max_out_of_network: Optional[OOPMax] = None
     copays: List[Copay] = []
     coinsurance: List[Coinsurance] = []
 
@@ -120,6 +122,13 @@ class VoBRequest(BaseModel):
     services: List[ServiceInfo] = []
     visit_date: Optional[date] = None
 
+class AsyncVoBRequest(VoBRequest):
+    # Completed (or finally failed) results are POSTed here, signed
+    callback_url: Optional[AnyHttpUrl] = None
+
+class VoBBatchRequest(BaseModel):
+    requests: List[VoBRequest]
+
 class VoBResult(BaseModel):
     request_id: str
     coverage_status: CoverageStatus
@@ -12,7 +12,7 @@ class JobStatus(str, Enum):
 
 class Job(SQLModel, table=True):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
-    status: JobStatus = Field(default=JobStatus.QUEUED)
+    status: JobStatus = Field(default=JobStatus.QUEUED, index=True)
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
     
@@ -22,9 +22,22 @@ class Job(SQLModel, table=True):
     # Store the result
     result: Optional[Dict[str, Any]] = Field(default=None, sa_type=JSON)
     
+    # Channel that produced the result: stedi, rpa, mock or cache
+    channel: Optional[str] = None
+
+    # Webhook to notify when the job finishes (see app.services.webhooks)
+    callback_url: Optional[str] = None
+
     # Progress tracking
     progress_step: Optional[str] = None
     progress_percent: int = 0
     
     # Error tracking
     error_message: Optional[str] = None
+
+    # Queue bookkeeping (see app.services.job_queue)
+    attempts: int = 0
+    max_attempts: int = 3
+    available_at: datetime = Field(default_factory=datetime.now, index=True)
+    locked_by: Optional[str] = None
+    locked_until: Optional[datetime] = None
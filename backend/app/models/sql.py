@@ -13,19 +13,26 @@ class PayerConfig(SQLModel, table=True):
     __tablename__ = "payer_config"
     
     id: UUID = Field(default_factory=uuid4, primary_key=True)
-    name: str
+    name: str = Field(index=True)
     stedi_payer_code: Optional[str] = None
     stedi_supported: bool = False
     stedi_enrollment_status: str = "none" # none, pending, active
     rpa_supported: bool = False
     preferred_channel: ChannelPreference = ChannelPreference.STEDI
     fallback_channel: ChannelPreference = ChannelPreference.RPA
+    # Race the fallback channel when the preferred one is slower than usual
+    hedge_enabled: bool = False
+    hedge_after_ms: Optional[int] = None # overrides the telemetry p95 threshold
     
     # Metrics
     failure_rate_stedi_24h: float = 0.0
     failure_rate_rpa_24h: float = 0.0
     avg_latency_stedi_ms: int = 0
     avg_latency_rpa_ms: int = 0
+    # Sample weight behind the metrics above, so each process merges its own
+    # telemetry in rather than overwriting the others'
+    telemetry_samples_stedi: float = 0.0
+    telemetry_samples_rpa: float = 0.0
     
     notes: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,47 @@
+from typing import Optional, Dict, Any
+from datetime import datetime
+from sqlmodel import SQLModel, Field, JSON
+from enum import Enum
+import uuid
+
+class WebhookStatus(str, Enum):
+    PENDING = "pending"
+    DELIVERED = "delivered"
+    DEAD = "dead"
+
+class WebhookDelivery(SQLModel, table=True):
+    __tablename__ = "webhook_delivery"
+
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
+    job_id: str = Field(index=True)
+    event: str  # job.completed, job.failed
+    url: str
+    # Exact body that gets signed and sent; fixed at enqueue time
+    payload: Dict[str, Any] = Field(default={}, sa_type=JSON)
+
+    status: WebhookStatus = Field(default=WebhookStatus.PENDING, index=True)
+    attempts: int = 0
+    max_attempts: int = 8
+    next_attempt_at: datetime = Field(default_factory=datetime.now, index=True)
+    locked_by: Optional[str] = None
+    locked_until: Optional[datetime] = None
+
+    last_status_code: Optional[int] = None
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+    delivered_at: Optional[datetime] = None
+
+class WebhookDeadLetter(SQLModel, table=True):
+    __tablename__ = "webhook_dead_letter"
+
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
+    delivery_id: str = Field(index=True)
+    job_id: str = Field(index=True)
+    event: str
+    url: str
+    payload: Dict[str, Any] = Field(default={}, sa_type=JSON)
+    attempts: int = 0
+    last_status_code: Optional[int] = None
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, Set
+
+from redis import asyncio as aioredis
+
+from ..core.config import settings
+from ..models.job import Job, JobStatus
+
+
+def job_status_payload(job: Job) -> Dict[str, Any]:
+    """
+    Client-facing job status; also the shape of streamed events and webhooks.
+    """
+    response = {
+        "job_id": job.id,
+        "status": job.status,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at
+    }
+
+    if job.status == JobStatus.PROCESSING:
+        response["progress"] = {
+            "step": job.progress_step,
+            "percent": job.progress_percent
+        }
+        response["estimated_remaining_seconds"] = 15 # Mock
+
+    if job.status == JobStatus.COMPLETED:
+        response["channel"] = job.channel
+        response["result"] = job.result
+
+    if job.status == JobStatus.FAILED:
+        response["error"] = job.error_message
+
+    return response
+
+
+class JobEventBus:
+    """
+    Fans job status changes out to clients streaming progress.
+
+    Events are delivered to subscribers in this process directly and, when
+    Redis is configured, published so API instances can pick up progress
+    from jobs running in separate queue workers. Delivery is best effort:
+    streams re-read the job table periodically to cover anything missed.
+    """
+
+    CHANNEL = "vob:jobs"
+
+    def __init__(self, redis=None, queue_size: int = 100):
+        self.redis = redis
+        self.queue_size = queue_size
+        self.instance_id = uuid.uuid4().hex
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        self._deliver(event)
+        if not self.redis:
+            return
+        try:
+            await self.redis.publish(self.CHANNEL, f"{self.instance_id}|{json.dumps(event, default=str)}")
+        except Exception as e:
+            print(f"Job event publish error: {e}")
+
+    @asynccontextmanager
+    async def subscribe(self, job_ids: Iterable[str]) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        job_ids = set(job_ids)
+        for job_id in job_ids:
+            self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            for job_id in job_ids:
+                subscribers = self._subscribers.get(job_id)
+                if subscribers is not None:
+                    subscribers.discard(queue)
+                    if not subscribers:
+                        del self._subscribers[job_id]
+
+    async def listen(self) -> None:
+        """
+        Relays events published by other processes to local subscribers.
+        Runs for the lifetime of the application; reconnects on Redis errors.
+        """
+        if not self.redis:
+            return
+
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    origin, _, payload = message["data"].partition("|")
+                    if origin != self.instance_id:
+                        self._deliver(json.loads(payload))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Job event listener error: {e}")
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        for queue in self._subscribers.get(event.get("job_id"), ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow consumer; it will catch up from the periodic re-read
+                pass
+
+
+job_event_bus = JobEventBus(
+    redis=aioredis.from_url(settings.REDIS_URL, decode_responses=True) if settings.REDIS_URL else None,
+)
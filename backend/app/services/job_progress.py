@@ -0,0 +1,80 @@
+import json
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from redis import asyncio as aioredis
+
+from ..core.config import settings
+
+
+class JobProgressStore:
+    """
+    Latest status payload of each job, kept out of the database.
+
+    `process_job` writes intermediate progress here instead of committing
+    the Job row at every step; the row is only written when the job
+    finishes (or is requeued). Status reads check this store first and go
+    to the database only for jobs it doesn't know about.
+
+    Entries for running jobs expire with the queue lease, so a job whose
+    worker died falls back to the database view. Finished jobs are kept for
+    `terminal_ttl_seconds` to absorb the final burst of polls.
+    """
+
+    KEY_PREFIX = "job:status:"
+    TERMINAL_STATUSES = ("completed", "failed")
+
+    def __init__(self, redis=None, running_ttl_seconds: float = 300.0, terminal_ttl_seconds: float = 300.0):
+        self.redis = redis
+        self.running_ttl_seconds = running_ttl_seconds
+        self.terminal_ttl_seconds = terminal_ttl_seconds
+        # job_id -> (payload, expires_at); also serves reads when Redis is down
+        self._local: Dict[str, Tuple[Dict[str, Any], float]] = {}
+
+    async def save(self, status: Dict[str, Any]) -> None:
+        terminal = status.get("status") in self.TERMINAL_STATUSES
+        ttl = self.terminal_ttl_seconds if terminal else self.running_ttl_seconds
+        self._prune()
+        self._local[status["job_id"]] = (status, time.monotonic() + ttl)
+        if not self.redis:
+            return
+        try:
+            await self.redis.set(self.KEY_PREFIX + status["job_id"], json.dumps(status, default=str), ex=max(int(ttl), 1))
+        except Exception as e:
+            print(f"Job progress store save error: {e}")
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return (await self.get_many([job_id])).get(job_id)
+
+    async def get_many(self, job_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        job_ids = list(job_ids)
+        found: Dict[str, Dict[str, Any]] = {}
+        now = time.monotonic()
+        for job_id in job_ids:
+            entry = self._local.get(job_id)
+            if entry is not None and entry[1] > now:
+                found[job_id] = entry[0]
+
+        missing = [job_id for job_id in job_ids if job_id not in found]
+        if missing and self.redis:
+            try:
+                values = await self.redis.mget([self.KEY_PREFIX + job_id for job_id in missing])
+                for job_id, value in zip(missing, values):
+                    if value:
+                        found[job_id] = json.loads(value)
+            except Exception as e:
+                print(f"Job progress store get error: {e}")
+        return found
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        expired = [job_id for job_id, (_, expires_at) in self._local.items() if expires_at <= now]
+        for job_id in expired:
+            del self._local[job_id]
+
+
+job_progress_store = JobProgressStore(
+    redis=aioredis.from_url(settings.REDIS_URL, decode_responses=True) if settings.REDIS_URL else None,
+    running_ttl_seconds=settings.JOB_VISIBILITY_TIMEOUT_SECONDS,
+    terminal_ttl_seconds=settings.JOB_PROGRESS_TERMINAL_TTL_SECONDS,
+)
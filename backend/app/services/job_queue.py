@@ -0,0 +1,163 @@
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import and_, or_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.config import settings
+from ..core.db import async_session_factory
+from ..models.job import Job, JobStatus
+
+
+class JobQueue:
+    """
+    Durable eligibility job queue backed by the `job` table.
+
+    Workers claim jobs with SELECT ... FOR UPDATE SKIP LOCKED, so any number
+    of worker processes (on any machine) can poll the same table without
+    handing out a job twice. A claimed job is leased until `locked_until`;
+    if its worker dies the lease lapses and the job becomes claimable again
+    while attempts remain (see `fail_exhausted` for the last one).
+    Failed attempts are retried with exponential backoff up to the job's
+    `max_attempts`. (SQLite ignores FOR UPDATE, so run a single worker
+    against it in development.)
+    """
+
+    def __init__(
+        self,
+        visibility_timeout_seconds: float = 300.0,
+        retry_backoff_seconds: float = 10.0,
+        session_factory=async_session_factory,
+    ):
+        self.session_factory = session_factory
+        self.visibility_timeout = timedelta(seconds=visibility_timeout_seconds)
+        self.retry_backoff_seconds = retry_backoff_seconds
+
+    async def claim(self, worker_id: str, limit: int) -> List[Job]:
+        """
+        Leases up to `limit` runnable jobs to `worker_id`. Returned jobs are
+        detached from their session.
+        """
+        now = datetime.now()
+        async with self.session_factory() as session:
+            statement = (
+                select(Job)
+                .where(
+                    or_(
+                        and_(Job.status == JobStatus.QUEUED, Job.available_at <= now),
+                        # Lease expired: the previous worker died mid-job
+                        and_(
+                            Job.status == JobStatus.PROCESSING,
+                            Job.locked_until < now,
+                            Job.attempts < Job.max_attempts,
+                        ),
+                    )
+                )
+                .order_by(Job.available_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            jobs = list((await session.exec(statement)).all())
+            for job in jobs:
+                self._lease(job, worker_id, now)
+                session.add(job)
+            await session.commit()
+            return jobs
+
+    async def fail_exhausted(self, session: AsyncSession, limit: int) -> List[Job]:
+        """
+        Fails jobs whose lease expired on their last attempt, in the caller's
+        session. They would otherwise sit in PROCESSING forever, since every
+        attempt that crashes or hangs its worker ends the same way.
+        """
+        now = datetime.now()
+        statement = (
+            select(Job)
+            .where(
+                Job.status == JobStatus.PROCESSING,
+                Job.locked_until < now,
+                Job.attempts >= Job.max_attempts,
+            )
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        jobs = list((await session.exec(statement)).all())
+        for job in jobs:
+            self.fail(job, f"Lease expired on attempt {job.attempts} of {job.max_attempts}", retry=False)
+            session.add(job)
+        return jobs
+
+    async def claim_job(self, session: AsyncSession, job: Job, worker_id: str) -> None:
+        """
+        Leases a specific job in the caller's session (inline execution).
+        """
+        self._lease(job, worker_id, datetime.now())
+        session.add(job)
+        await session.commit()
+
+    async def holds_lease(self, session: AsyncSession, job: Job, worker_id: str) -> bool:
+        """
+        Locks the job's row and checks `worker_id` still holds its lease. A
+        worker whose heartbeats stalled may have lost the job to another;
+        only the current holder may write the outcome.
+        """
+        statement = select(Job.locked_by, Job.status).where(Job.id == job.id).with_for_update()
+        # Don't flush in-memory progress onto a row we may no longer own
+        with session.no_autoflush:
+            row = (await session.exec(statement)).first()
+        return row is not None and row.locked_by == worker_id and row.status == JobStatus.PROCESSING
+
+    async def extend(self, job_ids: List[str], worker_id: str) -> None:
+        """
+        Heartbeat: pushes out the lease on jobs this worker still holds.
+        """
+        if not job_ids:
+            return
+        locked_until = datetime.now() + self.visibility_timeout
+        async with self.session_factory() as session:
+            statement = select(Job).where(Job.id.in_(job_ids), Job.locked_by == worker_id)
+            for job in (await session.exec(statement)).all():
+                job.locked_until = locked_until
+                session.add(job)
+            await session.commit()
+
+    def complete(self, job: Job, result: dict) -> None:
+        job.result = result
+        job.status = JobStatus.COMPLETED
+        job.progress_step = "completed"
+        job.progress_percent = 100
+        self._release(job)
+
+    def fail(self, job: Job, error: str, retry: bool = True) -> None:
+        """
+        Records a failed attempt; requeues with backoff while attempts remain
+        (and the failure is worth retrying).
+        """
+        job.error_message = error
+        if retry and job.attempts < job.max_attempts:
+            job.status = JobStatus.QUEUED
+            job.progress_step = "retry_scheduled"
+            delay = self.retry_backoff_seconds * (2 ** (job.attempts - 1))
+            job.available_at = datetime.now() + timedelta(seconds=delay)
+        else:
+            job.status = JobStatus.FAILED
+        self._release(job)
+
+    def _lease(self, job: Job, worker_id: str, now: datetime) -> None:
+        job.status = JobStatus.PROCESSING
+        job.attempts += 1
+        job.locked_by = worker_id
+        job.locked_until = now + self.visibility_timeout
+        job.updated_at = now
+
+    def _release(self, job: Job) -> None:
+        job.locked_by = None
+        job.locked_until = None
+        job.updated_at = datetime.now()
+
+
+job_queue = JobQueue(
+    visibility_timeout_seconds=settings.JOB_VISIBILITY_TIMEOUT_SECONDS,
+    retry_backoff_seconds=settings.JOB_RETRY_BACKOFF_SECONDS,
+)
@@ -0,0 +1,283 @@
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import or_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.config import settings
+from ..core.db import async_session_factory
+from ..core.http_client import HTTPClientPool
+from ..models.job import Job, JobStatus
+from ..models.webhook import WebhookDeadLetter, WebhookDelivery, WebhookStatus
+from .job_events import job_status_payload
+
+SIGNATURE_HEADER = "X-Lorelin-Signature"
+
+
+class CallbackURLError(ValueError):
+    pass
+
+
+def _host_allowed(host: str, allowed_hosts: Iterable[str]) -> bool:
+    for pattern in allowed_hosts:
+        pattern = pattern.lower().rstrip(".")
+        if pattern.startswith("*."):
+            if host.endswith(pattern[1:]):
+                return True
+        elif host == pattern:
+            return True
+    return False
+
+
+def _is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    # is_global excludes private, loopback, link-local, reserved and shared ranges
+    return ip.is_global and not ip.is_multicast
+
+
+async def _resolve(host: str, port: int) -> List[str]:
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+
+async def validate_callback_url(url: str, allowed_hosts: Optional[Iterable[str]] = None) -> str:
+    """
+    Raises CallbackURLError unless `url` is https, its host is allowlisted and
+    every address it resolves to is public. Checked when a job is submitted
+    and again before each delivery, since DNS can change in between.
+    """
+    allowed_hosts = settings.WEBHOOK_ALLOWED_HOSTS if allowed_hosts is None else allowed_hosts
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower().rstrip(".")
+    if parts.scheme != "https" or not host:
+        raise CallbackURLError("callback_url must be an https URL")
+    if parts.username or parts.password:
+        raise CallbackURLError("callback_url must not contain credentials")
+    if not _host_allowed(host, allowed_hosts):
+        raise CallbackURLError(f"callback_url host {host!r} is not allowed")
+
+    try:
+        addresses = await _resolve(host, parts.port or 443)
+    except (socket.gaierror, UnicodeError) as e:
+        raise CallbackURLError(f"callback_url host {host!r} does not resolve: {e}")
+    if not addresses or not all(_is_public_address(address) for address in addresses):
+        raise CallbackURLError(f"callback_url host {host!r} resolves to a non-public address")
+    return url
+
+
+def sign_payload(secret: str, timestamp: int, body: bytes) -> str:
+    """
+    HMAC-SHA256 over "<timestamp>.<body>". Receivers recompute it with the
+    shared secret and should reject stale timestamps to prevent replays.
+    """
+    message = str(timestamp).encode() + b"." + body
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+class WebhookDispatcher:
+    """
+    Delivers finished job results to each job's callback URL.
+
+    Deliveries are rows in `webhook_delivery`, written in the same
+    transaction that finishes the job, so a result is never lost between
+    the job commit and the send. A pool of `concurrency` senders claims
+    due rows (FOR UPDATE SKIP LOCKED, like the job queue), POSTs the signed
+    payload and retries non-2xx responses with exponential backoff. After
+    `max_attempts` the delivery is copied to `webhook_dead_letter`.
+
+    Payloads carry PHI, so nothing is sent without a signing secret, and the
+    URL is re-validated (https, allowlisted host, public addresses) before
+    every attempt.
+    """
+
+    def __init__(
+        self,
+        session_factory=async_session_factory,
+        http_pool: Optional[HTTPClientPool] = None,
+        concurrency: int = 8,
+        max_attempts: int = 8,
+        retry_backoff_seconds: float = 30.0,
+        max_backoff_seconds: float = 3600.0,
+        lease_seconds: float = 120.0,
+        poll_interval: float = 1.0,
+        secret: str = "",
+        allowed_hosts: Optional[List[str]] = None,
+    ):
+        self.session_factory = session_factory
+        self.http_pool = http_pool or HTTPClientPool(
+            "webhooks",
+            max_connections=concurrency * 2,
+            max_keepalive_connections=concurrency,
+            http2=False,
+            timeout=settings.WEBHOOK_TIMEOUT_SECONDS,
+        )
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.lease = timedelta(seconds=lease_seconds)
+        self.poll_interval = poll_interval
+        self.secret = secret
+        self.allowed_hosts = allowed_hosts
+        self._running: Dict[str, asyncio.Task] = {}
+        self._stopping = asyncio.Event()
+
+    def enqueue(self, session: AsyncSession, job: Job) -> Optional[WebhookDelivery]:
+        """
+        Adds a delivery for a finished job to the caller's transaction.
+        """
+        if not job.callback_url or job.status not in (JobStatus.COMPLETED, JobStatus.FAILED):
+            return None
+        event = "job.completed" if job.status == JobStatus.COMPLETED else "job.failed"
+        delivery = WebhookDelivery(
+            job_id=job.id,
+            event=event,
+            url=job.callback_url,
+            payload={"event": event, "job": jsonable_encoder(job_status_payload(job))},
+            max_attempts=self.max_attempts,
+        )
+        session.add(delivery)
+        return delivery
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def run(self) -> None:
+        worker_id = f"webhooks:{id(self):x}"
+        errors = 0
+        try:
+            while not self._stopping.is_set():
+                free = self.concurrency - len(self._running)
+                try:
+                    claimed = await self.claim(worker_id, free) if free > 0 else []
+                except Exception as e:
+                    # Keep polling through database blips, backing off
+                    errors += 1
+                    delay = min(self.max_backoff_seconds, self.poll_interval * 2 ** errors)
+                    print(f"Webhook claim failed ({errors} in a row), retrying in {delay:.1f}s: {e}")
+                    await self._idle(delay)
+                    continue
+                errors = 0
+
+                for delivery in claimed:
+                    task = asyncio.create_task(self.deliver(delivery))
+                    self._running[delivery.id] = task
+                    task.add_done_callback(lambda _, delivery_id=delivery.id: self._running.pop(delivery_id, None))
+
+                if not claimed:
+                    await self._idle(self.poll_interval)
+        finally:
+            if self._running:
+                await asyncio.gather(*self._running.values(), return_exceptions=True)
+            await self.http_pool.close()
+
+    async def _idle(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def claim(self, worker_id: str, limit: int) -> List[WebhookDelivery]:
+        now = datetime.now()
+        async with self.session_factory() as session:
+            statement = (
+                select(WebhookDelivery)
+                .where(
+                    WebhookDelivery.status == WebhookStatus.PENDING,
+                    WebhookDelivery.next_attempt_at <= now,
+                    or_(WebhookDelivery.locked_until.is_(None), WebhookDelivery.locked_until < now),
+                )
+                .order_by(WebhookDelivery.next_attempt_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            deliveries = list((await session.exec(statement)).all())
+            for delivery in deliveries:
+                delivery.locked_by = worker_id
+                delivery.locked_until = now + self.lease
+                session.add(delivery)
+            await session.commit()
+            return deliveries
+
+    async def deliver(self, delivery: WebhookDelivery) -> None:
+        body = json.dumps(delivery.payload, separators=(",", ":"), sort_keys=True).encode()
+        timestamp = int(time.time())
+        headers = {
+            "Content-Type": "application/json",
+            "User-Agent": "Lorelin-Webhooks/1.0",
+            "X-Lorelin-Event": delivery.event,
+            "X-Lorelin-Delivery": delivery.id,
+        }
+        status_code: Optional[int] = None
+        error: Optional[str] = None
+        try:
+            if not self.secret:
+                raise CallbackURLError("WEBHOOK_SIGNING_SECRET is not set; refusing to send unsigned")
+            headers[SIGNATURE_HEADER] = f"t={timestamp},v1={sign_payload(self.secret, timestamp, body)}"
+            await validate_callback_url(delivery.url, self.allowed_hosts)
+            response = await self.http_pool.client.post(delivery.url, content=body, headers=headers)
+            status_code = response.status_code
+            if not 200 <= status_code < 300:
+                error = f"HTTP {status_code}"
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+
+        await self._record_attempt(delivery.id, status_code, error)
+
+    async def _record_attempt(self, delivery_id: str, status_code: Optional[int], error: Optional[str]) -> None:
+        async with self.session_factory() as session:
+            delivery = await session.get(WebhookDelivery, delivery_id)
+            if delivery is None:
+                return
+            now = datetime.now()
+            delivery.attempts += 1
+            delivery.last_status_code = status_code
+            delivery.last_error = error
+            delivery.locked_by = None
+            delivery.locked_until = None
+            delivery.updated_at = now
+
+            if error is None:
+                delivery.status = WebhookStatus.DELIVERED
+                delivery.delivered_at = now
+            elif delivery.attempts >= delivery.max_attempts:
+                delivery.status = WebhookStatus.DEAD
+                session.add(WebhookDeadLetter(
+                    delivery_id=delivery.id,
+                    job_id=delivery.job_id,
+                    event=delivery.event,
+                    url=delivery.url,
+                    payload=delivery.payload,
+                    attempts=delivery.attempts,
+                    last_status_code=status_code,
+                    last_error=error,
+                ))
+                print(f"Webhook {delivery.id} for job {delivery.job_id} dead-lettered: {error}")
+            else:
+                delay = min(self.max_backoff_seconds, self.retry_backoff_seconds * (2 ** (delivery.attempts - 1)))
+                delivery.next_attempt_at = now + timedelta(seconds=delay)
+
+            session.add(delivery)
+            await session.commit()
+
+
+webhook_dispatcher = WebhookDispatcher(
+    concurrency=settings.WEBHOOK_CONCURRENCY,
+    max_attempts=settings.WEBHOOK_MAX_ATTEMPTS,
+    retry_backoff_seconds=settings.WEBHOOK_RETRY_BACKOFF_SECONDS,
+    poll_interval=settings.WEBHOOK_POLL_INTERVAL_SECONDS,
+    secret=settings.WEBHOOK_SIGNING_SECRET,
+    allowed_hosts=settings.WEBHOOK_ALLOWED_HOSTS,
+)
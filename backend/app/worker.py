@@ -0,0 +1,184 @@
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import uuid
+from typing import Dict
+
+from pydantic import ValidationError
+
+from .core.config import settings
+from .core.db import async_engine, create_db_and_tables
+from .core.http_client import stedi_http_pool
+from .connectors.browser_pool import rpa_browser_pool
+from .models.domain import VoBRequest
+from .models.job import Job
+from .services.job_queue import JobQueue, job_queue
+from .services.webhooks import webhook_dispatcher
+from .api.v1.endpoints.async_vob import process_job, publish_job_status
+from .core.router import vob_router
+from .core.payer_registry import payer_registry
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    """
+    Standalone worker that drains the job queue with bounded concurrency.
+
+    Run with `python -m app.worker`. Any number of workers can run against
+    the same database; each heartbeats the leases of the jobs it holds so a
+    long RPA session is not mistaken for a dead worker.
+    """
+
+    def __init__(self, queue: JobQueue, concurrency: int, poll_interval: float, max_backoff_seconds: float = 30.0):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.max_backoff_seconds = max_backoff_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._running: Dict[str, asyncio.Task] = {}
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def run(self) -> None:
+        logger.info(f"Worker {self.worker_id} started (concurrency={self.concurrency})")
+        heartbeat = asyncio.create_task(self._heartbeat())
+        errors = 0
+        try:
+            while not self._stopping.is_set():
+                free = self.concurrency - len(self._running)
+                try:
+                    await self._fail_exhausted()
+                    claimed = await self.queue.claim(self.worker_id, free) if free > 0 else []
+                except Exception as e:
+                    # Database blip: back off and keep polling rather than exit
+                    errors += 1
+                    delay = min(self.max_backoff_seconds, self.poll_interval * 2 ** errors)
+                    logger.error(f"Job polling failed ({errors} in a row), retrying in {delay:.1f}s: {e}")
+                    await self._idle(delay)
+                    continue
+                errors = 0
+
+                for job in claimed:
+                    try:
+                        request = VoBRequest.model_validate(job.request_payload)
+                    except ValidationError as e:
+                        await self._reject(job.id, f"Invalid request payload: {e}")
+                        continue
+                    self._start(job.id, request)
+
+                if not claimed:
+                    await self._idle(self.poll_interval)
+        finally:
+            # Let in-flight jobs finish; unfinished leases lapse and are retried elsewhere
+            if self._running:
+                logger.info(f"Waiting for {len(self._running)} running jobs")
+                await asyncio.gather(*self._running.values(), return_exceptions=True)
+            heartbeat.cancel()
+
+    async def _idle(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _fail_exhausted(self) -> None:
+        async with self.queue.session_factory() as db:
+            jobs = await self.queue.fail_exhausted(db, limit=self.concurrency)
+            if not jobs:
+                return
+            for job in jobs:
+                webhook_dispatcher.enqueue(db, job)
+            await db.commit()
+        for job in jobs:
+            logger.warning(f"Job {job.id} failed: {job.error_message}")
+            await publish_job_status(job)
+
+    async def _reject(self, job_id: str, error: str) -> None:
+        # Retrying can't fix a bad payload, so the job fails outright
+        try:
+            async with self.queue.session_factory() as db:
+                job = await db.get(Job, job_id)
+                if job is None:
+                    return
+                self.queue.fail(job, error, retry=False)
+                webhook_dispatcher.enqueue(db, job)
+                db.add(job)
+                await db.commit()
+            await publish_job_status(job)
+        except Exception as e:
+            # The lease lapses and the job is picked up (and rejected) again
+            logger.error(f"Could not fail job {job_id}: {e}")
+
+    def _start(self, job_id: str, request: VoBRequest) -> None:
+        task = asyncio.create_task(process_job(job_id, request, worker_id=self.worker_id))
+        self._running[job_id] = task
+        task.add_done_callback(lambda _: self._running.pop(job_id, None))
+
+    async def _heartbeat(self) -> None:
+        interval = self.queue.visibility_timeout.total_seconds() / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.queue.extend(list(self._running.keys()), self.worker_id)
+            except Exception as e:
+                logger.error(f"Lease heartbeat failed: {e}")
+
+
+async def run_worker(concurrency: int, poll_interval: float) -> None:
+    create_db_and_tables()
+    await stedi_http_pool.start()
+    if settings.RPA_BROWSER_POOL_ENABLED:
+        try:
+            await rpa_browser_pool.start()
+        except Exception as e:
+            logger.error(f"RPA browser pool failed to start: {e}")
+
+    await payer_registry.load()
+    background = [
+        asyncio.create_task(payer_registry.run_refresh_loop(settings.PAYER_REGISTRY_REFRESH_SECONDS)),
+        asyncio.create_task(vob_router.telemetry.run_persist_loop(settings.VOB_TELEMETRY_PERSIST_SECONDS)),
+        # Keep this worker's L1 cache in step with writes and invalidations elsewhere
+        asyncio.create_task(vob_router.cache.listen_for_invalidations()),
+    ]
+
+    worker = JobWorker(job_queue, concurrency=concurrency, poll_interval=poll_interval)
+    def stop() -> None:
+        worker.stop()
+        webhook_dispatcher.stop()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop)
+
+    try:
+        # Job processing and webhook delivery have separate concurrency limits;
+        # if one loop dies the other keeps going until shutdown
+        results = await asyncio.gather(worker.run(), webhook_dispatcher.run(), return_exceptions=True)
+        for name, result in zip(("Job worker", "Webhook dispatcher"), results):
+            if isinstance(result, BaseException):
+                logger.error(f"{name} stopped with an error: {result!r}")
+    finally:
+        for task in background:
+            task.cancel()
+        await rpa_browser_pool.close()
+        await stedi_http_pool.close()
+        await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lorelin VoB job worker")
+    parser.add_argument("--concurrency", type=int, default=settings.JOB_WORKER_CONCURRENCY)
+    parser.add_argument("--poll-interval", type=float, default=settings.JOB_POLL_INTERVAL_SECONDS)
+    args = parser.parse_args()
+    asyncio.run(run_worker(args.concurrency, args.poll_interval))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import argparse
+import os
+import random
+import sys
+import timeit
+from typing import Any, Dict, List
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.connectors.stedi_parser import parse_financials
+from app.models.domain import Coinsurance, Copay, Deductible, Financials, MoneyAmount, NetworkType, OOPMax
+
+STCS = ["30", "98", "1", "2", "4", "5", "33", "47", "48", "50", "86", "88", "AL", "BZ", "MH", "PT", "UC"]
+
+
+def legacy_parse_financials(benefits: List[Dict[str, Any]]) -> Financials:
+    """
+    The pre-index parser from StediConnector._parse_stedi_response, kept
+    verbatim (in-network, individual only) for comparison.
+    """
+    financials = Financials()
+    for benefit in benefits:
+        amounts = benefit.get("amounts", {})
+
+        deductible_data = amounts.get("deductible", {})
+        if deductible_data:
+            if not financials.deductible:
+                financials.deductible = Deductible()
+            in_network = deductible_data.get("inNetwork")
+            if in_network:
+                financials.deductible.individual = MoneyAmount(
+                    total=float(in_network.get("total", 0)),
+                    remaining=float(in_network.get("remaining", 0))
+                )
+
+        oop_data = amounts.get("outOfPocket", {})
+        if oop_data:
+            if not financials.oop_max:
+                financials.oop_max = OOPMax()
+            in_network = oop_data.get("inNetwork")
+            if in_network:
+                financials.oop_max.individual = MoneyAmount(
+                    total=float(in_network.get("total", 0)),
+                    remaining=float(in_network.get("remaining", 0))
+                )
+
+        copay_data = amounts.get("copay", {})
+        if copay_data:
+            in_network = copay_data.get("inNetwork")
+            if in_network:
+                financials.copays.append(Copay(
+                    service_type=benefit.get("name", "General"),
+                    amount=float(in_network.get("amount", 0)),
+                    network=NetworkType.IN_NETWORK
+                ))
+
+        coins_data = amounts.get("coinsurance", {})
+        if coins_data:
+            in_network = coins_data.get("inNetwork")
+            if in_network:
+                financials.coinsurance.append(Coinsurance(
+                    service_type=benefit.get("name", "General"),
+                    rate_pct=float(in_network.get("percentage", 0)),
+                    network=NetworkType.IN_NETWORK
+                ))
+    return financials
+
+
+def synthetic_benefits(count: int, out_of_network: bool = True, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    A large-employer style 271: STCs repeated per coverage level, with a mix
+    of accumulators, copays and coinsurance. With out_of_network=False only
+    in-network amounts are present, so both parsers build the same models.
+    """
+    rng = random.Random(seed)
+    benefits = []
+    for i in range(count):
+        kind = rng.choice(["deductible", "outOfPocket", "copay", "coinsurance", None])
+        benefit: Dict[str, Any] = {
+            "code": rng.choice(STCS),
+            "name": f"Benefit {i}",
+            "coverageLevel": rng.choice(["INDIVIDUAL", "FAMILY"]),
+        }
+        if kind in ("deductible", "outOfPocket"):
+            value = {"total": rng.randint(5, 100) * 100.0, "remaining": rng.randint(0, 50) * 100.0}
+        elif kind == "copay":
+            value = {"amount": rng.choice([20, 35, 50])}
+        elif kind == "coinsurance":
+            value = {"percentage": rng.choice([20, 30, 40])}
+        if kind:
+            networks = {"inNetwork": value}
+            if out_of_network:
+                networks["outOfNetwork"] = dict(value)
+            benefit["amounts"] = {kind: networks}
+        benefits.append(benefit)
+    return benefits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Stedi 271 benefit parser against the legacy one")
+    parser.add_argument("--sizes", default="10,100,500,2000", help="Comma-separated benefit counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # The legacy parser ignores out-of-network amounts, so the like-for-like
+    # comparison is the in-network workload; the mixed one shows the cost of
+    # also returning out-of-network models
+    for label, out_of_network in (("in-network only", False), ("in + out of network", True)):
+        print(f"\n{label}")
+        print(f"{'benefits':>9} {'legacy ms':>10} {'indexed ms':>11} {'speedup':>8}")
+        for size in (int(s) for s in args.sizes.split(",")):
+            benefits = synthetic_benefits(size, out_of_network=out_of_network)
+            number = max(1, 2000 // size)
+            legacy = min(timeit.repeat(lambda: legacy_parse_financials(benefits), number=number, repeat=args.repeat)) / number
+            indexed = min(timeit.repeat(lambda: parse_financials(benefits), number=number, repeat=args.repeat)) / number
+            print(f"{size:>9} {legacy * 1000:>10.3f} {indexed * 1000:>11.3f} {legacy / indexed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import csv
+import os
+import sys
+import time
+from typing import Optional
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.stc_mapper import STCMapper
+
+OUTPUT_COLUMNS = ["primary_stc", "fallback_stcs", "category", "confidence"]
+
+
+def map_csv(input_path: str, output_path: str, column: str, payer: Optional[str] = None) -> int:
+    """
+    Adds STC columns to every row of a CSV of CPT codes.
+    The codes are mapped in one map_bulk call rather than row by row.
+    """
+    with open(input_path, newline="") as f:
+        reader = csv.DictReader(f)
+        fieldnames = list(reader.fieldnames or [])
+        if column not in fieldnames:
+            raise SystemExit(f"Column '{column}' not found in {input_path} (have: {', '.join(fieldnames)})")
+        rows = list(reader)
+
+    result = STCMapper().map_bulk((row[column] or "" for row in rows), payer=payer)
+
+    out = open(output_path, "w", newline="") if output_path != "-" else sys.stdout
+    try:
+        writer = csv.DictWriter(out, fieldnames=fieldnames + [c for c in OUTPUT_COLUMNS if c not in fieldnames])
+        writer.writeheader()
+        for i, row in enumerate(rows):
+            row["primary_stc"] = result.primary_stc[i]
+            row["fallback_stcs"] = "|".join(result.fallback_stcs[i])
+            row["category"] = result.category[i]
+            row["confidence"] = f"{result.confidence[i]:.2f}"
+            writer.writerow(row)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Map a CSV of CPT codes to X12 service type codes")
+    parser.add_argument("input", help="CSV file with a header row")
+    parser.add_argument("-o", "--output", default="-", help="Output CSV (default: stdout)")
+    parser.add_argument("--column", default="cpt", help="Column holding the CPT code (default: cpt)")
+    parser.add_argument("--payer", help="Apply this payer's STC overrides")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    count = map_csv(args.input, args.output, args.column, args.payer)
+    print(f"Mapped {count} rows in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
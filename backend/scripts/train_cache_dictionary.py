@@ -0,0 +1,74 @@
+import argparse
+import os
+import random
+import sys
+
+import redis
+import zstandard
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.cache import VoBCache
+from app.core.config import settings
+
+
+def sample_payloads(client: redis.Redis, cache: VoBCache, limit: int):
+    """
+    Reads up to `limit` cached VoBResult payloads, decompressed, from Redis.
+    """
+    payloads = []
+    for key in client.scan_iter(match="vob:*", count=1000):
+        data = client.get(key)
+        if not data:
+            continue
+        try:
+            entry = cache._decode(data)
+        except Exception:
+            continue
+        if entry is not None:
+            payloads.append(entry.payload)
+            if len(payloads) >= limit:
+                break
+    return payloads
+
+
+def compressed_size(payloads, dictionary=None, level: int = 3) -> int:
+    compressor = zstandard.ZstdCompressor(level=level, dict_data=dictionary)
+    return sum(len(compressor.compress(p)) for p in payloads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a zstd dictionary from cached VoB results")
+    parser.add_argument("-o", "--output", required=True, help="Dictionary file to write")
+    parser.add_argument("--redis-url", default=settings.REDIS_URL)
+    parser.add_argument("--samples", type=int, default=20000, help="Maximum cache entries to sample")
+    parser.add_argument("--size", type=int, default=64 * 1024, help="Dictionary size in bytes")
+    parser.add_argument("--level", type=int, default=settings.VOB_CACHE_COMPRESSION_LEVEL)
+    args = parser.parse_args()
+
+    client = redis.Redis.from_url(args.redis_url)
+    payloads = sample_payloads(client, VoBCache(), args.samples)
+    if len(payloads) < 100:
+        raise SystemExit(f"Only {len(payloads)} cached results found; need at least 100 to train")
+
+    # Hold some samples back so the reported ratio isn't measured on training data
+    random.Random(0).shuffle(payloads)
+    holdout = payloads[: max(1, len(payloads) // 10)]
+    training = payloads[len(holdout):]
+
+    dictionary = zstandard.train_dictionary(args.size, training)
+    with open(args.output, "wb") as f:
+        f.write(dictionary.as_bytes())
+
+    raw = sum(len(p) for p in holdout)
+    plain = compressed_size(holdout, level=args.level)
+    trained = compressed_size(holdout, dictionary, level=args.level)
+    print(f"Trained dictionary {dictionary.dict_id()} ({len(dictionary.as_bytes())} bytes) on {len(training)} results")
+    print(f"Holdout of {len(holdout)}: raw {raw} B, zstd {plain} B ({raw / plain:.1f}x), "
+          f"zstd+dictionary {trained} B ({raw / trained:.1f}x)")
+    print(f"Deploy with VOB_CACHE_COMPRESSION=zstd VOB_CACHE_DICTIONARY_PATH={args.output}")
+
+
+if __name__ == "__main__":
+    main()
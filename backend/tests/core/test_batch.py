@@ -0,0 +1,62 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from datetime import date, datetime
+from app.core.batch import stream_batch
+from app.core.cache import VoBCache
+from app.core.router import RoutedResult
+from app.models.domain import VoBRequest, VoBResult, PatientInfo, PayerInfo, ProviderInfo, ServiceInfo, CoverageStatus, ChannelSource
+
+def make_request(member_id: str) -> VoBRequest:
+    return VoBRequest(
+        practice_id="test",
+        patient=PatientInfo(first_name="John", last_name="Roe", dob=date(1980, 1, 1), member_id=member_id),
+        payer=PayerInfo(name="Aetna", payer_code_hint="PAYER123"),
+        provider=ProviderInfo(npi="1234567890"),
+        services=[ServiceInfo(cpt="99213")]
+    )
+
+@pytest.fixture
+def router():
+    router = MagicMock()
+    router.cache = VoBCache()
+    router.resolve_channel = AsyncMock(return_value=ChannelSource.STEDI)
+
+    async def route(request, session):
+        if request.patient.member_id == "bad":
+            raise ValueError("payer timeout")
+        return RoutedResult(VoBResult(
+            request_id=f"req_{request.patient.member_id}",
+            coverage_status=CoverageStatus.ACTIVE,
+            source=ChannelSource.STEDI,
+            timestamp=datetime.now()
+        ), ChannelSource.STEDI.value)
+
+    router.route = AsyncMock(side_effect=route)
+    return router
+
+@pytest.mark.asyncio
+async def test_stream_batch_dedupes_and_reports_each_index(router):
+    requests = [make_request("1"), make_request("2"), make_request("1"), make_request("bad")]
+
+    lines = [json.loads(line) async for line in stream_batch(router, requests, session=None)]
+
+    assert sorted(line["index"] for line in lines) == [0, 1, 2, 3]
+    assert router.route.await_count == 3  # Duplicate "1" checked once
+
+    by_index = {line["index"]: line for line in lines}
+    assert by_index[0]["result"]["request_id"] == by_index[2]["result"]["request_id"] == "req_1"
+    assert by_index[1]["status"] == "completed"
+    assert by_index[1]["channel"] == "stedi"
+    assert by_index[3]["status"] == "failed"
+    assert "payer timeout" in by_index[3]["error"]
+
+@pytest.mark.asyncio
+async def test_stream_batch_survives_failing_lookups(router):
+    router.route.side_effect = ConnectionError("db down")
+    router.resolve_channel.side_effect = ConnectionError("db down")
+
+    lines = [json.loads(line) async for line in stream_batch(router, [make_request("1"), make_request("2")], session=None)]
+
+    assert sorted(line["index"] for line in lines) == [0, 1]
+    assert all(line["status"] == "failed" and line["channel"] is None for line in lines)
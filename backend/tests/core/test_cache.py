@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, patch
 from datetime import date, datetime
 from app.core.cache import VoBCache
 from app.models.domain import VoBRequest, VoBResult, PatientInfo, PayerInfo, ProviderInfo, ServiceInfo, CoverageStatus, ChannelSource
@@ -63,7 +63,8 @@ async def test_set_cache(cache, mock_redis, sample_request, sample_result):
     mock_redis.set.assert_called_once()
     args, kwargs = mock_redis.set.call_args
     assert args[0].startswith("vob:") # Key
-    assert "Test Plan" in args[1] # Value (serialized)
+    assert args[1].startswith(b"v3|") # Versioned header
+    assert b"Test Plan" in args[1] # Value (serialized)
     assert kwargs["ex"] == 3600 # TTL
 
 @pytest.mark.asyncio
@@ -81,3 +82,140 @@ async def test_key_generation_uniqueness(cache, sample_request):
     key2 = cache._generate_key(sample_request)
     
     assert key1 != key2
+
+@pytest.mark.asyncio
+async def test_l1_serves_repeat_hits(cache, mock_redis, sample_request, sample_result):
+    mock_redis.get.return_value = sample_result.model_dump_json()
+
+    await cache.get(sample_request)
+    result = await cache.get(sample_request)
+
+    assert result.request_id == sample_result.request_id
+    mock_redis.get.assert_called_once()  # Second hit never left the process
+    stats = cache.stats()
+    assert stats["l1"]["hits"] == 1
+    assert stats["l2"]["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_set_broadcasts_invalidation(cache, mock_redis, sample_request, sample_result):
+    await cache.set(sample_request, sample_result)
+
+    mock_redis.publish.assert_called_once()
+    channel, message = mock_redis.publish.call_args.args
+    assert channel == VoBCache.INVALIDATION_CHANNEL
+    assert message == f"{cache.instance_id}|{cache._generate_key(sample_request)}"
+
+@pytest.mark.asyncio
+async def test_invalidate_clears_both_tiers(cache, mock_redis, sample_request, sample_result):
+    await cache.set(sample_request, sample_result)
+    await cache.invalidate(sample_request)
+
+    mock_redis.get.return_value = None
+    assert await cache.get(sample_request) is None
+    mock_redis.delete.assert_called_once_with(cache._generate_key(sample_request))
+
+@pytest.mark.asyncio
+async def test_stale_entry_within_grace(cache, mock_redis, sample_request, sample_result):
+    envelope = '{"stored_at":%f,"ttl":60,"data":%s}' % (datetime.now().timestamp() - 120, sample_result.model_dump_json())
+    mock_redis.get.return_value = envelope
+
+    entry = await cache.lookup(sample_request)
+
+    assert entry is not None
+    assert entry.stale
+    assert entry.result.request_id == sample_result.request_id
+    assert len(cache.local) == 0  # Stale entries never enter L1
+
+@pytest.mark.asyncio
+async def test_l2_hit_serves_stored_json_without_validation(cache, mock_redis, sample_request, sample_result):
+    await cache.set(sample_request, sample_result)
+    stored = mock_redis.set.call_args.args[1]
+    cache.local.clear()
+    mock_redis.get.return_value = stored
+
+    with patch.object(VoBResult, "model_validate_json", wraps=VoBResult.model_validate_json) as validate:
+        entry = await cache.lookup(sample_request)
+        assert entry.payload == sample_result.model_dump_json().encode()
+        assert not entry.stale
+        validate.assert_not_called()
+
+        # The model is still available on demand
+        assert entry.result.plan_name == "Test Plan"
+        validate.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_entry_from_other_result_schema_is_a_miss(cache, mock_redis, sample_request, sample_result):
+    await cache.set(sample_request, sample_result)
+    stored = mock_redis.set.call_args.args[1]
+    cache.local.clear()
+    _, schema, rest = stored.split(b"|", 2)
+    mock_redis.get.return_value = b"v2|00000000|" + rest
+
+    assert await cache.lookup(sample_request) is None
+
+@pytest.fixture
+def large_result(sample_result):
+    from app.models.domain import Copay, Financials
+    sample_result.financials = Financials(
+        copays=[Copay(service_type=f"Service {i}", amount=25.0) for i in range(40)]
+    )
+    return sample_result
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("codec", ["zstd", "zlib"])
+async def test_compressed_round_trip(cache, mock_redis, sample_request, large_result, codec):
+    from app.core.cache_codec import PayloadCompressor
+    if codec == "zstd":
+        pytest.importorskip("zstandard")
+    cache.compressor = PayloadCompressor(codec=codec, min_bytes=256)
+
+    await cache.set(sample_request, large_result)
+    stored = mock_redis.set.call_args.args[1]
+    assert stored.split(b"|")[4] == codec.encode()
+
+    payload = large_result.model_dump_json().encode()
+    assert len(stored) < len(payload)
+
+    cache.local.clear()
+    mock_redis.get.return_value = stored
+    entry = await cache.lookup(sample_request)
+    assert entry.payload == payload
+
+    storage = cache.stats()["storage"]
+    family = storage["families"]["vob:PAYER123"]
+    assert family["compressed_writes"] == 1
+    assert family["raw_bytes"] == len(payload)
+    assert family["stored_bytes"] == len(stored)
+    assert storage["total"]["compression_ratio"] > 1
+
+@pytest.mark.asyncio
+async def test_small_payloads_stay_raw(cache, mock_redis, sample_request, sample_result):
+    from app.core.cache_codec import PayloadCompressor
+    cache.compressor = PayloadCompressor(codec="zlib", min_bytes=100000)
+
+    await cache.set(sample_request, sample_result)
+
+    stored = mock_redis.set.call_args.args[1]
+    assert stored.split(b"|")[4] == b"raw"
+    assert cache.stats()["storage"]["total"]["compressed_writes"] == 0
+
+@pytest.mark.asyncio
+async def test_entry_from_other_dictionary_is_a_miss(cache, mock_redis, sample_request, large_result):
+    zstandard = pytest.importorskip("zstandard")
+    from app.core.cache_codec import PayloadCompressor
+    samples = [large_result.model_dump_json().encode().replace(b"Service", b"Svc %d" % i) for i in range(200)]
+    dictionary = zstandard.train_dictionary(2048, samples).as_bytes()
+    cache.compressor = PayloadCompressor(codec="zstd", min_bytes=256, dictionary=dictionary)
+
+    await cache.set(sample_request, large_result)
+    stored = mock_redis.set.call_args.args[1]
+    assert stored.split(b"|")[5] == cache.compressor.dict_id != b"0"
+
+    cache.local.clear()
+    mock_redis.get.return_value = stored
+    assert (await cache.lookup(sample_request)).payload == large_result.model_dump_json().encode()
+
+    # A worker without the dictionary can't read it and treats it as a miss
+    cache.local.clear()
+    cache.compressor = PayloadCompressor(codec="zstd", min_bytes=256)
+    assert await cache.lookup(sample_request) is None
@@ -0,0 +1,38 @@
+import pytest
+from datetime import date, datetime
+from app.core.cache_policy import CacheTTLPolicy
+from app.models.domain import VoBRequest, VoBResult, PatientInfo, PayerInfo, ProviderInfo, CoverageStatus, ChannelSource
+
+def make_request(payer_code: str = "PAYER123") -> VoBRequest:
+    return VoBRequest(
+        practice_id="test",
+        patient=PatientInfo(first_name="John", last_name="Roe", dob=date(1980, 1, 1), member_id="123"),
+        payer=PayerInfo(name="Aetna", payer_code_hint=payer_code),
+        provider=ProviderInfo(npi="1234567890")
+    )
+
+def make_result(status: CoverageStatus, source: ChannelSource) -> VoBResult:
+    return VoBResult(request_id="req", coverage_status=status, source=source, timestamp=datetime.now())
+
+@pytest.fixture
+def policy():
+    return CacheTTLPolicy({
+        "default": 3600,
+        "grace": 60,
+        "channel": {"rpa": 14400},
+        "coverage_status": {"inactive": 900},
+        "payers": {"60054": {"ttl": 7200, "grace": 600}},
+    })
+
+def test_default_ttl(policy):
+    assert policy.resolve(make_request(), make_result(CoverageStatus.ACTIVE, ChannelSource.STEDI)) == (3600, 60)
+
+def test_rpa_results_live_longer(policy):
+    assert policy.resolve(make_request(), make_result(CoverageStatus.ACTIVE, ChannelSource.RPA)) == (14400, 60)
+
+def test_inactive_results_only_shorten(policy):
+    assert policy.resolve(make_request(), make_result(CoverageStatus.INACTIVE, ChannelSource.RPA)) == (900, 60)
+
+def test_payer_override(policy):
+    ttl, grace = policy.resolve(make_request("60054"), make_result(CoverageStatus.ACTIVE, ChannelSource.RPA))
+    assert (ttl, grace) == (7200, 600)
@@ -0,0 +1,28 @@
+import pytest
+from app.core.http_client import HTTPClientPool
+from app.connectors.stedi import StediConnector
+
+@pytest.mark.asyncio
+async def test_pool_lifecycle():
+    pool = HTTPClientPool(name="test", max_connections=5, max_keepalive_connections=2, http2=False)
+    assert pool.stats()["open"] is False
+
+    await pool.start()
+    client = pool.client
+    assert pool.client is client  # Same client reused across calls
+    stats = pool.stats()
+    assert stats["open"] is True
+    assert stats["max_connections"] == 5
+    assert stats["in_use"] == 0
+    assert stats["waiters"] == 0
+
+    await pool.close()
+    assert pool.stats()["open"] is False
+
+@pytest.mark.asyncio
+async def test_connectors_share_pool():
+    pool = HTTPClientPool(name="test", http2=False)
+    a = StediConnector(http_pool=pool)
+    b = StediConnector(http_pool=pool)
+    assert a.http_pool.client is b.http_pool.client
+    await pool.close()
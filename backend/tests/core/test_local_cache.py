@@ -0,0 +1,39 @@
+import time
+from unittest.mock import patch
+from app.core.local_cache import LRUCache
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2, max_bytes=1000, ttl_seconds=60)
+    cache.set("a", 1, size=10)
+    cache.set("b", 2, size=10)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", 3, size=10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+def test_byte_bound():
+    cache = LRUCache(max_entries=100, max_bytes=25, ttl_seconds=60)
+    cache.set("a", 1, size=10)
+    cache.set("b", 2, size=10)
+    cache.set("c", 3, size=10)
+
+    assert len(cache) == 2
+    assert cache.stats()["bytes"] == 20
+    assert cache.get("a") is None
+
+    # Oversized entries are never stored
+    cache.set("huge", 4, size=100)
+    assert cache.get("huge") is None
+
+def test_ttl_expiry():
+    cache = LRUCache(ttl_seconds=10)
+    now = time.monotonic()
+    with patch("app.core.local_cache.time.monotonic", return_value=now):
+        cache.set("a", 1, size=1)
+    with patch("app.core.local_cache.time.monotonic", return_value=now + 11):
+        assert cache.get("a") is None
+    assert cache.expirations == 1
+    assert len(cache) == 0
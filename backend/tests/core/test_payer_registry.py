@@ -0,0 +1,42 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.payer_registry import PayerRegistry
+from app.models.sql import PayerConfig, ChannelPreference
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'payers.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(PayerConfig(name="Aetna", stedi_payer_code="60054"))
+        session.commit()
+    return engine
+
+@pytest.fixture
+def registry(tmp_path, engine):
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'payers.db'}")
+    return PayerRegistry(async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False))
+
+@pytest.mark.asyncio
+async def test_lookup_by_name_then_code(registry):
+    assert (await registry.lookup("Aetna")).stedi_payer_code == "60054"
+    assert (await registry.lookup("Aetna Better Health", "60054")).name == "Aetna"
+    assert await registry.lookup("Unknown", "00000") is None
+
+@pytest.mark.asyncio
+async def test_refresh_only_reloads_on_change(engine, registry):
+    await registry.load()
+    assert await registry.refresh_if_changed() is False
+
+    with Session(engine) as session:
+        payer_config = session.exec(select(PayerConfig)).one()
+        payer_config.preferred_channel = ChannelPreference.RPA
+        payer_config.updated_at = datetime.utcnow() + timedelta(seconds=1)
+        session.add(payer_config)
+        session.commit()
+
+    assert await registry.refresh_if_changed() is True
+    assert (await registry.lookup("Aetna")).preferred_channel == ChannelPreference.RPA
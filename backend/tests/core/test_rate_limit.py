@@ -0,0 +1,46 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.core.rate_limit import TokenBucketLimiter, RateLimitExceeded, parse_retry_after
+from app.connectors.stedi import StediConnector
+
+@pytest.mark.asyncio
+async def test_burst_then_queued_waits():
+    limiter = TokenBucketLimiter(max_wait_seconds=10)
+    with patch("app.core.rate_limit.asyncio.sleep", new=AsyncMock()) as sleep:
+        for _ in range(2):
+            assert await limiter.acquire("partner", rate=2, capacity=2) == 0
+        waited = await limiter.acquire("partner", rate=2, capacity=2)
+
+    assert waited == pytest.approx(0.5, abs=0.01)
+    sleep.assert_awaited_once()
+    assert limiter.stats()["throttled_calls"] == 1
+
+@pytest.mark.asyncio
+async def test_rejects_waits_beyond_max():
+    limiter = TokenBucketLimiter(max_wait_seconds=1)
+    await limiter.block("partner", 5)
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire("partner", rate=10, capacity=10)
+
+def test_parse_retry_after():
+    assert parse_retry_after("3", default=1.0) == 3.0
+    assert parse_retry_after(None, default=1.0) == 1.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", default=1.0) == 0.0
+    assert parse_retry_after("soon", default=2.0) == 2.0
+
+@pytest.mark.asyncio
+async def test_stedi_retries_after_429():
+    limiter = TokenBucketLimiter()
+    limiter.block = AsyncMock()
+    connector = StediConnector(rate_limiter=limiter)
+    connector.api_key = "test-key"
+
+    throttled = MagicMock(status_code=429, headers={"Retry-After": "2"})
+    ok = MagicMock(status_code=200, headers={})
+    ok.json.return_value = {"controlNumber": "1"}
+
+    with patch("httpx.AsyncClient.post", new=AsyncMock(side_effect=[throttled, ok])):
+        data = await connector._post_eligibility({"tradingPartnerServiceId": "60054"})
+
+    assert data == {"controlNumber": "1"}
+    limiter.block.assert_awaited_once_with(connector._key_bucket(), 2.0)
@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from app.core.rate_limit import RateLimitExceeded
+from app.core.resilience import (
+    CircuitBreaker, CircuitOpenError, CircuitState, ConnectorGuard, ConnectorNotConfigured
+)
+
+def test_breaker_opens_after_threshold_and_recovers():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=30)
+    with patch("app.core.resilience.time.monotonic", return_value=100.0):
+        breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        assert not breaker.allow()
+
+    with patch("app.core.resilience.time.monotonic", return_value=131.0):
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()  # one probe at a time
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitState.HALF_OPEN
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker._state == CircuitState.OPEN
+
+@pytest.mark.asyncio
+async def test_guard_fails_fast_when_open():
+    guard = ConnectorGuard(failure_threshold=1, recovery_timeout=60)
+
+    async def boom():
+        raise TimeoutError("upstream")
+
+    with pytest.raises(TimeoutError):
+        await guard.call("Aetna", "stedi", boom)
+    with pytest.raises(CircuitOpenError):
+        await guard.call("Aetna", "stedi", boom)
+    assert guard.stats() == {"Aetna": {"stedi": "open"}}
+
+@pytest.mark.asyncio
+async def test_guard_caps_concurrency_per_payer():
+    guard = ConnectorGuard(max_concurrency_per_payer=2)
+    active = 0
+    peak = 0
+
+    async def call():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return "ok"
+
+    await asyncio.gather(*(guard.call("Aetna", "stedi", call) for _ in range(6)))
+    assert peak == 2
+
+@pytest.mark.asyncio
+async def test_cancelled_while_queued_keeps_probe_slot():
+    guard = ConnectorGuard(failure_threshold=1, recovery_timeout=0, max_concurrency_per_payer=1)
+    breaker = guard.breaker("Aetna", "stedi")
+    breaker.record_failure()  # half-open from here on
+    release = asyncio.Event()
+
+    async def slow():
+        await release.wait()
+        return "ok"
+
+    # Another channel for the same payer holds the only limiter slot
+    holder = asyncio.create_task(guard.call("Aetna", "rpa", slow))
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(guard.call("Aetna", "stedi", slow))
+    await asyncio.sleep(0)
+    queued.cancel()  # e.g. a losing hedge
+    release.set()
+
+    assert await holder == "ok"
+    assert queued.cancelled()
+    assert await guard.call("Aetna", "stedi", slow) == "ok"
+    assert breaker.state == CircuitState.CLOSED
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [RateLimitExceeded("stedi", 5.0), ConnectorNotConfigured("STEDI_API_KEY is not set")])
+async def test_local_errors_do_not_trip_the_breaker(error):
+    guard = ConnectorGuard(failure_threshold=1, recovery_timeout=60)
+
+    async def local():
+        raise error
+
+    for _ in range(3):
+        with pytest.raises(type(error)):
+            await guard.call("Aetna", "stedi", local)
+    assert guard.stats() == {"Aetna": {"stedi": "closed"}}
@@ -0,0 +1,147 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from datetime import date, datetime
+from app.core.rate_limit import RateLimitExceeded
+from app.core.router import VoBRouter, CACHE_CHANNEL
+from app.models.domain import VoBRequest, VoBResult, PatientInfo, PayerInfo, ProviderInfo, ServiceInfo, CoverageStatus, ChannelSource
+from app.models.sql import PayerConfig, ChannelPreference
+
+@pytest.fixture
+def sample_request():
+    return VoBRequest(
+        practice_id="test",
+        patient=PatientInfo(first_name="John", last_name="Roe", dob=date(1980, 1, 1), member_id="123"),
+        payer=PayerInfo(name="Aetna", payer_code_hint="PAYER123"),
+        provider=ProviderInfo(npi="1234567890"),
+        services=[ServiceInfo(cpt="99213")]
+    )
+
+def make_result(source: ChannelSource) -> VoBResult:
+    return VoBResult(request_id="req", coverage_status=CoverageStatus.ACTIVE, source=source, timestamp=datetime.now())
+
+@pytest.fixture
+def router():
+    router = VoBRouter()
+    router.cache.redis = None  # L1 only
+    router.stedi = MagicMock()
+    router.rpa = MagicMock()
+    router.stedi.check_eligibility = AsyncMock(return_value=make_result(ChannelSource.STEDI))
+    router.rpa.check_eligibility = AsyncMock(return_value=make_result(ChannelSource.RPA))
+    router._get_payer_config = AsyncMock(return_value=PayerConfig(
+        name="Aetna",
+        preferred_channel=ChannelPreference.STEDI,
+        fallback_channel=ChannelPreference.RPA,
+    ))
+    return router
+
+@pytest.mark.asyncio
+async def test_routes_to_preferred_channel_then_cache(router, sample_request):
+    routed = await router.route(sample_request, session=None)
+    assert routed.channel == "stedi"
+
+    routed = await router.route(sample_request, session=None)
+    assert routed.channel == CACHE_CHANNEL
+    router.stedi.check_eligibility.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_cache_hit_serves_stored_json(router, sample_request):
+    first = await router.route(sample_request, session=None)
+
+    routed = await router.route(sample_request, session=None)
+    assert routed.channel == CACHE_CHANNEL
+    assert routed.to_json() == first.result.model_dump_json().encode()
+    assert routed.result.source == ChannelSource.STEDI
+
+@pytest.mark.asyncio
+async def test_falls_back_when_preferred_channel_fails(router, sample_request):
+    router.stedi.check_eligibility.side_effect = TimeoutError("clearinghouse timeout")
+
+    routed = await router.route(sample_request, session=None)
+
+    assert routed.channel == "rpa"
+    assert routed.result.source == ChannelSource.RPA
+
+@pytest.mark.asyncio
+async def test_no_fallback_configured(router, sample_request):
+    router._get_payer_config.return_value.fallback_channel = ChannelPreference.NONE
+    router.stedi.check_eligibility.side_effect = TimeoutError("clearinghouse timeout")
+
+    with pytest.raises(TimeoutError):
+        await router.route(sample_request, session=None)
+    router.rpa.check_eligibility.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_hedge_returns_fallback_when_preferred_is_slow(router, sample_request):
+    async def slow_stedi(request):
+        await asyncio.sleep(5)
+        return make_result(ChannelSource.STEDI)
+
+    router.stedi.check_eligibility = AsyncMock(side_effect=slow_stedi)
+    router._get_payer_config.return_value.hedge_enabled = True
+    router._get_payer_config.return_value.hedge_after_ms = 250
+
+    routed = await router.route(sample_request, session=None)
+
+    assert routed.channel == "rpa"
+    assert router.hedge_stats == {"hedged": 1, "primary_won": 0, "fallback_won": 1}
+    # The cancelled loser is not counted as a channel failure
+    assert ("Aetna", "stedi") not in router.telemetry._stats
+
+@pytest.mark.asyncio
+async def test_hedge_not_needed_when_preferred_is_fast(router, sample_request):
+    router._get_payer_config.return_value.hedge_enabled = True
+
+    routed = await router.route(sample_request, session=None)
+
+    assert routed.channel == "stedi"
+    assert router.hedge_stats["hedged"] == 0
+    router.rpa.check_eligibility.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_open_breaker_shifts_to_fallback(router, sample_request):
+    for _ in range(router.guard.failure_threshold):
+        router.guard.breaker("Aetna", "stedi").record_failure()
+
+    routed = await router.route(sample_request, session=None)
+
+    assert routed.channel == "rpa"
+    router.stedi.check_eligibility.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_channel_limit_bounds_fallback_calls(router, sample_request):
+    # Every check fails over to RPA; RPA must still stay within its own cap
+    router.channel_limits[ChannelSource.RPA] = asyncio.Semaphore(2)
+    router.guard.max_concurrency_per_payer = 100
+    router.stedi.check_eligibility.side_effect = TimeoutError("clearinghouse timeout")
+    active = 0
+    peak = 0
+
+    async def rpa(request):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return make_result(ChannelSource.RPA)
+
+    router.rpa.check_eligibility = AsyncMock(side_effect=rpa)
+    requests = [sample_request.model_copy(update={"patient": sample_request.patient.model_copy(update={"member_id": str(i)})})
+                for i in range(6)]
+
+    routed = await asyncio.gather(*(router.route(request, session=None) for request in requests))
+
+    assert {r.channel for r in routed} == {"rpa"}
+    assert peak == 2
+
+@pytest.mark.asyncio
+async def test_local_errors_are_not_recorded_as_channel_failures(router, sample_request):
+    router._get_payer_config.return_value.fallback_channel = ChannelPreference.NONE
+    router.stedi.check_eligibility.side_effect = RateLimitExceeded("stedi", 5.0)
+
+    for _ in range(5):
+        with pytest.raises(RateLimitExceeded):
+            await router.route(sample_request, session=None)
+
+    assert router.telemetry.snapshot() == {}
+    assert router.guard.stats() == {"Aetna": {"stedi": "closed"}}
@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from app.core.singleflight import SingleFlight
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = 0
+
+    async def upstream():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "result"
+
+    results = await asyncio.gather(*[flight.do("vob:key", upstream) for _ in range(5)])
+
+    assert results == ["result"] * 5
+    assert calls == 1
+    assert flight.in_flight() == 0
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_all_waiters():
+    flight = SingleFlight()
+
+    async def upstream():
+        await asyncio.sleep(0.01)
+        raise ValueError("stedi down")
+
+    results = await asyncio.gather(*[flight.do("vob:key", upstream) for _ in range(3)], return_exceptions=True)
+
+    assert all(isinstance(r, ValueError) for r in results)
+
+@pytest.mark.asyncio
+async def test_distinct_keys_run_independently():
+    flight = SingleFlight()
+    upstream = AsyncMock(side_effect=["a", "b"])
+
+    results = await asyncio.gather(flight.do("k1", upstream), flight.do("k2", upstream))
+
+    assert sorted(results) == ["a", "b"]
+    assert upstream.await_count == 2
+
+@pytest.mark.asyncio
+async def test_lock_loser_waits_for_peek():
+    redis = AsyncMock()
+    redis.set.return_value = None  # Another worker holds the lock
+    redis.exists.return_value = 1
+    flight = SingleFlight(redis=redis, poll_interval_seconds=0.01)
+
+    upstream = AsyncMock(return_value="fresh")
+    peek = AsyncMock(side_effect=[None, "cached"])
+
+    result = await flight.do("vob:key", upstream, peek=peek)
+
+    assert result == "cached"
+    upstream.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_cancelling_the_leader_does_not_fail_followers():
+    flight = SingleFlight()
+    calls = 0
+
+    async def upstream():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "result"
+
+    leader = asyncio.create_task(flight.do("vob:key", upstream))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("vob:key", upstream))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "result"
+    assert leader.cancelled()
+    assert calls == 1
+    assert flight.in_flight() == 0
+
+@pytest.mark.asyncio
+async def test_call_is_cancelled_once_every_waiter_is():
+    flight = SingleFlight()
+    finished = asyncio.Event()
+
+    async def upstream():
+        await asyncio.sleep(1)
+        finished.set()
+
+    waiters = [asyncio.create_task(flight.do("vob:key", upstream)) for _ in range(2)]
+    await asyncio.sleep(0)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert flight.in_flight() == 0
+    assert not finished.is_set()
@@ -58,3 +58,106 @@ def test_fallbacks_list(mapper):
 
 def test_case_insensitivity(mapper):
     assert mapper.get_stc("99203") == mapper.get_stc("99203")
+
+def test_narrower_range_wins_regardless_of_order(mapper):
+    # 19000-19499 (breast) sits inside 10000-19999 but is listed after it
+    assert mapper.get_stc_with_fallbacks("19120") == ["2", "BT", "30"]
+    assert mapper.get_confidence("19120") == 0.85
+    assert mapper.get_stc_with_fallbacks("18000") == ["2", "1", "30"]
+    # CT inside Diagnostic radiology
+    assert mapper.get_stc("70450") == "ED"
+    assert mapper.get_stc("70499") == "4"
+
+def test_range_index_bounds():
+    from app.core.stc_mapper import RangeIndex, STCMapping
+    wide = STCMapping("A", [], ServiceCategory.MEDICAL, 0.5)
+    narrow = STCMapping("B", [], ServiceCategory.MEDICAL, 0.5)
+    index = RangeIndex([("10000", "10999", wide), ("10500", "10599", narrow)])
+
+    assert index.lookup("09999") is None
+    assert index.lookup("10000") is wide
+    assert index.lookup("10500") is narrow
+    assert index.lookup("10599") is narrow
+    assert index.lookup("10600") is wide
+    assert index.lookup("10999") is wide
+    assert index.lookup("10999A") is None
+    assert index.lookup("11000") is None
+
+def test_map_bulk_matches_scalar_mapping(mapper):
+    codes = ["99213", " 27447", "19120", "70450", "0001T", "J1100", "XXXXX", "99213", "", "09999"]
+    result = mapper.map_bulk(codes)
+
+    assert len(result) == len(codes)
+    for i, code in enumerate(codes):
+        mapping = mapper.get_mapping(code)
+        assert result.primary_stc[i] == mapping.primary_stc
+        assert [result.primary_stc[i]] + result.fallback_stcs[i] == mapper.get_stc_with_fallbacks(code)
+        assert result.category[i] == mapping.category.value
+        assert result.confidence[i] == mapping.confidence
+
+def test_map_bulk_empty(mapper):
+    result = mapper.map_bulk([])
+    assert len(result) == 0
+    assert list(result.rows()) == []
+
+def _write_tables(path, version, specific, overrides=None):
+    import json
+    path.write_text(json.dumps({
+        "version": version,
+        "fallback": "30|1,98|medical|0.40",
+        "specific": {"Test": specific},
+        "ranges": {"Surgery": [["10000", "19999", "2|1,30|surgical|0.80"]]},
+        "prefixes": {"99": "98|1,30|medical|0.70"},
+        "payer_overrides": overrides or {},
+    }))
+
+def test_tables_share_identical_mappings(mapper):
+    # Every E/M office visit code resolves to the same interned instance
+    assert mapper.get_mapping("99202") is mapper.get_mapping("99215")
+
+def test_tables_hot_reload(tmp_path):
+    import os
+    from app.core.stc_mapper import STCTableStore
+    path = tmp_path / "stc.json"
+    _write_tables(path, "1", {"99213": "98|1,30|medical|0.95"})
+    store = STCTableStore(str(path), reload_interval=0.01)
+    mapper = STCMapper(store)
+
+    assert mapper.get_stc("99213") == "98"
+    assert store.current().version == "1"
+
+    _write_tables(path, "2", {"99213": "MH|30|mental_health|0.90"})
+    os.utime(path, (1, 1))  # Force an mtime change on coarse filesystems
+    store._checked_at = 0
+    assert mapper.get_stc("99213") == "MH"
+    assert mapper.get_category("99213") == ServiceCategory.MENTAL_HEALTH
+    assert store.current().version == "2"
+
+    # A broken file keeps the last good tables
+    path.write_text("{not json")
+    os.utime(path, (2, 2))
+    store._checked_at = 0
+    assert mapper.get_stc("99213") == "MH"
+    assert store.current().version == "2"
+
+def test_payer_overrides_layer_on_base_tables(tmp_path):
+    from app.core.stc_mapper import STCTableStore
+    path = tmp_path / "stc.json"
+    _write_tables(path, "1", {"99213": "98|1,30|medical|0.95"}, overrides={
+        "Aetna": {
+            "specific": {"Office": {"99214": "1|30|medical|0.90"}},
+            "ranges": {"Breast": [["19000", "19499", "BT|2,30|surgical|0.85"]]},
+        },
+    })
+    mapper = STCMapper(STCTableStore(str(path), reload_interval=0))
+
+    assert mapper.get_stc("99214", payer="aetna ") == "1"
+    assert mapper.get_stc("99214") == "98"  # Prefix match without the override
+    # Override range wins over the wider base range; base entries still apply
+    assert mapper.get_stc("19120", payer="Aetna") == "BT"
+    assert mapper.get_stc("18000", payer="Aetna") == "2"
+    assert mapper.get_stc("99213", payer="Aetna") == "98"
+    assert mapper.get_stc("19120", payer="Cigna") == "2"
+
+    result = mapper.map_bulk(["19120", "18000", "99214"], payer="Aetna")
+    assert list(result.primary_stc) == ["BT", "2", "1"]
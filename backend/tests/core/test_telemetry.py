@@ -0,0 +1,73 @@
+import time
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.telemetry import ChannelTelemetry, ChannelStats
+from app.core.router import VoBRouter
+from app.models.domain import ChannelSource
+from app.models.sql import PayerConfig
+
+def test_ewma_tracks_recent_calls():
+    stats = ChannelStats(alpha=0.5)
+    stats.record(100.0, True)
+    stats.record(300.0, False)
+
+    assert stats.latency_ms == 200.0
+    assert stats.failure_rate == 0.5
+    assert stats.percentile(95) == 300.0
+
+def test_get_requires_min_samples_and_fresh_data():
+    telemetry = ChannelTelemetry(min_samples=3, stale_after_seconds=60)
+    for _ in range(2):
+        telemetry.record("Aetna", "stedi", 100.0, True)
+    assert telemetry.get("Aetna", "stedi") is None
+
+    telemetry.record("Aetna", "stedi", 100.0, True)
+    assert telemetry.get("Aetna", "stedi") is not None
+
+    telemetry._stats[("Aetna", "stedi")].last_updated = time.time() - 120
+    assert telemetry.get("Aetna", "stedi") is None
+
+def _router_with(samples):
+    router = VoBRouter()
+    router.telemetry = ChannelTelemetry(alpha=1.0, min_samples=1)
+    for channel, latency_ms, success in samples:
+        router.telemetry.record("Aetna", channel, latency_ms, success)
+    return router
+
+def test_adaptive_keeps_preferred_without_data():
+    router = _router_with([("rpa", 10.0, True)])
+    assert router._adaptive_channel("Aetna", ChannelSource.STEDI, ChannelSource.RPA) == ChannelSource.STEDI
+
+def test_adaptive_picks_faster_healthy_channel():
+    router = _router_with([("stedi", 4000.0, True), ("rpa", 1500.0, True)])
+    assert router._adaptive_channel("Aetna", ChannelSource.STEDI, ChannelSource.RPA) == ChannelSource.RPA
+
+def test_adaptive_avoids_failing_channel():
+    router = _router_with([("stedi", 200.0, False)])
+    assert router._adaptive_channel("Aetna", ChannelSource.STEDI, ChannelSource.RPA) == ChannelSource.RPA
+
+@pytest.mark.asyncio
+async def test_persist_merges_processes_by_sample_count(tmp_path):
+    SQLModel.metadata.create_all(create_engine(f"sqlite:///{tmp_path / 'telemetry.db'}"))
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'telemetry.db'}")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        session.add(PayerConfig(name="Aetna"))
+        await session.commit()
+
+    api, worker = (ChannelTelemetry(alpha=1.0, session_factory=session_factory) for _ in range(2))
+    for _ in range(3):
+        api.record("Aetna", "stedi", 100.0, True)
+    worker.record("Aetna", "stedi", 500.0, False)
+
+    await api.persist()
+    await worker.persist()
+    await worker.persist()  # nothing new; must not count twice
+
+    async with session_factory() as session:
+        payer_config = (await session.exec(select(PayerConfig))).one()
+    assert payer_config.avg_latency_stedi_ms == 200
+    assert payer_config.failure_rate_stedi_24h == 0.25
+    assert payer_config.telemetry_samples_stedi == 4
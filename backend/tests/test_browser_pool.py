@@ -0,0 +1,69 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+from app.connectors.browser_pool import BrowserPool, BrowserPoolExhausted, _BrowserSlot
+
+def fake_browser():
+    browser = MagicMock()
+    browser.is_connected.return_value = True
+    browser.new_context = AsyncMock(side_effect=lambda **kwargs: AsyncMock())
+    browser.close = AsyncMock()
+    return browser
+
+class TestBrowserPool(unittest.IsolatedAsyncioTestCase):
+    async def make_pool(self, **kwargs) -> BrowserPool:
+        pool = BrowserPool(**kwargs)
+        pool._launch = AsyncMock(side_effect=lambda: fake_browser())
+        pool._playwright = MagicMock()  # Pretend start() ran
+        for _ in range(pool.size):
+            pool._slots.append(_BrowserSlot(browser=await pool._launch()))
+        return pool
+
+    async def test_reuses_warm_browsers(self):
+        pool = await self.make_pool(size=1, contexts_per_browser=2)
+        browser = pool._slots[0].browser
+
+        for _ in range(3):
+            async with pool.lease() as context:
+                self.assertIsNotNone(context)
+
+        self.assertEqual(pool._launch.await_count, 1)  # Only the initial launch
+        self.assertEqual(browser.new_context.await_count, 3)
+        self.assertEqual(pool.stats()["active_contexts"], 0)
+
+    async def test_recycles_after_max_uses(self):
+        pool = await self.make_pool(size=1, max_uses=2)
+        first = pool._slots[0].browser
+
+        for _ in range(2):
+            async with pool.lease():
+                pass
+
+        first.close.assert_awaited()
+        self.assertIsNot(pool._slots[0].browser, first)
+        self.assertEqual(pool.recycled, 1)
+
+    async def test_replaces_crashed_browser(self):
+        pool = await self.make_pool(size=1)
+        crashed = pool._slots[0].browser
+        crashed.is_connected.return_value = False
+
+        async with pool.lease():
+            pass
+
+        self.assertIsNot(pool._slots[0].browser, crashed)
+        crashed.new_context.assert_not_awaited()
+
+    async def test_backpressure_when_queue_full(self):
+        pool = await self.make_pool(size=1, contexts_per_browser=1, max_queue=1, acquire_timeout=0.05)
+
+        async with pool.lease():
+            waiter = asyncio.create_task(pool.lease().__aenter__())
+            await asyncio.sleep(0)
+            with self.assertRaises(BrowserPoolExhausted):
+                async with pool.lease():
+                    pass
+            with self.assertRaises(BrowserPoolExhausted):
+                await waiter  # Times out while the only slot is held
+
+        self.assertEqual(pool.rejected, 2)
@@ -0,0 +1,33 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.services.job_events import JobEventBus
+from app.api.v1.endpoints.async_vob import _parse_job_ids, _is_settled
+
+@pytest.mark.asyncio
+async def test_events_reach_only_subscribers_of_that_job():
+    bus = JobEventBus()
+    async with bus.subscribe(["a", "b"]) as events, bus.subscribe(["c"]) as other:
+        await bus.publish({"job_id": "a", "status": "processing"})
+
+        assert await asyncio.wait_for(events.get(), timeout=1) == {"job_id": "a", "status": "processing"}
+        assert other.empty()
+    assert bus.subscriber_count() == 0
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_does_not_block_publish():
+    bus = JobEventBus(queue_size=1)
+    async with bus.subscribe(["a"]) as events:
+        await bus.publish({"job_id": "a", "status": "processing"})
+        await bus.publish({"job_id": "a", "status": "completed"})
+        assert events.qsize() == 1
+
+def test_parse_job_ids_dedupes_and_validates():
+    assert _parse_job_ids("a, b,a,,") == ["a", "b"]
+    with pytest.raises(HTTPException):
+        _parse_job_ids(" , ")
+
+def test_settled_statuses():
+    assert _is_settled({"status": "completed"})
+    assert _is_settled({"status": "not_found"})
+    assert not _is_settled({"status": "queued"})
@@ -0,0 +1,60 @@
+import pytest
+from datetime import date, datetime
+from unittest.mock import AsyncMock, patch
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.api.v1.endpoints import async_vob
+from app.core.router import RoutedResult
+from app.models.domain import VoBRequest, VoBResult, PatientInfo, PayerInfo, ProviderInfo, CoverageStatus, ChannelSource
+from app.models.job import Job, JobStatus
+from app.services.job_progress import JobProgressStore
+
+@pytest.mark.asyncio
+async def test_store_serves_latest_status_until_expiry():
+    store = JobProgressStore(running_ttl_seconds=60, terminal_ttl_seconds=0)
+    await store.save({"job_id": "a", "status": "processing", "progress": {"percent": 30}})
+    assert (await store.get("a"))["progress"]["percent"] == 30
+
+    await store.save({"job_id": "a", "status": "completed"})
+    assert await store.get_many(["a", "b"]) == {}
+
+@pytest.mark.asyncio
+async def test_process_job_writes_job_row_only_when_finished(tmp_path):
+    SQLModel.metadata.create_all(create_engine(f"sqlite:///{tmp_path / 'jobs.db'}"))
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        job = Job(request_payload={}, status=JobStatus.PROCESSING, locked_by="w")  # leased by worker "w"
+        session.add(job)
+        await session.commit()
+
+    request = VoBRequest(
+        practice_id="test",
+        patient=PatientInfo(first_name="John", last_name="Roe", dob=date(1980, 1, 1), member_id="123"),
+        payer=PayerInfo(name="Aetna"),
+        provider=ProviderInfo(npi="1234567890"),
+    )
+    result = VoBResult(request_id="req", coverage_status=CoverageStatus.ACTIVE, source=ChannelSource.STEDI, timestamp=datetime.now())
+    store = JobProgressStore()
+    seen = []
+
+    async def route(request, session):
+        seen.append(await store.get(job.id))
+        async with session_factory() as other:
+            # Progress has not been committed to the Job row mid-run
+            assert (await other.get(Job, job.id)).progress_step is None
+        return RoutedResult(result, "stedi")
+
+    with patch.object(async_vob, "async_session_factory", session_factory), \
+         patch.object(async_vob, "job_progress_store", store), \
+         patch.object(async_vob.vob_router, "resolve_channel", AsyncMock(return_value=ChannelSource.STEDI)), \
+         patch.object(async_vob.vob_router, "route", side_effect=route):
+        await async_vob.process_job(job.id, request, worker_id="w")
+
+    assert seen[0]["progress"] == {"step": "running_stedi", "percent": 30}
+    assert (await store.get(job.id))["status"] == "completed"
+    async with session_factory() as session:
+        stored = await session.get(Job, job.id)
+        assert stored.status == JobStatus.COMPLETED
+        assert stored.channel == "stedi"
@@ -0,0 +1,93 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models.job import Job, JobStatus
+from app.services.job_queue import JobQueue
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'queue.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+@pytest.fixture
+def queue(tmp_path, engine):
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'queue.db'}")
+    session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+    return JobQueue(visibility_timeout_seconds=60, retry_backoff_seconds=10, session_factory=session_factory)
+
+def add_job(engine, **fields) -> str:
+    with Session(engine) as session:
+        job = Job(request_payload={}, **fields)
+        session.add(job)
+        session.commit()
+        return job.id
+
+@pytest.mark.asyncio
+async def test_claim_leases_queued_jobs_once(engine, queue):
+    job_id = add_job(engine)
+
+    claimed = await queue.claim("worker-a", limit=5)
+    assert [job.id for job in claimed] == [job_id]
+    assert claimed[0].status == JobStatus.PROCESSING
+    assert claimed[0].attempts == 1
+    assert claimed[0].locked_by == "worker-a"
+
+    assert await queue.claim("worker-b", limit=5) == []
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_reclaimed(engine, queue):
+    job_id = add_job(
+        engine,
+        status=JobStatus.PROCESSING,
+        attempts=1,
+        locked_by="dead-worker",
+        locked_until=datetime.now() - timedelta(seconds=1),
+    )
+
+    claimed = await queue.claim("worker-b", limit=5)
+    assert [job.id for job in claimed] == [job_id]
+    assert claimed[0].attempts == 2
+
+    # Lease lapses again on the final attempt: failed, not re-leased
+    exhausted_id = add_job(
+        engine,
+        status=JobStatus.PROCESSING,
+        attempts=3,
+        max_attempts=3,
+        locked_by="dead-worker",
+        locked_until=datetime.now() - timedelta(seconds=1),
+    )
+    assert await queue.claim("worker-c", limit=5) == []
+
+    async with queue.session_factory() as session:
+        failed = await queue.fail_exhausted(session, limit=5)
+        await session.commit()
+    assert [job.id for job in failed] == [exhausted_id]
+    with Session(engine) as session:
+        stored = session.get(Job, exhausted_id)
+        assert stored.status == JobStatus.FAILED
+        assert stored.locked_by is None
+        assert "Lease expired" in stored.error_message
+
+@pytest.mark.asyncio
+async def test_retry_backoff_then_failure(engine, queue):
+    add_job(engine, max_attempts=2)
+    job = (await queue.claim("worker-a", limit=1))[0]
+
+    queue.fail(job, "portal timeout")
+    assert job.status == JobStatus.QUEUED
+    assert job.available_at > datetime.now()
+    assert job.locked_by is None
+
+    job.attempts = 2
+    queue.fail(job, "portal timeout")
+    assert job.status == JobStatus.FAILED
+    assert job.error_message == "portal timeout"
+
+@pytest.mark.asyncio
+async def test_future_jobs_not_claimed(engine, queue):
+    add_job(engine, available_at=datetime.now() + timedelta(minutes=5))
+    assert await queue.claim("worker-a", limit=5) == []
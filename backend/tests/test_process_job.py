@@ -0,0 +1,92 @@
+import pytest
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.api.v1.endpoints.async_vob import process_job
+from app.models.domain import VoBRequest, PatientInfo, PayerInfo, ProviderInfo, ServiceInfo, ChannelSource
+from app.models.job import Job, JobStatus
+from app.models.webhook import WebhookDelivery
+
+MODULE = "app.api.v1.endpoints.async_vob"
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+@pytest.fixture
+def session_factory(tmp_path, engine):
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    return async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+@pytest.fixture
+def failing_router():
+    router = MagicMock()
+    router.resolve_channel = AsyncMock(return_value=ChannelSource.STEDI)
+    router.route = AsyncMock(side_effect=TimeoutError("clearinghouse timeout"))
+    return router
+
+def make_request() -> VoBRequest:
+    return VoBRequest(
+        practice_id="test",
+        patient=PatientInfo(first_name="John", last_name="Roe", dob=date(1980, 1, 1), member_id="123"),
+        payer=PayerInfo(name="Aetna"),
+        provider=ProviderInfo(npi="1234567890"),
+        services=[ServiceInfo(cpt="99213")]
+    )
+
+def add_job(engine, **fields) -> str:
+    with Session(engine) as session:
+        job = Job(request_payload={}, callback_url="https://ehr.example.com/hooks/vob", **fields)
+        session.add(job)
+        session.commit()
+        return job.id
+
+async def run(job_id, session_factory, router, mode, **kwargs):
+    with patch(f"{MODULE}.async_session_factory", session_factory), \
+            patch(f"{MODULE}.vob_router", router), \
+            patch(f"{MODULE}.publish_job_status", AsyncMock()), \
+            patch(f"{MODULE}.settings.JOB_QUEUE_MODE", mode):
+        await process_job(job_id, make_request(), **kwargs)
+
+@pytest.mark.asyncio
+async def test_inline_failure_is_final_and_notifies(engine, session_factory, failing_router):
+    job_id = add_job(engine)
+
+    await run(job_id, session_factory, failing_router, "inline")
+
+    with Session(engine) as session:
+        job = session.get(Job, job_id)
+        assert job.status == JobStatus.FAILED
+        assert job.attempts == 1
+        assert job.error_message == "clearinghouse timeout"
+        assert [d.event for d in session.exec(select(WebhookDelivery)).all()] == ["job.failed"]
+
+@pytest.mark.asyncio
+async def test_worker_failure_is_requeued(engine, session_factory, failing_router):
+    job_id = add_job(engine, status=JobStatus.PROCESSING, attempts=1, locked_by="worker-a")
+
+    await run(job_id, session_factory, failing_router, "worker", worker_id="worker-a")
+
+    with Session(engine) as session:
+        assert session.get(Job, job_id).status == JobStatus.QUEUED
+        assert session.exec(select(WebhookDelivery)).all() == []
+
+@pytest.mark.asyncio
+async def test_result_dropped_when_lease_was_lost(engine, session_factory, failing_router):
+    # Heartbeats stalled and worker-b reclaimed the job
+    job_id = add_job(engine, status=JobStatus.PROCESSING, attempts=2, locked_by="worker-b")
+    failing_router.route.side_effect = None
+    failing_router.route.return_value = MagicMock(channel="stedi", to_json=lambda: b'{"coverage_status": "active"}')
+
+    await run(job_id, session_factory, failing_router, "worker", worker_id="worker-a")
+
+    with Session(engine) as session:
+        job = session.get(Job, job_id)
+        assert job.status == JobStatus.PROCESSING
+        assert job.locked_by == "worker-b"
+        assert job.result is None
+        assert session.exec(select(WebhookDelivery)).all() == []
@@ -0,0 +1,65 @@
+import hashlib
+import unittest
+from unittest.mock import AsyncMock, patch
+from app.connectors.rpa import RPAConnector
+from app.connectors.rpa_strategies.session_store import PortalSessionStore
+
+STATE = {"cookies": [{"name": "session", "value": "abc", "domain": "localhost", "path": "/"}], "origins": []}
+
+class TestRPASessionReuse(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.store = PortalSessionStore(ttl_seconds=60)
+        self.connector = RPAConnector(base_url="http://localhost:5001", session_store=self.store)
+        self.context = AsyncMock()
+        self.context.storage_state.return_value = STATE
+        self.page = AsyncMock()
+        self.strategy = AsyncMock()
+
+    async def test_first_check_logs_in_and_saves_session(self):
+        await self.connector._authenticate(self.context, self.page, self.strategy, "mock")
+
+        self.strategy.login.assert_awaited_once()
+        key = self.connector._session_key("mock")
+        self.assertEqual(await self.store.get(key), STATE)
+
+    async def test_valid_session_skips_login(self):
+        await self.store.save(self.connector._session_key("mock"), STATE)
+        self.strategy.resume_session.return_value = True
+
+        await self.connector._authenticate(self.context, self.page, self.strategy, "mock")
+
+        self.context.add_cookies.assert_awaited_once_with(STATE["cookies"])
+        self.strategy.login.assert_not_awaited()
+
+    async def test_expired_session_logs_in_again(self):
+        key = self.connector._session_key("mock")
+        await self.store.save(key, {"cookies": [{"name": "old"}], "origins": []})
+        self.strategy.resume_session.return_value = False
+
+        await self.connector._authenticate(self.context, self.page, self.strategy, "mock")
+
+        self.strategy.login.assert_awaited_once()
+        self.assertEqual(await self.store.get(key), STATE)
+
+    async def test_session_key_changes_with_credentials(self):
+        with patch("app.connectors.rpa.PortalFactory.get_credentials", return_value={"username": "a", "password": "1"}):
+            key1 = self.connector._session_key("aetna")
+        with patch("app.connectors.rpa.PortalFactory.get_credentials", return_value={"username": "a", "password": "2"}):
+            key2 = self.connector._session_key("aetna")
+        self.assertNotEqual(key1, key2)
+
+    async def test_session_key_does_not_expose_password_hash(self):
+        creds = {"username": "a", "password": "hunter2"}
+        with patch("app.connectors.rpa.PortalFactory.get_credentials", return_value=creds), \
+                patch("app.connectors.rpa.settings.RPA_SESSION_KEY_SECRET", "shared"):
+            key = self.connector._session_key("aetna")
+            shared1 = RPAConnector(base_url="http://localhost:5001")._session_key("aetna")
+            shared2 = RPAConnector(base_url="http://localhost:5001")._session_key("aetna")
+        self.assertNotIn(hashlib.sha256(b"a:hunter2").hexdigest()[:16], key)
+        # Workers with the same secret agree on the key
+        self.assertEqual(shared1, shared2)
+
+    async def test_store_expiry(self):
+        store = PortalSessionStore(ttl_seconds=0)
+        await store.save("k", STATE)
+        self.assertIsNone(await store.get("k"))
@@ -85,3 +85,39 @@ class TestStediConnector(unittest.IsolatedAsyncioTestCase):
             result = await connector.check_eligibility(request)
             
             self.assertEqual(result.coverage_status, CoverageStatus.INACTIVE)
+
+    async def test_multi_service_stcs_split_and_merged(self):
+        connector = StediConnector()
+        connector.api_key = "test-key"
+
+        request = VoBRequest(
+            practice_id="test",
+            patient=PatientInfo(first_name="John", last_name="Doe", dob=date(1980, 1, 1), member_id="123"),
+            payer=PayerInfo(name="Aetna", payer_code_hint="PAYER123"),
+            provider=ProviderInfo(npi="1234567890"),
+            services=[ServiceInfo(cpt="99213"), ServiceInfo(cpt="97110")]
+        )
+
+        # Union keeps primaries first: 98 (E/M), PT, then fallbacks
+        self.assertEqual(connector._service_type_codes(request), ["98", "PT", "1", "30", "AE"])
+
+        def respond(url, json, headers):
+            stcs = json["encounter"]["serviceTypeCodes"]
+            response = MagicMock()
+            response.json.return_value = {
+                "controlNumber": "12345",
+                "planStatus": [{"statusCode": "1", "planDetails": "Aetna PPO"}],
+                "benefitsInformation": [
+                    {"name": f"Benefit {stc}", "amounts": {"copay": {"inNetwork": {"amount": 20}}}}
+                    for stc in stcs
+                ]
+            }
+            return response
+
+        with patch("app.connectors.stedi.settings.STEDI_MAX_STCS_BY_PAYER", {"PAYER123": 2}):
+            with patch("httpx.AsyncClient.post", side_effect=respond) as mock_post:
+                result = await connector.check_eligibility(request)
+
+        self.assertEqual(mock_post.call_count, 3)  # 5 STCs, 2 per request
+        self.assertEqual(len(result.financials.copays), 5)
+        self.assertEqual(result.plan_name, "Aetna PPO")
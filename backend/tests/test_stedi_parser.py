@@ -0,0 +1,65 @@
+from app.connectors.stedi_parser import BenefitIndex, coverage_level, parse_financials
+from app.models.domain import NetworkType
+
+
+def _benefit(code, level, **amounts):
+    return {"code": code, "name": f"Benefit {code}", "coverageLevel": level, "amounts": amounts}
+
+
+def test_individual_and_family_tiers_by_network():
+    financials = parse_financials([
+        _benefit("30", "INDIVIDUAL", deductible={
+            "inNetwork": {"total": 1000, "remaining": 500},
+            "outOfNetwork": {"total": 2000, "remaining": 2000},
+        }),
+        _benefit("30", "FAMILY", deductible={"inNetwork": {"total": 3000, "remaining": 2500}}),
+        _benefit("30", "FAM", outOfPocket={"outOfNetwork": {"total": 12000, "remaining": 11000}}),
+    ])
+
+    assert financials.deductible.individual.total == 1000
+    assert financials.deductible.individual.remaining == 500
+    assert financials.deductible.family.total == 3000
+    assert financials.deductible_out_of_network.individual.total == 2000
+    assert financials.deductible_out_of_network.family is None
+    assert financials.oop_max is None
+    assert financials.oop_max_out_of_network.family.remaining == 11000
+
+
+def test_plan_level_amount_wins_over_service_specific():
+    financials = parse_financials([
+        _benefit("98", "INDIVIDUAL", deductible={"inNetwork": {"total": 250, "remaining": 0}}),
+        _benefit("30", "INDIVIDUAL", deductible={"inNetwork": {"total": 1000, "remaining": 500}}),
+        _benefit("PT", "INDIVIDUAL", deductible={"inNetwork": {"total": 100, "remaining": 100}}),
+    ])
+    assert financials.deductible.individual.total == 1000
+
+    # Without a plan-level entry the latest one applies, as before
+    financials = parse_financials([
+        _benefit("98", None, deductible={"inNetwork": {"total": 250, "remaining": 0}}),
+        _benefit("PT", None, deductible={"inNetwork": {"total": 100, "remaining": 100}}),
+    ])
+    assert financials.deductible.individual.total == 100
+
+
+def test_copays_and_coinsurance_keep_order_and_network():
+    index = BenefitIndex.from_benefits([
+        _benefit("98", "INDIVIDUAL", copay={"inNetwork": {"amount": 25}, "outOfNetwork": {"amount": 60}}),
+        _benefit("PT", "INDIVIDUAL", coinsurance={"inNetwork": {"percentage": 20}}),
+        {"name": "No amounts"},
+    ])
+    financials = index.financials()
+
+    assert [(c.amount, c.network) for c in financials.copays] == [
+        (25.0, NetworkType.IN_NETWORK),
+        (60.0, NetworkType.OUT_OF_NETWORK),
+    ]
+    assert financials.coinsurance[0].rate_pct == 20.0
+    assert financials.coinsurance[0].service_type == "Benefit PT"
+    assert financials.deductible is None
+
+
+def test_coverage_level_normalization():
+    assert coverage_level({"coverageLevel": "Family"}) == "family"
+    assert coverage_level({"coverageLevelCode": "FAM"}) == "family"
+    assert coverage_level({"coverageLevel": "Employee Only"}) == "individual"
+    assert coverage_level({}) == "individual"
@@ -0,0 +1,190 @@
+import asyncio
+import hashlib
+import hmac
+import pytest
+from datetime import datetime
+from fastapi import BackgroundTasks, HTTPException
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.api.v1.endpoints.async_vob import check_eligibility_async
+from app.models.domain import AsyncVoBRequest
+from app.models.job import Job, JobStatus
+from app.models.webhook import WebhookDelivery, WebhookDeadLetter, WebhookStatus
+from app.services.webhooks import (
+    WebhookDispatcher, sign_payload, SIGNATURE_HEADER, validate_callback_url, CallbackURLError
+)
+
+ALLOWED_HOSTS = ["ehr.example.com", "*.partner.example"]
+
+@pytest.fixture(autouse=True)
+def public_dns():
+    with patch("app.services.webhooks._resolve", AsyncMock(return_value=["93.184.216.34"])) as resolve:
+        yield resolve
+
+@pytest.fixture
+def session_factory(tmp_path):
+    SQLModel.metadata.create_all(create_engine(f"sqlite:///{tmp_path / 'hooks.db'}"))
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'hooks.db'}")
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+def make_dispatcher(session_factory, status_code=200, **kwargs):
+    http_pool = MagicMock()
+    http_pool.client.post = AsyncMock(return_value=MagicMock(status_code=status_code))
+    http_pool.close = AsyncMock()
+    kwargs.setdefault("secret", "s3cret")
+    return WebhookDispatcher(
+        session_factory=session_factory, http_pool=http_pool, allowed_hosts=ALLOWED_HOSTS, **kwargs
+    )
+
+async def enqueue_completed_job(session_factory, dispatcher) -> str:
+    async with session_factory() as session:
+        job = Job(status=JobStatus.COMPLETED, channel="stedi", result={"coverage_status": "active"},
+                  callback_url="https://ehr.example.com/hooks/vob")
+        session.add(job)
+        delivery = dispatcher.enqueue(session, job)
+        await session.commit()
+        return delivery.id
+
+def test_signature_is_hmac_sha256_of_timestamp_and_body():
+    expected = hmac.new(b"s3cret", b"1700000000.{}", hashlib.sha256).hexdigest()
+    assert sign_payload("s3cret", 1700000000, b"{}") == expected
+
+@pytest.mark.asyncio
+async def test_delivers_signed_payload_once(session_factory):
+    dispatcher = make_dispatcher(session_factory)
+    delivery_id = await enqueue_completed_job(session_factory, dispatcher)
+
+    [delivery] = await dispatcher.claim("w", limit=10)
+    assert await dispatcher.claim("w", limit=10) == []  # leased
+    await dispatcher.deliver(delivery)
+
+    url = dispatcher.http_pool.client.post.call_args.args[0]
+    headers = dispatcher.http_pool.client.post.call_args.kwargs["headers"]
+    body = dispatcher.http_pool.client.post.call_args.kwargs["content"]
+    timestamp = headers[SIGNATURE_HEADER].split(",")[0][2:]
+    assert url == "https://ehr.example.com/hooks/vob"
+    assert headers[SIGNATURE_HEADER].endswith("v1=" + sign_payload("s3cret", int(timestamp), body))
+    assert b'"event":"job.completed"' in body
+
+    async with session_factory() as session:
+        stored = await session.get(WebhookDelivery, delivery_id)
+        assert stored.status == WebhookStatus.DELIVERED
+        assert stored.attempts == 1
+
+@pytest.mark.asyncio
+async def test_failures_back_off_then_dead_letter(session_factory):
+    dispatcher = make_dispatcher(session_factory, status_code=503, max_attempts=2)
+    delivery_id = await enqueue_completed_job(session_factory, dispatcher)
+
+    [delivery] = await dispatcher.claim("w", limit=10)
+    await dispatcher.deliver(delivery)
+    async with session_factory() as session:
+        stored = await session.get(WebhookDelivery, delivery_id)
+        assert stored.status == WebhookStatus.PENDING
+        assert stored.next_attempt_at > datetime.now()
+        assert stored.last_error == "HTTP 503"
+
+    await dispatcher.deliver(delivery)
+    async with session_factory() as session:
+        stored = await session.get(WebhookDelivery, delivery_id)
+        assert stored.status == WebhookStatus.DEAD
+        dead = (await session.exec(select(WebhookDeadLetter))).all()
+        assert [d.delivery_id for d in dead] == [delivery_id]
+
+def test_no_delivery_without_callback(session_factory):
+    dispatcher = make_dispatcher(session_factory)
+    session = MagicMock()
+    assert dispatcher.enqueue(session, Job(status=JobStatus.COMPLETED)) is None
+    session.add.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_callback_url_must_be_allowlisted_https():
+    assert await validate_callback_url("https://ehr.example.com/hook", ALLOWED_HOSTS)
+    assert await validate_callback_url("https://api.partner.example/hook", ALLOWED_HOSTS)
+    for url in (
+        "http://ehr.example.com/hook",
+        "https://evil.example.com/hook",
+        "https://partner.example.evil.com/hook",
+        "https://user:pw@ehr.example.com/hook",
+    ):
+        with pytest.raises(CallbackURLError):
+            await validate_callback_url(url, ALLOWED_HOSTS)
+    with pytest.raises(CallbackURLError):
+        await validate_callback_url("https://ehr.example.com/hook", [])
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("address", ["127.0.0.1", "10.0.0.5", "169.254.169.254", "::1", "fe80::1", "::ffff:192.168.1.1"])
+async def test_callback_url_rejects_internal_addresses(public_dns, address):
+    public_dns.return_value = ["93.184.216.34", address]
+    with pytest.raises(CallbackURLError):
+        await validate_callback_url("https://ehr.example.com/hook", ALLOWED_HOSTS)
+
+@pytest.mark.asyncio
+async def test_delivery_revalidates_url_and_never_sends_unsigned(session_factory, public_dns):
+    dispatcher = make_dispatcher(session_factory)
+    delivery_id = await enqueue_completed_job(session_factory, dispatcher)
+    [delivery] = await dispatcher.claim("w", limit=10)
+
+    # Host now resolves internally (DNS rebinding)
+    public_dns.return_value = ["10.1.2.3"]
+    await dispatcher.deliver(delivery)
+    dispatcher.http_pool.client.post.assert_not_called()
+
+    public_dns.return_value = ["93.184.216.34"]
+    dispatcher.secret = ""
+    await dispatcher.deliver(delivery)
+    dispatcher.http_pool.client.post.assert_not_called()
+
+    async with session_factory() as session:
+        stored = await session.get(WebhookDelivery, delivery_id)
+        assert stored.status == WebhookStatus.PENDING
+        assert "unsigned" in stored.last_error
+
+@pytest.mark.asyncio
+async def test_check_async_refuses_callbacks_without_secret_or_allowlist():
+    request = AsyncVoBRequest.model_validate({
+        "practice_id": "p1",
+        "patient": {"first_name": "Jane", "last_name": "Roe", "dob": "1985-03-12", "member_id": "XYZ123"},
+        "payer": {"name": "Aetna"},
+        "provider": {"npi": "1234567890"},
+        "services": [{"cpt": "99213"}],
+        "callback_url": "https://ehr.example.com/hooks/vob",
+    })
+    session = MagicMock()
+    settings_path = "app.api.v1.endpoints.async_vob.settings"
+
+    with patch(f"{settings_path}.WEBHOOK_SIGNING_SECRET", ""):
+        with pytest.raises(HTTPException) as exc:
+            await check_eligibility_async(request, BackgroundTasks(), session=session, user={})
+        assert exc.value.status_code == 400
+
+    with patch(f"{settings_path}.WEBHOOK_SIGNING_SECRET", "s3cret"), \
+            patch(f"{settings_path}.WEBHOOK_ALLOWED_HOSTS", ["other.example.com"]):
+        with pytest.raises(HTTPException) as exc:
+            await check_eligibility_async(request, BackgroundTasks(), session=session, user={})
+        assert exc.value.status_code == 400
+    session.add.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_run_survives_claim_errors(session_factory):
+    dispatcher = make_dispatcher(session_factory, poll_interval=0.01)
+    delivery_id = await enqueue_completed_job(session_factory, dispatcher)
+    claim = dispatcher.claim
+    outcomes = [ConnectionError("db down")]
+
+    async def flaky_claim(worker_id, limit):
+        if outcomes:
+            raise outcomes.pop(0)
+        return await claim(worker_id, limit)
+
+    dispatcher.claim = flaky_claim
+    run = asyncio.create_task(dispatcher.run())
+    await asyncio.sleep(0.2)
+    dispatcher.stop()
+    await run
+
+    async with session_factory() as session:
+        stored = await session.get(WebhookDelivery, delivery_id)
+        assert stored.status == WebhookStatus.DELIVERED
@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models.job import Job, JobStatus
+from app.services.job_queue import JobQueue
+from app.worker import JobWorker, run_worker
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'worker.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+@pytest.fixture
+def queue(tmp_path, engine):
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'worker.db'}")
+    session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+    return JobQueue(visibility_timeout_seconds=60, retry_backoff_seconds=10, session_factory=session_factory)
+
+async def run_briefly(worker: JobWorker, seconds: float = 0.1) -> None:
+    task = asyncio.create_task(worker.run())
+    await asyncio.sleep(seconds)
+    worker.stop()
+    await task
+
+@pytest.mark.asyncio
+async def test_claim_errors_back_off_instead_of_stopping(queue):
+    worker = JobWorker(queue, concurrency=2, poll_interval=0.01)
+    outcomes = [ConnectionError("db down"), ConnectionError("db down")]
+
+    async def claim(worker_id, limit):
+        if outcomes:
+            raise outcomes.pop(0)
+        return []
+
+    queue.claim = AsyncMock(side_effect=claim)
+    await run_briefly(worker)
+
+    assert not outcomes
+    assert queue.claim.await_count > 2
+
+@pytest.mark.asyncio
+async def test_invalid_payload_fails_job_without_retry(engine, queue):
+    with Session(engine) as session:
+        job = Job(request_payload={"patient": "not a patient"})
+        session.add(job)
+        session.commit()
+        job_id = job.id
+
+    worker = JobWorker(queue, concurrency=2, poll_interval=0.01)
+    with patch("app.worker.publish_job_status", AsyncMock()) as publish, \
+            patch("app.worker.process_job", AsyncMock()) as process:
+        await run_briefly(worker)
+
+    process.assert_not_called()
+    publish.assert_awaited_once()
+    with Session(engine) as session:
+        stored = session.get(Job, job_id)
+        assert stored.status == JobStatus.FAILED
+        assert stored.attempts == 1
+        assert stored.error_message.startswith("Invalid request payload")
+
+@pytest.mark.asyncio
+async def test_run_worker_listens_for_cache_invalidations():
+    listen = AsyncMock()
+    with patch("app.worker.create_db_and_tables"), \
+            patch("app.worker.stedi_http_pool", AsyncMock()), \
+            patch("app.worker.rpa_browser_pool", AsyncMock()), \
+            patch("app.worker.async_engine", AsyncMock()), \
+            patch("app.worker.payer_registry", MagicMock(load=AsyncMock(), run_refresh_loop=AsyncMock())), \
+            patch("app.worker.vob_router.telemetry.run_persist_loop", AsyncMock()), \
+            patch("app.worker.vob_router.cache.listen_for_invalidations", listen), \
+            patch("app.worker.JobWorker.run", AsyncMock()), \
+            patch("app.worker.webhook_dispatcher.run", AsyncMock()):
+        await run_worker(concurrency=1, poll_interval=0.01)
+
+    listen.assert_called_once()
@@ -15,6 +15,10 @@ docker-compose up -d
 echo "Starting Backend..."
 (cd backend && source ../venv/bin/activate && uvicorn main:app --reload) &
 
+# Start Job Worker
+echo "Starting Job Worker..."
+(cd backend && source ../venv/bin/activate && python -m app.worker) &
+
 # Start RPA Portal
 echo "Starting RPA Portal..."
 (cd rpa_portal && source ../venv/bin/activate && python app.py) &